@@ -0,0 +1,484 @@
+"""
+Micro-benchmarks for hot paths
+
+Usage:
+    python bench.py              # run all benchmarks
+    python bench.py logging      # run benchmarks whose name contains "logging"
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {}
+
+
+def benchmark(func: Callable[[], None]) -> Callable[[], None]:
+    """Register a benchmark function"""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def measure(label: str, func: Callable[[], None], iterations: int = 10000) -> float:
+    """Time func over several iterations and print the per-call cost"""
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call = (time.perf_counter() - start) / iterations
+    print(f"  {label:<55} {per_call * 1e6:10.2f} µs/call")
+    return per_call
+
+
+def _sample_vault_listing(count: int = 200) -> str:
+    return json.dumps([
+        {
+            "id": f"item-{i}", "name": f"Service {i}", "notes": "recovery codes " * 5,
+            "login": {"username": f"user{i}", "password": "S3cr3t!" * 3, "totp": "JBSWY3DPEHPK3PXP"},
+        }
+        for i in range(count)
+    ])
+
+
+@benchmark
+def logging_hot_path() -> None:
+    """Cost of logging a bw payload on the CLI hot path"""
+    from core.logging_utils import Redacted, setup_queue_logging, stop_queue_logging
+
+    payload = _sample_vault_listing()
+    temp_dir = tempfile.mkdtemp(prefix="bench-logs-")
+
+    disabled = logging.getLogger("bench.disabled")
+    disabled.setLevel(logging.INFO)
+    disabled.propagate = False
+    disabled.addHandler(logging.NullHandler())
+
+    print(f"Payload: {len(payload)} chars, DEBUG disabled")
+    measure("eager f-string (previous behaviour)",
+            lambda: disabled.debug(f"CLI stdout: {payload.strip()}"))
+    measure("lazy %-style + Redacted",
+            lambda: disabled.debug("CLI stdout: %s", Redacted(payload)))
+
+    sync_logger = logging.getLogger("bench.sync")
+    sync_logger.setLevel(logging.INFO)
+    sync_logger.propagate = False
+    sync_handler = logging.FileHandler(os.path.join(temp_dir, "sync.log"))
+    sync_logger.addHandler(sync_handler)
+
+    queued_logger = logging.getLogger("bench.queued")
+    listener = setup_queue_logging(queued_logger, os.path.join(temp_dir, "queued.log"), propagate=False)
+
+    print("Logging enabled")
+    measure("FileHandler, full payload (previous behaviour)",
+            lambda: sync_logger.info(f"CLI stdout: {payload}"), iterations=2000)
+    measure("FileHandler, Redacted payload",
+            lambda: sync_logger.info("CLI stdout: %s", Redacted(payload)), iterations=2000)
+    measure("QueueHandler, Redacted payload (caller cost)",
+            lambda: queued_logger.info("CLI stdout: %s", Redacted(payload)), iterations=2000)
+
+    start = time.perf_counter()
+    stop_queue_logging(listener)
+    print(f"  {'QueueListener drain on stop':<55} {(time.perf_counter() - start) * 1e3:10.2f} ms")
+    sync_handler.close()
+
+
+@benchmark
+def audit_cached_lookup() -> None:
+    """Cost the audit trail adds to a snapshot-served get_item"""
+    from core.bitwarden_audit import AuditLog, audit_actor
+    from core.bitwarden_vault_cache import VaultSnapshot
+    from core.bitwarden_cli_integration import BitwardenCLIIntegration
+
+    snapshot = VaultSnapshot([{"id": "item-1", "name": "Service", "login": {"password": "x"}}])
+    temp_dir = tempfile.mkdtemp(prefix="bench-audit-")
+    audit_log = AuditLog(os.path.join(temp_dir, "audit.jsonl"), flush_interval=0.5)
+
+    # Skip the bw installation check; only the in-memory path is exercised
+    plain = BitwardenCLIIntegration.__new__(BitwardenCLIIntegration)
+    plain.__dict__.update(write_queue=None, broker=None, _snapshot=snapshot, _stale_ids={}, audit_log=None)
+    audited = BitwardenCLIIntegration.__new__(BitwardenCLIIntegration)
+    audited.__dict__.update(plain.__dict__, audit_log=audit_log)
+
+    baseline = measure("get_item from snapshot, no audit", lambda: plain.get_item("item-1"), iterations=100000)
+    with audit_actor("bench"):
+        with_audit = measure("get_item from snapshot, audited", lambda: audited.get_item("item-1"), iterations=100000)
+    print(f"  {'audit overhead':<55} {(with_audit - baseline) * 1e6:10.2f} µs/call")
+
+    start = time.perf_counter()
+    written = audit_log.flush()
+    print(f"  {f'writer flush + fsync of {written} records':<55} {(time.perf_counter() - start) * 1e3:10.2f} ms")
+    audit_log.close()
+
+
+@benchmark
+def semantic_cache_lookup() -> None:
+    """Semantic cache lookup latency and recall at 100k entries (bge-m3 sized vectors)"""
+    import numpy as np
+    from core.llm_semantic_cache import SemanticResponseCache
+
+    entries, dim = 100_000, 1024
+    rng = np.random.default_rng(0)
+    temp_dir = tempfile.mkdtemp(prefix="bench-semantic-")
+    cache = SemanticResponseCache(temp_dir, dim=dim, capacity=entries, threshold=0.9)
+
+    def unit(vectors):
+        return (vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)).astype(np.float32)
+
+    stored = unit(rng.standard_normal((entries, dim)))
+    start = time.perf_counter()
+    for index in range(entries):
+        cache.put(stored[index], "bench", f"prompt {index}", f"response {index}")
+    print(f"  {'insert':<55} {(time.perf_counter() - start) / entries * 1e6:10.2f} µs/call")
+
+    # Rephrasings: stored vectors plus noise, cosine ~0.95 to the original
+    probes = rng.integers(0, entries, 200)
+    noise = unit(rng.standard_normal((len(probes), dim)))
+    queries = unit(stored[probes] + 0.33 * noise)
+    hits = sum(cache.lookup(query, "bench") == f"response {index}" for query, index in zip(queries, probes))
+    print(f"  {'recall for cosine ~0.95 rephrasings':<55} {hits / len(probes):10.1%}")
+
+    state = {"i": 0}
+
+    def lookup():
+        state["i"] = (state["i"] + 1) % len(queries)
+        cache.lookup(queries[state["i"]], "bench")
+
+    measure("lookup (hit) at 100k entries", lookup, iterations=500)
+    misses = unit(rng.standard_normal((50, dim)))
+    measure("lookup (miss) at 100k entries", lambda: cache.lookup(misses[0], "bench"), iterations=500)
+    brute = lambda: stored @ queries[0]
+    measure("reference: brute-force matrix product", brute, iterations=20)
+
+
+@benchmark
+def conversation_context() -> None:
+    """Per-turn cost and size of the chat context as conversations grow"""
+    from core.conversation_manager import ConversationManager, count_tokens
+
+    report = " ".join(f"Finding {i}: the market grew by {i % 17}% in region {i % 5}." for i in range(300))
+    question = "Can you compare this with the previous quarter and list the open risks?"
+
+    for label, options in (("last 5 turns (previous)", {}), ("budget 1500", {"token_budget": 1500})):
+        for history in (10, 1000):
+            manager = ConversationManager(**options)
+            for index in range(history):
+                manager.add_turn("user", f"{question} #{index}")
+                manager.add_turn("assistant", report)
+
+            def turn():
+                manager.add_turn("user", question)
+                manager.get_recent_context()
+                manager.add_turn("assistant", report)
+
+            measure(f"{label}, {history} turns: add + context", turn, iterations=200)
+            context = manager.get_recent_context()
+            print(f"  {f'{label}, {history} turns: context size':<55} {count_tokens(context):10d} tokens")
+
+
+@benchmark
+def conversation_recall() -> None:
+    """Recall of earlier turns: FTS5 index vs scanning stored history"""
+    import random
+    from core.conversation_store import ConversationStore
+
+    topics = [f"topic{i}" for i in range(2000)]
+    rng = random.Random(0)
+    temp_dir = tempfile.mkdtemp(prefix="bench-conversations-")
+    store = ConversationStore(os.path.join(temp_dir, "conversations.sqlite"))
+    sessions = [store.create_session() for _ in range(50)]
+
+    count = 20000
+    start = time.perf_counter()
+    for index in range(count):
+        topic = rng.choice(topics)
+        if index % 2:
+            content = f"Report on {topic}: " + " ".join(rng.choice(topics) for _ in range(400))
+        else:
+            content = f"What is known about {topic}?"
+        store.append(rng.choice(sessions), "assistant" if index % 2 else "user", content)
+    print(f"  {'append (WAL, FTS5, compression)':<55} {(time.perf_counter() - start) / count * 1e6:10.2f} µs/call")
+    size = os.path.getsize(store.path) + os.path.getsize(store.path + "-wal")
+    print(f"  {f'database size for {count} messages':<55} {size / 1024 / 1024:10.2f} MB")
+
+    def scan():
+        return [message for session in sessions for message in store.recent(session, count)
+                if "topic1234" in message["content"]]
+
+    measure("recall via FTS5 index", lambda: store.search("what did we find about topic1234"), iterations=200)
+    measure("recall via linear scan (previous approach)", scan, iterations=3)
+    store.close()
+
+
+# Labelled chat messages (not among the router's example requests)
+INTENT_SAMPLES = [
+    ("Was weißt du über Wasserstoffautos und ihre Reichweite?", "research"),
+    ("Wie entwickeln sich die Mietpreise in München?", "research"),
+    ("Fasse den Stand der Forschung zu Long Covid zusammen", "research"),
+    ("Welche Anbieter für E-Mail-Marketing sind DSGVO-konform?", "research"),
+    ("Vergleiche die Akkulaufzeit aktueller Smartphones", "research"),
+    ("Gibt es neue Daten zur Inflation im Euroraum?", "research"),
+    ("How do vector databases compare for small teams?", "research"),
+    ("What are the main risks of quantum computing for encryption?", "research"),
+    ("Find market figures for plant-based meat in Germany", "research"),
+    ("Schreibe eine Produktbeschreibung für unseren neuen Rucksack", "editor"),
+    ("Mach aus diesen Stichpunkten einen flüssigen Absatz", "editor"),
+    ("Verfasse einen Instagram-Post zum Firmenjubiläum", "editor"),
+    ("Formuliere eine freundliche Absage an den Bewerber", "editor"),
+    ("Erstelle einen Newsletter über unsere Herbstaktion", "editor"),
+    ("Kürze diesen Artikel auf 300 Wörter", "editor"),
+    ("Write a catchy headline for the launch announcement", "editor"),
+    ("Turn this report into a friendly blog post", "editor"),
+    ("Compose a reply to the forum question about pricing", "editor"),
+    ("Wer kümmert sich um das Hosting-Update nächste Woche?", "management"),
+    ("Lege im Tresor einen Eintrag für den neuen FTP-Zugang an", "management"),
+    ("Welche Deadlines stehen im Oktober an?", "management"),
+    ("Verteile die Aufgaben für den Messeauftritt im Team", "management"),
+    ("Wie ist der Stand beim Relaunch-Projekt?", "management"),
+    ("Gib mir den API-Key für den Newsletter-Dienst", "management"),
+    ("Schedule a review meeting with the design team", "management"),
+    ("Which tasks are blocked and who owns them?", "management"),
+    ("Rotate the credentials for the staging server", "management"),
+    ("Recherchiere und schreibe dann einen Artikel über E-Bikes", "research"),
+    ("Analysiere unsere Social-Media-Daten vom letzten Quartal", "research"),
+    ("Plane die Recherche für den Jahresbericht", "management"),
+]
+
+
+@benchmark
+def intent_routing() -> None:
+    """Chat routing accuracy and latency: keyword lists vs bge-m3 prototypes"""
+    import numpy as np
+    from core.intent_router import CHAT_ROUTES, IntentRouter, keyword_route
+    from core.llm_semantic_cache import BGEEmbedder
+
+    keyword_correct = sum(keyword_route(text, CHAT_ROUTES, "management").route == label
+                          for text, label in INTENT_SAMPLES)
+    print(f"  {f'keyword accuracy ({len(INTENT_SAMPLES)} samples, previous behaviour)':<55} "
+          f"{keyword_correct / len(INTENT_SAMPLES):10.1%}")
+    measure("keyword routing", lambda: keyword_route(INTENT_SAMPLES[0][0], CHAT_ROUTES, "management"))
+
+    embedder = BGEEmbedder(timeout=2.0)
+    router = IntentRouter(embedder, cache_dir=tempfile.mkdtemp(prefix="bench-intent-"))
+    vectors = embedder.embed_many([text for text, _ in INTENT_SAMPLES])
+    if router.prototypes() is not None and vectors is not None:
+        decisions = [router.score(vector) for vector in vectors]
+        correct = sum(max(scores, key=scores.get) == label for scores, (_, label) in zip(decisions, INTENT_SAMPLES))
+        print(f"  {'embedding accuracy':<55} {correct / len(INTENT_SAMPLES):10.1%}")
+        measure("route() incl. bge-m3 request", lambda: router.route(INTENT_SAMPLES[0][0]), iterations=50)
+    else:
+        print("  embedding server unavailable: accuracy skipped, scoring timed on random prototypes")
+        rng = np.random.default_rng(0)
+        router._prototypes = rng.standard_normal((int(router._offsets[-1]), 1024)).astype(np.float32)
+        vectors = rng.standard_normal((len(INTENT_SAMPLES), 1024)).astype(np.float32)
+    measure("prototype scoring (one matrix product)", lambda: router.score(vectors[0]), iterations=20000)
+
+
+@benchmark
+def crew_construction() -> None:
+    """Per-message crew setup: new Task + Crew vs checking out a pooled crew"""
+    os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    from crewai import LLM, Agent, Task, Crew
+    from core.crew_pool import CrewPool
+
+    llm = LLM(model="openai/bench", api_key="empty", base_url="http://localhost:9/v1")
+    agent = Agent(role="Senior Research Analyst", goal="Research", backstory="Analyst", llm=llm,
+                  verbose=False, memory=False)
+    request = "Recherchiere die Entwicklung der Strompreise"
+
+    def per_message():
+        task = Task(description=f"Research request: {request}\n\nContext: none",
+                    expected_output="Report", agent=agent)
+        Crew(agents=[agent], tasks=[task], memory=False, verbose=False)
+
+    def build():
+        task = Task(description="Research request: {request}\n\nContext: {context}",
+                    expected_output="Report", agent=agent)
+        return Crew(agents=[agent], tasks=[task], memory=False, verbose=False)
+
+    pool = CrewPool({"research": build})
+
+    def pooled():
+        with pool.crew("research") as crew:
+            # Kickoff interpolates the inputs; done here without running the crew
+            crew._interpolate_inputs({"request": request, "context": "none"})
+
+    measure("new Task + Crew per message (previous behaviour)", per_message, iterations=300)
+    measure("pooled crew: checkout, interpolate, release", pooled, iterations=3000)
+
+
+_ECHO_MCP_SERVER = """
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("bench")
+
+
+@server.tool()
+def echo(text: str) -> str:
+    return text
+
+
+server.run()
+"""
+
+
+@benchmark
+def mcp_tool_call() -> None:
+    """MCP tool call: server spawned per call (CrewAI native) vs shared pooled connection vs result cache"""
+    import asyncio
+    from crewai.mcp import MCPServerStdio
+    from crewai.mcp.client import MCPClient
+    from crewai.mcp.transports.stdio import StdioTransport
+    from core.mcp_pool import MCPServerPool
+    from core.mcp_result_cache import MCPResultCache, make_tool_key
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "echo_server.py")
+        with open(script, "w") as f:
+            f.write(_ECHO_MCP_SERVER)
+        config = MCPServerStdio(command=sys.executable, args=[script])
+
+        async def spawn_and_call():
+            client = MCPClient(StdioTransport(command=sys.executable, args=[script]))
+            await client.connect()
+            try:
+                await client.call_tool_result("echo", {"text": "hello"})
+            finally:
+                await client.disconnect()
+
+        pool = MCPServerPool(health_interval=0)
+        try:
+            server = pool.start(config)
+            measure("spawn server + handshake + call (per call)", lambda: asyncio.run(spawn_and_call()),
+                    iterations=3)
+            measure("pooled connection call", lambda: pool.run(server.call("echo", {"text": "hello"})),
+                    iterations=200)
+
+            cache = MCPResultCache(os.path.join(tmp, "results.sqlite"))
+            cache.put(make_tool_key(server.key, "echo", {"text": "hello"}), "hello", "echo")
+            measure("result cache hit (key + SQLite lookup)",
+                    lambda: cache.get(make_tool_key(server.key, "echo", {"text": " hello "}), "echo"),
+                    iterations=5000)
+            cache.close()
+        finally:
+            pool.close()
+
+
+@benchmark
+def mcp_startup() -> None:
+    """Agent tool setup at startup: live MCP discovery vs cached tool schemas"""
+    from crewai.mcp import MCPServerStdio
+    from core.mcp_pool import MCPServerPool
+    from core.mcp_schema_cache import MCPSchemaCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "echo_server.py")
+        with open(script, "w") as f:
+            f.write(_ECHO_MCP_SERVER)
+        config = MCPServerStdio(command=sys.executable, args=[script])
+        schema_cache = MCPSchemaCache(os.path.join(tmp, "schemas"))
+
+        pools = []
+
+        def startup(cache):
+            # Pools are closed after timing: shutdown is not part of startup
+            pools.append(MCPServerPool(health_interval=0, schema_cache=cache))
+            pools[-1].tools([config])
+
+        try:
+            measure("discover tools over stdio (no schema cache)", lambda: startup(None), iterations=3)
+            measure("tools from cached schemas (connect in background)", lambda: startup(schema_cache),
+                    iterations=3)
+        finally:
+            for pool in pools:
+                pool.close()
+
+
+@benchmark
+def chat_server() -> None:
+    """Chat server throughput through pooled crews against a stub LLM backend with 4 slots"""
+    import asyncio
+    import threading
+    os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    from aiohttp import web
+    from crewai import Agent, Task, Crew
+    from crewai.llms.base_llm import BaseLLM
+    from core.chat_server import ChatServer, load_test
+    from core.conversation_manager import ConversationManager
+    from core.crew_pool import CrewPool
+
+    backend_slots, backend_seconds = 4, 0.1
+    backend = threading.Semaphore(backend_slots)
+
+    class StubLLM(BaseLLM):
+        """Answers at once after holding one of the backend's slots for backend_seconds"""
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None,
+                 from_task=None, from_agent=None, response_model=None):
+            with backend:
+                time.sleep(backend_seconds)
+            return "Thought: I can answer directly\nFinal Answer: ok"
+
+    llm = StubLLM(model="stub")
+
+    def build():
+        agent = Agent(role="Project Manager", goal="Answer", backstory="Manager", llm=llm,
+                      verbose=False, memory=False)
+        task = Task(description="Request: {request}\n\nContext: {context}", expected_output="Answer",
+                    agent=agent)
+        return Crew(agents=[agent], tasks=[task], memory=False, verbose=False)
+
+    async def run(concurrency: int, crews: int) -> dict:
+        pool = CrewPool({"management": build}, max_per_route=crews)
+
+        async def handler(message, manager):
+            # chat_with_manager's crew path, with every message routed to the same crew
+            manager.add_turn("user", message)
+            inputs = {"request": message, "context": manager.get_recent_context()}
+            result = await pool.kickoff_async("management", inputs)
+            manager.add_turn("assistant", str(result))
+            return str(result)
+
+        server = ChatServer(handler, lambda session_id: ConversationManager(), max_concurrency=concurrency,
+                            max_queue=64)
+        runner = web.AppRunner(server.app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await load_test(f"http://127.0.0.1:{port}", concurrency=concurrency * 2,
+                                   requests=max(16, concurrency * 8))
+        finally:
+            await runner.cleanup()
+
+    for concurrency in (1, 2, 4, 8):
+        # One crew per route (CREW_POOL_SIZE default) vs the pool sized to the server's concurrency
+        for crews in sorted({1, concurrency}):
+            result = asyncio.run(run(concurrency, crews))
+            label = f"max_concurrency {concurrency}, {crews} crew(s): p50 {result['p50_ms']:.0f}ms"
+            print(f"  {label:<55} {result['throughput']:10.2f} msg/s")
+
+
+def main(argv=None) -> int:
+    """Run selected benchmarks"""
+    filters = (argv if argv is not None else sys.argv[1:])
+    selected = [name for name in BENCHMARKS if not filters or any(f in name for f in filters)]
+    if not selected:
+        print(f"No benchmarks match {filters}. Available: {', '.join(BENCHMARKS)}")
+        return 1
+    for name in selected:
+        print(f"== {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
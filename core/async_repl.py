@@ -0,0 +1,146 @@
+"""
+Non-blocking terminal input for the manager chat
+
+input() inside an async loop blocks the event loop while the user types,
+which stalls everything else scheduled on it (MCP keepalives, async tool
+subprocesses, background summaries handed back to the loop). AsyncChatREPL
+reads stdin on a daemon thread and hands complete lines to the loop
+through a queue, so messages typed while a crew is still running are
+queued and processed in order.
+
+Ctrl-C cancels the run in progress instead of killing the process; when
+nothing is running, pressing Ctrl-C twice within exit_window seconds
+leaves the chat.
+"""
+
+import sys
+import time
+import signal
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RunCancelled(Exception):
+    """The run was cancelled with Ctrl-C"""
+
+
+class AsyncChatREPL:
+    """Queued stdin reader plus Ctrl-C cancellation of the current run"""
+
+    def __init__(self, prompt: str = "\n👤 You: ", exit_window: float = 2.0):
+        """
+        Args:
+            prompt: Prompt shown when the chat waits for input
+            exit_window: Seconds in which a second Ctrl-C (while idle) exits
+        """
+        self.prompt = prompt
+        self.exit_window = exit_window
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._current: Optional[asyncio.Task] = None
+        self._interrupted = False
+        self._last_idle_interrupt = 0.0
+        self._signal_handler_installed = False
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None and not self._current.done()
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """Start the reader thread and the Ctrl-C handler (call from the running loop)"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        threading.Thread(target=self._read_stdin, name="chat-input", daemon=True).start()
+        try:
+            self._loop.add_signal_handler(signal.SIGINT, self._on_interrupt)
+            self._signal_handler_installed = True
+        except (NotImplementedError, RuntimeError):
+            # Windows event loops: plain signal handler, forwarded to the loop
+            signal.signal(signal.SIGINT, lambda *_: self._loop.call_soon_threadsafe(self._on_interrupt))
+
+    def stop(self) -> None:
+        """Restore default Ctrl-C handling (the reader thread ends with the process)"""
+        if self._signal_handler_installed:
+            self._loop.remove_signal_handler(signal.SIGINT)
+            self._signal_handler_installed = False
+        else:
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    def _read_stdin(self) -> None:
+        """Reader thread: forward lines to the loop, None at end of input"""
+        while True:
+            try:
+                line = sys.stdin.readline()
+            except (OSError, ValueError):
+                line = ""
+            if not line:
+                self._loop.call_soon_threadsafe(self._deliver, None)
+                return
+            self._loop.call_soon_threadsafe(self._deliver, line.rstrip("\n"))
+
+    def _deliver(self, line: Optional[str]) -> None:
+        if line is not None and not line.strip():
+            return
+        self._queue.put_nowait(line)
+        if line is not None and self.busy:
+            print(f"\n📥 Queued ({self.queued} waiting): {line[:60]}", flush=True)
+
+    def _on_interrupt(self) -> None:
+        if self.busy:
+            self._interrupted = True
+            self._current.cancel()
+            print("\n⏹️ Cancelling the current run ...", flush=True)
+            return
+        now = time.monotonic()
+        if now - self._last_idle_interrupt < self.exit_window:
+            self._queue.put_nowait(None)
+            return
+        self._last_idle_interrupt = now
+        print(f"\n(Press Ctrl-C again within {self.exit_window:.0f}s or type 'quit' to exit)", flush=True)
+        print(self.prompt, end="", flush=True)
+
+    async def read(self) -> Optional[str]:
+        """
+        Next message, waiting without blocking the loop
+
+        Returns:
+            Line (stripped), None at end of input or on exit via Ctrl-C
+        """
+        if self._queue.empty():
+            print(self.prompt, end="", flush=True)
+            line = await self._queue.get()
+        else:
+            # Typed during the previous run: show which message is processed now
+            line = self._queue.get_nowait()
+            if line is not None:
+                print(f"{self.prompt}{line}", flush=True)
+        return line.strip() if line is not None else None
+
+    async def run(self, coro: Awaitable[Any]) -> Any:
+        """
+        Run a coroutine as the current, Ctrl-C cancellable run
+
+        Returns:
+            The coroutine's result
+
+        Raises:
+            RunCancelled: Cancelled with Ctrl-C
+        """
+        self._interrupted = False
+        self._current = asyncio.ensure_future(coro)
+        try:
+            return await self._current
+        except asyncio.CancelledError:
+            if self._interrupted and self._current.cancelled():
+                raise RunCancelled() from None
+            raise
+        finally:
+            self._current = None
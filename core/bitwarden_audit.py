@@ -0,0 +1,239 @@
+"""
+Append-only secret access audit log
+
+Records which agent/tool read which secret, when, whether it came from
+memory, and how long it took. Lookups only append a tuple to an in-memory
+buffer; a background writer serializes records as JSONL, fsyncs them in
+batches and rotates the file by size. Item contents are never recorded.
+
+Record format (one JSON object per line, fixed key order):
+    {"ts": 1718000000.123, "actor": "autonomous_bitwarden_cli",
+     "op": "get_item", "item": "<item id>", "hit": true, "ms": 0.004}
+
+Usage:
+    python -m core.bitwarden_audit --item <id> --since 1h
+    python -m core.bitwarden_audit --stats
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import argparse
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_AUDIT_PATH = os.getenv('BITWARDEN_AUDIT_LOG', os.path.expanduser("~/.bw_audit/audit.jsonl"))
+
+# Agent or tool the current lookup is made on behalf of
+_current_actor: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("bitwarden_audit_actor", default=None)
+
+
+@contextmanager
+def audit_actor(name: str) -> Iterator[None]:
+    """Attribute lookups made inside the block to an agent or tool"""
+    token = _current_actor.set(name)
+    try:
+        yield
+    finally:
+        _current_actor.reset(token)
+
+
+class AuditLog:
+    """Buffered, append-only JSONL audit writer"""
+
+    def __init__(self, path: str = DEFAULT_AUDIT_PATH, max_bytes: int = 50 * 1024 * 1024,
+                 backup_count: int = 5, flush_interval: float = 1.0, default_actor: Optional[str] = None):
+        """
+        Args:
+            path: Audit log file
+            max_bytes: Rotate once the file exceeds this size
+            backup_count: Rotated files to keep (path.1 is the newest)
+            flush_interval: Seconds between batched write + fsync
+            default_actor: Actor recorded when none is set via audit_actor()
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.default_actor = default_actor or os.getenv('BITWARDEN_AUDIT_ACTOR') or f"pid-{os.getpid()}"
+        self.records_written = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        # deque.append is atomic, so the lookup path needs no lock
+        self._buffer: deque = deque()
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bw-audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, operation: str, item_id: Optional[str], hit: bool, started: float) -> None:
+        """
+        Buffer one access record (hot path: no I/O, no formatting)
+
+        Args:
+            operation: Integration method, e.g. "get_item"
+            item_id: Item ID (or key name when the ID is unknown)
+            hit: Whether the result was served from memory
+            started: time.perf_counter() value taken when the lookup started
+        """
+        self._buffer.append((time.time(), _current_actor.get(), operation, item_id, hit,
+                             time.perf_counter() - started))
+
+    def flush(self) -> int:
+        """
+        Write buffered records and fsync
+
+        Returns:
+            Number of records written
+        """
+        with self._write_lock:
+            lines = []
+            buffer = self._buffer
+            while buffer:
+                ts, actor, operation, item_id, hit, latency = buffer.popleft()
+                lines.append(json.dumps({
+                    "ts": round(ts, 3), "actor": actor or self.default_actor, "op": operation,
+                    "item": item_id, "hit": hit, "ms": round(latency * 1000, 3)
+                }, separators=(",", ":")))
+            if not lines:
+                return 0
+
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, ("\n".join(lines) + "\n").encode())
+                os.fsync(fd)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            self.records_written += len(lines)
+
+            if size >= self.max_bytes:
+                self._rotate()
+            return len(lines)
+
+    def _rotate(self) -> None:
+        """Shift path -> path.1 -> ... -> path.N (oldest is dropped)"""
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.truncate(self.path, 0)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                # Keep buffering; the next batch retries the write
+                print(f"❌ Audit log write failed: {e}", file=sys.stderr)
+
+    def close(self) -> None:
+        """Stop the writer and flush remaining records"""
+        self._stop_event.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+def audit_files(path: str = DEFAULT_AUDIT_PATH) -> List[str]:
+    """Existing audit files, oldest first"""
+    rotated = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        rotated.append(f"{path}.{index}")
+        index += 1
+    files = list(reversed(rotated))
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_records(path: str = DEFAULT_AUDIT_PATH) -> Iterator[Dict[str, Any]]:
+    """Iterate over all audit records, oldest first"""
+    for file_path in audit_files(path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partially written last line
+
+
+def _parse_since(value: str) -> float:
+    """Parse '15m', '2h', '1d' or a Unix timestamp into a Unix timestamp"""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if value and value[-1] in units:
+        return time.time() - float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(argv=None) -> int:
+    """Command line entry point for querying the audit log"""
+    parser = argparse.ArgumentParser(description="Query the Bitwarden secret access audit log")
+    parser.add_argument("--path", default=DEFAULT_AUDIT_PATH)
+    parser.add_argument("--item", help="Only records for this item ID")
+    parser.add_argument("--actor", help="Only records for this agent/tool")
+    parser.add_argument("--op", help="Only records for this operation")
+    parser.add_argument("--since", help="Only records newer than 15m / 2h / 1d or a Unix timestamp")
+    parser.add_argument("--misses", action="store_true", help="Only cache misses")
+    parser.add_argument("--limit", type=int, default=0, help="Show only the last N records")
+    parser.add_argument("--stats", action="store_true", help="Print per-operation summary instead of records")
+    args = parser.parse_args(argv)
+
+    since = _parse_since(args.since) if args.since else None
+    matches = []
+    for record in read_records(args.path):
+        if args.item and record.get("item") != args.item:
+            continue
+        if args.actor and record.get("actor") != args.actor:
+            continue
+        if args.op and record.get("op") != args.op:
+            continue
+        if since is not None and record.get("ts", 0) < since:
+            continue
+        if args.misses and record.get("hit"):
+            continue
+        matches.append(record)
+
+    if args.stats:
+        by_op: Dict[str, List[Dict[str, Any]]] = {}
+        for record in matches:
+            by_op.setdefault(record.get("op"), []).append(record)
+        print(f"{'operation':<20} {'count':>8} {'hit rate':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for op, records in sorted(by_op.items()):
+            latencies = [r.get("ms", 0.0) for r in records]
+            hit_rate = sum(1 for r in records if r.get("hit")) / len(records)
+            print(f"{op:<20} {len(records):>8} {hit_rate:>8.1%} "
+                  f"{_percentile(latencies, 0.5):>9.3f} {_percentile(latencies, 0.95):>9.3f}")
+        return 0
+
+    if args.limit:
+        matches = matches[-args.limit:]
+    for record in matches:
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.get("ts", 0)))
+        print(f"{timestamp} {record.get('actor')} {record.get('op')} {record.get('item')} "
+              f"{'hit' if record.get('hit') else 'miss'} {record.get('ms')}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
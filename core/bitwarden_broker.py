@@ -0,0 +1,343 @@
+"""
+Local Bitwarden secrets broker
+
+A small daemon that keeps one unlocked, indexed vault snapshot in memory and
+serves read requests over a Unix domain socket. Processes (main.py, the
+researcher-poster subprocess, MCP servers) get secrets with one socket round
+trip instead of each spawning bw and paying unlock and list costs.
+
+Protocol: newline-delimited JSON. The first message on a connection must be
+{"op": "auth", "client": <name>, "token": <token>}; afterwards each request
+is {"op": <operation>, "args": {...}} and each response is
+{"ok": true, "result": ...} or {"ok": false, "error": ..., "error_type": ...}.
+
+Usage:
+    python -m core.bitwarden_broker add-client researcher-poster
+    python -m core.bitwarden_broker serve --sync-interval 300
+"""
+
+import os
+import sys
+import hmac
+import json
+import socket
+import logging
+import secrets
+import argparse
+import threading
+import socketserver
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BROKER_DIR = os.path.expanduser("~/.bw_broker")
+DEFAULT_SOCKET_PATH = os.getenv('BITWARDEN_BROKER_SOCKET', os.path.join(DEFAULT_BROKER_DIR, "broker.sock"))
+DEFAULT_AUTH_FILE = os.getenv('BITWARDEN_BROKER_AUTH_FILE', os.path.join(DEFAULT_BROKER_DIR, "clients.json"))
+
+# Read-only operations served by the broker
+BROKER_OPERATIONS = ("ping", "status", "get_item", "find_items", "list_items", "search_items",
+                     "find_logins_for_url", "get_api_key", "collection_id")
+
+
+class BitwardenBrokerError(Exception):
+    """Broker connection, authentication or request failure"""
+
+    def __init__(self, message: str, error_type: Optional[str] = None):
+        """
+        Args:
+            message: Error description
+            error_type: "ConnectionError" when the broker cannot be reached, "BitwardenAuthError"
+                when it rejects the client, otherwise the exception type reported by the broker
+        """
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def load_client_tokens(auth_file: str = DEFAULT_AUTH_FILE) -> Dict[str, str]:
+    """Load the client name -> token mapping"""
+    try:
+        with open(auth_file, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def add_client(client_name: str, auth_file: str = DEFAULT_AUTH_FILE) -> str:
+    """
+    Register a broker client and return its new token
+
+    Args:
+        client_name: Name the client authenticates with
+        auth_file: Token file (created with 0600 permissions)
+
+    Returns:
+        Generated token
+    """
+    os.makedirs(os.path.dirname(auth_file), mode=0o700, exist_ok=True)
+    tokens = load_client_tokens(auth_file)
+    token = secrets.token_urlsafe(32)
+    tokens[client_name] = token
+    fd = os.open(auth_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(tokens, f)
+    return token
+
+
+def _peer_uid(conn: socket.socket) -> Optional[int]:
+    """UID of the connected peer, where the platform exposes it"""
+    try:
+        if hasattr(socket, "SO_PEERCRED"):
+            import struct
+            creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+            return struct.unpack("3i", creds)[1]
+    except OSError:
+        pass
+    return None
+
+
+class _BrokerRequestHandler(socketserver.StreamRequestHandler):
+    """Handles one client connection (auth, then any number of requests)"""
+
+    def handle(self) -> None:
+        broker: "BitwardenBroker" = self.server.broker
+        uid = _peer_uid(self.connection)
+        if uid is not None and uid != os.getuid():
+            logger.warning(f"⚠️ Rejected broker connection from uid {uid}")
+            return
+
+        client_name = None
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                self._send({"ok": False, "error": "invalid JSON", "error_type": "BitwardenBrokerError"})
+                continue
+
+            if client_name is None:
+                client_name = broker.authenticate(request)
+                if client_name is None:
+                    self._send({"ok": False, "error": "authentication failed", "error_type": "BitwardenBrokerError"})
+                    return
+                self._send({"ok": True, "result": "authenticated"})
+                continue
+
+            self._send(broker.handle_request(client_name, request))
+
+    def _send(self, response: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+        self.wfile.flush()
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class BitwardenBroker:
+    """Serves vault reads from an in-memory snapshot over a Unix socket"""
+
+    def __init__(self, client: Any, socket_path: str = DEFAULT_SOCKET_PATH,
+                 auth_file: str = DEFAULT_AUTH_FILE):
+        """
+        Args:
+            client: Unlocked BitwardenCLIIntegration used to load the snapshot
+            socket_path: Unix domain socket to listen on
+            auth_file: Client token file (see add_client)
+        """
+        self.client = client
+        self.socket_path = socket_path
+        self.auth_file = auth_file
+        self._tokens = load_client_tokens(auth_file)
+        self._server: Optional[_ThreadingUnixServer] = None
+
+    def authenticate(self, request: Dict[str, Any]) -> Optional[str]:
+        """Validate an auth message, returning the client name on success"""
+        if request.get("op") != "auth":
+            return None
+        client_name = request.get("client") or ""
+        expected = self._tokens.get(client_name)
+        token = request.get("token") or ""
+        if expected and hmac.compare_digest(expected, token):
+            logger.info(f"🔑 Broker client authenticated: {client_name}")
+            return client_name
+        logger.warning(f"⚠️ Broker authentication failed for client: {client_name}")
+        return None
+
+    def handle_request(self, client_name: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch one request to the snapshot-backed client"""
+        op = request.get("op")
+        args = request.get("args") or {}
+        if op not in BROKER_OPERATIONS:
+            return {"ok": False, "error": f"unsupported operation: {op}", "error_type": "BitwardenBrokerError"}
+        try:
+            if op == "ping":
+                result = "pong"
+            elif op == "status":
+                result = self.client.get_sync_metrics()
+            elif op == "get_item":
+                result = self.client.get_item(args["item_id"])
+            elif op == "find_items":
+                snapshot = self.client.snapshot
+                result = snapshot.find_by_name(args["name"]) if snapshot else []
+            elif op == "list_items":
+                result = self.client.list_items()
+            elif op == "search_items":
+                result = self.client.search_items(args["search_term"])
+            elif op == "collection_id":
+                snapshot = self.client.snapshot
+                result = snapshot.collection_id(args["collection_name"]) if snapshot else None
+            elif op == "find_logins_for_url":
+                result = self.client.find_logins_for_url(args["url"])
+            else:
+                result = self.client.get_api_key(args["key_name"], args.get("collection_name", "Shared-API-Keys"))
+            return {"ok": True, "result": result}
+        except Exception as e:
+            logger.error(f"❌ Broker request {op} from {client_name} failed: {e}")
+            return {"ok": False, "error": str(e), "error_type": type(e).__name__}
+
+    def serve_forever(self) -> None:
+        """Bind the socket (owner-only permissions) and serve until shutdown()"""
+        os.makedirs(os.path.dirname(self.socket_path), mode=0o700, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _ThreadingUnixServer(self.socket_path, _BrokerRequestHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.broker = self
+
+        logger.info(f"🛰️ Bitwarden broker listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self) -> None:
+        """Stop serving"""
+        if self._server:
+            self._server.shutdown()
+
+
+class BrokerClient:
+    """Persistent, authenticated connection to a running broker"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH,
+                 client_name: Optional[str] = None, token: Optional[str] = None,
+                 timeout: float = 10.0):
+        """
+        Args:
+            socket_path: Broker Unix socket path
+            client_name: Client name (default: BITWARDEN_BROKER_CLIENT)
+            token: Client token (default: BITWARDEN_BROKER_TOKEN)
+            timeout: Socket timeout in seconds
+        """
+        self.socket_path = socket_path
+        self.client_name = client_name or os.getenv('BITWARDEN_BROKER_CLIENT', '')
+        self.token = token or os.getenv('BITWARDEN_BROKER_TOKEN', '')
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise BitwardenBrokerError(f"Broker not reachable at {self.socket_path}: {e}", "ConnectionError")
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+        response = self._exchange({"op": "auth", "client": self.client_name, "token": self.token})
+        if not response.get("ok"):
+            self.close()
+            raise BitwardenBrokerError(f"Broker authentication failed for client '{self.client_name}'",
+                                       "BitwardenAuthError")
+
+    def _exchange(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self._sock.sendall(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise BitwardenBrokerError("Broker closed the connection", "ConnectionError")
+        return json.loads(line)
+
+    def request(self, op: str, **args: Any) -> Any:
+        """
+        Send one request, reconnecting once if the connection dropped
+
+        Args:
+            op: Broker operation (see BROKER_OPERATIONS)
+            **args: Operation arguments
+
+        Returns:
+            Operation result
+        """
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            try:
+                response = self._exchange({"op": op, "args": args})
+            except (OSError, BitwardenBrokerError):
+                # Stale connection (e.g. broker restarted) - reconnect once
+                self.close()
+                self._connect()
+                response = self._exchange({"op": op, "args": args})
+        if not response.get("ok"):
+            raise BitwardenBrokerError(f"{response.get('error_type')}: {response.get('error')}",
+                                       response.get('error_type'))
+        return response.get("result")
+
+    def close(self) -> None:
+        """Close the connection"""
+        if self._reader:
+            self._reader.close()
+            self._reader = None
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+
+def main(argv=None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Local Bitwarden secrets broker")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the broker daemon")
+    serve_parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    serve_parser.add_argument("--auth-file", default=DEFAULT_AUTH_FILE)
+    serve_parser.add_argument("--sync-interval", type=float, default=300.0)
+    serve_parser.add_argument("--bw-path", default="bw")
+
+    client_parser = subparsers.add_parser("add-client", help="Register a client and print its token")
+    client_parser.add_argument("name")
+    client_parser.add_argument("--auth-file", default=DEFAULT_AUTH_FILE)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "add-client":
+        print(add_client(args.name, args.auth_file))
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from core.bitwarden_cli_integration import BitwardenCLIIntegration
+
+    client = BitwardenCLIIntegration(bw_path=args.bw_path)
+    if not client.session_key and not client.unlock():
+        logger.error("❌ Broker could not unlock the vault")
+        return 1
+    client.start_sync_scheduler(interval=args.sync_interval)
+
+    broker = BitwardenBroker(client, socket_path=args.socket, auth_file=args.auth_file)
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Broker stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
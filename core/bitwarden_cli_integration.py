@@ -8,35 +8,183 @@ Agents can securely retrieve API keys from Bitwarden collections using the offic
 import os
 import json
 import logging
+import copy
+import time
 import subprocess
+import threading
 import tempfile
 import shutil
-from typing import Dict, Any, List, Optional, Tuple
+import binascii
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Union, BinaryIO
 from pathlib import Path
 import getpass
 
+from core.bitwarden_write_behind import WriteBehindQueue, PendingMutation
+from core.bitwarden_rate_limit import SERVER_COMMANDS, is_server_command, server_rate_limiter, backoff_delay
+from core.bitwarden_vault_cache import VaultSnapshot, VaultSyncScheduler, item_matches_search
+from core.bitwarden_broker import BrokerClient, BitwardenBrokerError, DEFAULT_SOCKET_PATH
+from core.bitwarden_context_pool import BitwardenContextPool, CLIContext
+from core.bitwarden_generators import generate_password, generate_passphrase, compute_totp
+from core.logging_utils import Redacted, RedactedCommand
+from core.bitwarden_audit import AuditLog
+from core.bitwarden_uri_index import URIIndex
+
 logger = logging.getLogger(__name__)
 
+# Attachments are streamed in chunks of this size, never read whole into memory
+ATTACHMENT_CHUNK_SIZE = 1024 * 1024
+
 
 class BitwardenCLIError(Exception):
     """Custom exception for Bitwarden CLI operations"""
     pass
 
 
+class BitwardenAuthError(BitwardenCLIError):
+    """Not logged in, vault locked or invalid credentials"""
+    pass
+
+
+class BitwardenNotFoundError(BitwardenCLIError):
+    """Requested object does not exist"""
+    pass
+
+
+class BitwardenRateLimitError(BitwardenCLIError):
+    """Bitwarden server rejected the request as rate-limited"""
+    pass
+
+
+class BitwardenTransientError(BitwardenCLIError):
+    """Temporary network or server failure; safe to retry"""
+    pass
+
+
+# Lower-cased stderr fragments used to classify bw failures
+_ERROR_PATTERNS = [
+    (BitwardenRateLimitError, ("too many requests", "429", "rate limit")),
+    (BitwardenAuthError, ("not logged in", "vault is locked", "invalid master password",
+                          "username or password is incorrect", "session key is invalid",
+                          "two-step login")),
+    (BitwardenNotFoundError, ("not found",)),
+    (BitwardenTransientError, ("econnreset", "etimedout", "econnrefused", "enotfound",
+                               "eai_again", "socket hang up", "fetch failed", "network",
+                               "bad gateway", "service unavailable", "gateway timeout",
+                               "502", "503", "504", "timed out")),
+]
+
+
+# Broker error types (see BitwardenBrokerError) mapped to the errors raised by CLI reads
+_BROKER_ERRORS = {
+    "ConnectionError": BitwardenTransientError,
+    "BitwardenAuthError": BitwardenAuthError,
+    "BitwardenNotFoundError": BitwardenNotFoundError,
+    "BitwardenRateLimitError": BitwardenRateLimitError,
+    "BitwardenTransientError": BitwardenTransientError,
+}
+
+
+# Commands that may run twice with the same effect. A transient failure of a
+# write (create, edit, delete, ...) can happen after the server applied it,
+# so writes are only retried when the server rejected them as rate-limited.
+_IDEMPOTENT_COMMANDS = ("list", "get", "status", "sync")
+
+
+def classify_bw_error(stderr: Optional[str]) -> type:
+    """
+    Map bw stderr output to the matching BitwardenCLIError subclass
+
+    Args:
+        stderr: Error output of the failed command
+
+    Returns:
+        Exception class to raise
+    """
+    message = (stderr or "").lower()
+    for error_class, patterns in _ERROR_PATTERNS:
+        if any(pattern in message for pattern in patterns):
+            return error_class
+    return BitwardenCLIError
+
+
 class BitwardenCLIIntegration:
     """Bitwarden CLI Integration using subprocess"""
     
-    def __init__(self, bw_path: str = "bw"):
+    def __init__(self, bw_path: str = "bw", write_behind: bool = False,
+                 flush_interval: float = 5.0, max_flush_retries: int = 3,
+                 max_retries: int = 3, retry_base_delay: float = 0.5,
+                 retry_max_delay: float = 8.0, transport: str = "cli",
+                 broker_socket: str = DEFAULT_SOCKET_PATH,
+                 appdata_dir: Optional[str] = None, parallel_contexts: int = 0,
+                 email: Optional[str] = None, password: Optional[str] = None,
+                 max_concurrent_attachments: int = 2, audit_log: Optional[AuditLog] = None):
+        """
+        Args:
+            bw_path: Path to the bw executable
+            write_behind: Queue item updates/deletes and flush them in the background
+            flush_interval: Seconds between background flushes in write-behind mode
+            max_flush_retries: Flush attempts before a queued mutation is reported as failed
+            max_retries: Retries for transient or rate-limited bw failures
+            retry_base_delay: First backoff delay in seconds (doubled per retry, with jitter)
+            retry_max_delay: Upper bound for a single backoff delay in seconds
+            transport: "cli" to run bw locally, "broker" to serve reads from a
+                running secrets broker (writes still require the CLI)
+            broker_socket: Unix socket of the secrets broker
+            appdata_dir: BITWARDENCLI_APPDATA_DIR for this instance (lets separate
+                accounts live in one process)
+            parallel_contexts: Number of isolated CLI contexts to spread read
+                commands across (0 disables the pool)
+            email: Account email (default: BITWARDEN_AGENT_EMAIL)
+            password: Master password (default: BITWARDEN_AGENT_PASSWORD)
+            max_concurrent_attachments: Upper bound on simultaneous attachment transfers
+            audit_log: Records every secret read (agent, item, cache hit, latency)
+        """
         self.bw_path = bw_path
+        self.appdata_dir = appdata_dir
+        self.transport = transport
+        self.broker: Optional[BrokerClient] = None
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
         self.session_key = os.getenv('BW_SESSION')  # Initialize from env if available
-        self._check_bw_installation()
+        if transport == "broker":
+            # Reads go over the broker socket; no local bw needed
+            self.broker = BrokerClient(broker_socket)
+        else:
+            self._check_bw_installation()
 
         # Environment variables for Bitwarden credentials
-        self.email = os.getenv('BITWARDEN_AGENT_EMAIL')
-        self.password = os.getenv('BITWARDEN_AGENT_PASSWORD')
+        self.email = email or os.getenv('BITWARDEN_AGENT_EMAIL')
+        self.password = password or os.getenv('BITWARDEN_AGENT_PASSWORD')
 
         if not self.email or not self.password:
             logger.warning("⚠️ Bitwarden credentials not found in environment variables")
+
+        # In-memory snapshot, populated by refresh_snapshot() / the sync scheduler
+        self._snapshot: Optional[VaultSnapshot] = None
+        self._stale_ids: Dict[str, float] = {}
+        self._refresh_lock = threading.Lock()
+        self._sync_scheduler: Optional[VaultSyncScheduler] = None
+        self.last_sync_time: Optional[float] = None
+        self.last_sync_duration: Optional[float] = None
+        self.sync_count = 0
+        self.sync_failures = 0
+
+        self._attachment_slots = threading.BoundedSemaphore(max_concurrent_attachments)
+        self.audit_log = audit_log
+
+        self.context_pool: Optional[BitwardenContextPool] = None
+        if parallel_contexts > 0 and not self.broker:
+            self.context_pool = BitwardenContextPool(parallel_contexts, seed_appdata_dir=appdata_dir)
+
+        self.write_queue: Optional[WriteBehindQueue] = None
+        if write_behind:
+            self.write_queue = WriteBehindQueue(
+                self._apply_mutation,
+                flush_interval=flush_interval,
+                max_retries=max_flush_retries
+            )
     
     def _check_bw_installation(self) -> None:
         """Check if Bitwarden CLI is installed and accessible"""
@@ -71,22 +219,76 @@ class BitwardenCLIIntegration:
 
     def _run_bw_command(self, command: List[str], capture_output: bool = True) -> Tuple[str, str]:
         """
-        Run Bitwarden CLI command with proper error handling
-        
+        Run Bitwarden CLI command with retries for transient failures
+
+        Local reads (list/get) are spread across the CLI context pool when
+        one is configured. Server-touching commands are throttled by the
+        shared token bucket. Rate-limited errors are retried with exponential
+        backoff and jitter, transient errors only for reads and sync; other
+        errors are raised immediately.
+
         Args:
             command: List of command arguments
             capture_output: Whether to capture stdout/stderr
             
         Returns:
             Tuple of (stdout, stderr)
+
+        Raises:
+            BitwardenCLIError: Classified subclass describing the failure
         """
+        if self.context_pool and command and command[0] in ("list", "get") \
+                and command[:2] != ["get", "attachment"]:
+            # Local reads run in parallel across isolated CLI contexts
+            with self.context_pool.acquire() as context:
+                self._prepare_context(context)
+                return self._run_with_retries(command, capture_output, context)
+
+        result = self._run_with_retries(command, capture_output)
+        if self.context_pool and command and command[0] in SERVER_COMMANDS:
+            # Local vault data changed; contexts refresh on next use
+            self.context_pool.invalidate()
+        return result
+
+    def _run_with_retries(self, command: List[str], capture_output: bool = True,
+                          context: Optional[CLIContext] = None) -> Tuple[str, str]:
+        """Run a bw command, retrying rate-limited failures (and transient ones of idempotent commands)"""
+        retryable = (BitwardenRateLimitError, BitwardenTransientError) \
+            if command and command[0] in _IDEMPOTENT_COMMANDS else (BitwardenRateLimitError,)
+        attempt = 0
+        while True:
+            if is_server_command(command):
+                server_rate_limiter.acquire()
+            try:
+                return self._run_bw_command_once(command, capture_output, context)
+            except retryable as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+                if isinstance(e, BitwardenRateLimitError):
+                    # Give the server a longer pause than for network hiccups
+                    delay += self.retry_base_delay * (2 ** attempt)
+                attempt += 1
+                logger.warning(
+                    "⚠️ bw %s failed (%s), retry %d/%d in %.2fs",
+                    command[0] if command else '', type(e).__name__, attempt, self.max_retries, delay
+                )
+                time.sleep(delay)
+
+    def _run_bw_command_once(self, command: List[str], capture_output: bool = True,
+                             context: Optional[CLIContext] = None) -> Tuple[str, str]:
+        """Run a single bw invocation and classify failures"""
         try:
             env = os.environ.copy()
-            if self.session_key:
-                env['BW_SESSION'] = self.session_key
+            session_key = context.session_key if context else self.session_key
+            if session_key:
+                env['BW_SESSION'] = session_key
+            appdata_dir = context.appdata_dir if context else self.appdata_dir
+            if appdata_dir:
+                env['BITWARDENCLI_APPDATA_DIR'] = appdata_dir
 
             full_command = [self.bw_path] + command
-            logger.info(f"Running CLI command: {' '.join(full_command)}")
+            logger.debug("Running CLI command: bw %s", RedactedCommand(command))
 
             result = subprocess.run(
                 full_command,
@@ -96,21 +298,61 @@ class BitwardenCLIIntegration:
                 check=True
             )
 
-            logger.info(f"CLI stdout: {result.stdout.strip()}")
-            logger.info(f"CLI stderr: {result.stderr.strip()}")
+            # Payloads are only redacted/truncated if DEBUG is actually enabled
+            logger.debug("CLI stdout: %s", Redacted(result.stdout))
+            logger.debug("CLI stderr: %s", Redacted(result.stderr))
 
             return result.stdout.strip(), result.stderr.strip()
             
         except subprocess.CalledProcessError as e:
-            logger.error(f"❌ Bitwarden CLI command failed: {e}")
-            logger.error(f"Command: bw {' '.join(command)}")
-            logger.error(f"Stderr: {e.stderr}")
-            logger.error(f"Stdout: {e.stdout}")
-            raise BitwardenCLIError(f"Bitwarden CLI error: {e.stderr}")
+            logger.error("❌ Bitwarden CLI command failed (exit %s): bw %s",
+                         e.returncode, RedactedCommand(command))
+            logger.error("Stderr: %s", Redacted(e.stderr))
+            logger.debug("Stdout: %s", Redacted(e.stdout))
+            raise classify_bw_error(e.stderr)(f"Bitwarden CLI error: {e.stderr}")
         except Exception as e:
-            logger.error(f"❌ Unexpected error running Bitwarden CLI: {e}")
+            logger.error("❌ Unexpected error running Bitwarden CLI: %s", e)
             raise BitwardenCLIError(f"Unexpected error: {e}")
     
+    def _prepare_context(self, context: CLIContext) -> None:
+        """
+        Bring a pooled CLI context up to date before use
+
+        Contexts are seeded from the main data.json when available (reusing
+        the main session); otherwise they log in and unlock on their own.
+        """
+        pool = self.context_pool
+        if context.generation == pool.generation:
+            return
+        if pool.can_seed():
+            pool.seed(context, self.session_key)
+            return
+        if context.session_key is None:
+            if not self.email or not self.password:
+                raise BitwardenAuthError("Bitwarden credentials not configured for CLI context")
+            logger.info(f"🔐 Logging in CLI context {context.name}")
+            stdout, _ = self._run_with_retries(["login", self.email, self.password, "--raw"], context=context)
+            context.session_key = stdout.strip()
+        else:
+            self._run_with_retries(["sync"], context=context)
+        context.generation = pool.generation
+
+    def get_items(self, item_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get several items, fetching in parallel across CLI contexts when pooled
+
+        Args:
+            item_ids: Item IDs
+
+        Returns:
+            Dictionary mapping item ID to item (or None if not found)
+        """
+        workers = self.context_pool.size if self.context_pool else 1
+        if workers <= 1 or len(item_ids) <= 1:
+            return {item_id: self.get_item(item_id) for item_id in item_ids}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(item_ids, executor.map(self.get_item, item_ids)))
+
     def is_logged_in(self) -> bool:
         """
         Check if already logged in to Bitwarden
@@ -223,7 +465,7 @@ class BitwardenCLIIntegration:
                 # Set BW_SESSION environment variable for future commands
                 os.environ['BW_SESSION'] = self.session_key
                 logger.info("✅ Successfully logged in to Bitwarden with 2FA")
-                logger.info(f"🔑 BW_SESSION environment variable set: {self.session_key[:20]}...")
+                logger.info("🔑 BW_SESSION environment variable set")
                 return True
             else:
                 logger.error(f"❌ Login with 2FA failed: {stderr}")
@@ -367,6 +609,35 @@ class BitwardenCLIIntegration:
         Returns:
             API key value or None if not found
         """
+        started = time.perf_counter()
+        pending = self._pending_mutations()
+        if self.broker:
+            if not pending:
+                api_key = self._broker_request("get_api_key", key_name=key_name, collection_name=collection_name)
+                self._audit("get_api_key", key_name, api_key is not None, started)
+                return api_key
+            # The broker does not see this process's queued writes: resolve from its items with them applied
+            collection_id = self._broker_request("collection_id", collection_name=collection_name)
+            for item in self._with_pending(self._broker_request("list_items") or [], pending):
+                if item.get('name') == key_name and collection_id in (item.get('collectionIds') or []):
+                    api_key = self._extract_api_key(item)
+                    if api_key is not None:
+                        self._audit("get_api_key", item.get('id'), True, started)
+                        return api_key
+            return None
+
+        # Fast path: resolve from the in-memory snapshot without spawning bw
+        snapshot = self._snapshot
+        collection_id = snapshot.collection_id(collection_name) if snapshot is not None else None
+        if collection_id:
+            for item in self._with_pending(snapshot.find_by_name(key_name), pending):
+                if (item.get('name') == key_name and item.get('id') not in self._stale_ids
+                        and collection_id in (item.get('collectionIds') or [])):
+                    api_key = self._extract_api_key(item)
+                    if api_key is not None:
+                        self._audit("get_api_key", item.get('id'), True, started)
+                        return api_key
+
         try:
             if not self.session_key:
                 if not self.unlock():
@@ -386,19 +657,14 @@ class BitwardenCLIIntegration:
                 return None
             
             # Get items from the collection
-            items = self.get_collection_items(target_collection['id'])
+            items = self._with_pending(self.get_collection_items(target_collection['id']))
             
             for item in items:
                 if item.get('name') == key_name:
-                    # Extract the password/API key from the item
-                    if 'login' in item and 'password' in item['login']:
-                        api_key = item['login']['password']
+                    api_key = self._extract_api_key(item)
+                    if api_key is not None:
                         logger.info(f"✅ Retrieved API key: {key_name}")
-                        return api_key
-                    elif 'notes' in item:
-                        # Fallback: check notes field
-                        api_key = item['notes']
-                        logger.info(f"✅ Retrieved API key from notes: {key_name}")
+                        self._audit("get_api_key", item.get('id'), False, started)
                         return api_key
             
             logger.warning(f"⚠️ API key '{key_name}' not found in collection '{collection_name}'")
@@ -408,6 +674,38 @@ class BitwardenCLIIntegration:
             logger.error(f"❌ Failed to retrieve API key '{key_name}': {e}")
             return None
     
+    @staticmethod
+    def _extract_api_key(item: Dict[str, Any]) -> Optional[str]:
+        """Extract the password/API key from an item, falling back to notes"""
+        if 'login' in item and 'password' in item['login']:
+            return item['login']['password']
+        elif 'notes' in item:
+            return item['notes']
+        return None
+
+    def _audit(self, operation: str, item_id: Optional[str], hit: bool, started: float) -> None:
+        """Record a secret read in the audit log, if one is configured"""
+        if self.audit_log is not None:
+            self.audit_log.record(operation, item_id, hit, started)
+
+    def _broker_request(self, op: str, **args: Any) -> Any:
+        """
+        Forward a read to the secrets broker
+
+        Only a successful response means found or not found: a failed request raises
+        the error a CLI read would (BitwardenTransientError when the broker is down),
+        so it is never mistaken for an empty vault.
+
+        Raises:
+            BitwardenCLIError: Broker unreachable, client rejected or request failed
+        """
+        try:
+            return self.broker.request(op, **args)
+        except (BitwardenBrokerError, OSError, ValueError) as e:
+            error_type = e.error_type if isinstance(e, BitwardenBrokerError) else "ConnectionError"
+            logger.error(f"❌ Broker request {op} failed: {e}")
+            raise _BROKER_ERRORS.get(error_type, BitwardenCLIError)(f"Broker request {op} failed: {e}") from e
+
     def list_available_keys(self, collection_name: str = "Shared-API-Keys") -> List[str]:
         """
         List all available API keys in a collection
@@ -430,7 +728,7 @@ class BitwardenCLIIntegration:
             if not target_collection:
                 return []
             
-            items = self.get_collection_items(target_collection['id'])
+            items = self._with_pending(self.get_collection_items(target_collection['id']))
             key_names = [item.get('name', 'Unknown') for item in items]
             
             logger.info(f"📋 Available keys in '{collection_name}': {key_names}")
@@ -447,20 +745,140 @@ class BitwardenCLIIntegration:
         Returns:
             True if sync successful, False otherwise
         """
+        started = time.time()
         try:
             logger.info("🔄 Syncing Bitwarden vault...")
             stdout, stderr = self._run_bw_command(["sync"])
             
             if "Syncing complete." in stdout or not stderr:
-                logger.info("✅ Sync completed successfully")
+                # Readers keep using the old snapshot until the new one is swapped in
+                if self._snapshot is not None:
+                    self.refresh_snapshot()
+                self.last_sync_time = started
+                self.last_sync_duration = time.time() - started
+                self.sync_count += 1
+                logger.info(f"✅ Sync completed successfully in {self.last_sync_duration:.2f}s")
                 return True
             else:
+                self.sync_failures += 1
                 logger.error(f"❌ Sync failed: {stderr}")
                 return False
                 
         except BitwardenCLIError as e:
+            self.sync_failures += 1
             logger.error(f"❌ Sync failed: {e}")
             return False
+
+    def sync_if_older_than(self, seconds: float) -> bool:
+        """
+        Sync only if the last successful sync is older than the given age
+
+        Args:
+            seconds: Maximum acceptable age of the local vault data
+
+        Returns:
+            True if the data is fresh enough or the sync succeeded
+        """
+        if self.last_sync_time is not None and time.time() - self.last_sync_time < seconds:
+            return True
+        return self.sync()
+
+    def refresh_snapshot(self) -> bool:
+        """
+        Rebuild the in-memory snapshot from the local vault and swap it in
+
+        Unchanged items (same revisionDate) are reused from the previous
+        snapshot; readers are never blocked.
+
+        Returns:
+            True if the snapshot was refreshed, False otherwise
+        """
+        with self._refresh_lock:
+            started = time.time()
+            try:
+                # Call bw directly so a failure keeps the old snapshot instead of emptying it
+                stdout, stderr = self._run_bw_command(["list", "items"])
+                items = json.loads(stdout) if stdout else []
+            except (BitwardenCLIError, json.JSONDecodeError) as e:
+                logger.error(f"❌ Failed to refresh vault snapshot: {e}")
+                return False
+
+            try:
+                stdout, stderr = self._run_bw_command(["list", "collections"])
+                collections = json.loads(stdout) if stdout else []
+            except (BitwardenCLIError, json.JSONDecodeError) as e:
+                # Keep the previous snapshot's collections
+                logger.warning(f"⚠️ Failed to refresh collections: {e}")
+                collections = None
+
+            snapshot = VaultSnapshot(items, previous=self._snapshot, collections=collections)
+            self._snapshot = snapshot
+            # Writes that happened before this refresh started are now reflected
+            for item_id, written_at in list(self._stale_ids.items()):
+                if written_at < started:
+                    self._stale_ids.pop(item_id, None)
+
+            logger.info(
+                f"📦 Vault snapshot refreshed: {len(snapshot)} items "
+                f"(+{snapshot.added} ~{snapshot.updated} -{snapshot.removed})"
+            )
+            return True
+
+    @property
+    def snapshot(self) -> Optional[VaultSnapshot]:
+        """Current in-memory vault snapshot, if one has been loaded"""
+        return self._snapshot
+
+    def _mark_stale(self, item_id: str) -> None:
+        """Bypass the snapshot for an item written by this process until the next refresh"""
+        if self._snapshot is not None and item_id:
+            self._stale_ids[item_id] = time.time()
+
+    def start_sync_scheduler(self, interval: float = 300.0, jitter: float = 0.1) -> None:
+        """
+        Load the snapshot and keep it fresh with periodic background syncs
+
+        Args:
+            interval: Seconds between syncs
+            jitter: Fraction of the interval to randomize by
+        """
+        if self._snapshot is None:
+            self.refresh_snapshot()
+        if self._sync_scheduler is None:
+            self._sync_scheduler = VaultSyncScheduler(self, interval=interval, jitter=jitter)
+        self._sync_scheduler.start()
+
+    def stop_sync_scheduler(self) -> None:
+        """Stop background syncing (the snapshot stays available)"""
+        if self._sync_scheduler:
+            self._sync_scheduler.stop()
+
+    def close(self) -> None:
+        """Stop background work, flush queued writes and remove the CLI context copies of the vault"""
+        self.stop_sync_scheduler()
+        if self.write_queue:
+            self.write_queue.close()
+        if self.context_pool:
+            self.context_pool.close()
+        if self.broker:
+            self.broker.close()
+
+    def get_sync_metrics(self) -> Dict[str, Any]:
+        """
+        Get sync and snapshot metrics
+
+        Returns:
+            Dictionary with last sync time/duration, counters and snapshot size
+        """
+        snapshot = self._snapshot
+        return {
+            "last_sync_time": self.last_sync_time,
+            "last_sync_duration": self.last_sync_duration,
+            "sync_count": self.sync_count,
+            "sync_failures": self.sync_failures,
+            "snapshot_items": len(snapshot) if snapshot else 0,
+            "snapshot_loaded_at": snapshot.loaded_at if snapshot else None,
+        }
     
     def logout(self) -> bool:
         """
@@ -531,6 +949,7 @@ class BitwardenCLIIntegration:
                     if collection_id and item_id:
                         self._add_item_to_collection(item_id, collection_id)
                     
+                    self._mark_stale(item_id)
                     logger.info(f"✅ Created password item: {name}")
                     return item_id
                 else:
@@ -587,6 +1006,7 @@ class BitwardenCLIIntegration:
                     if collection_id and item_id:
                         self._add_item_to_collection(item_id, collection_id)
                     
+                    self._mark_stale(item_id)
                     logger.info(f"✅ Created note item: {name}")
                     return item_id
                 else:
@@ -604,13 +1024,42 @@ class BitwardenCLIIntegration:
     def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
         """
         Get item details by ID
-        
+
+        Served from the in-memory snapshot when one is loaded (the returned
+        dict is shared and must be treated as read-only). In write-behind
+        mode, queued mutations are applied to the result so reads always
+        see this process's own writes.
+
         Args:
             item_id: Item ID
             
         Returns:
             Item dictionary or None if not found
         """
+        started = time.perf_counter()
+        pending = self.write_queue.get_pending(item_id) if self.write_queue else None
+        if pending and pending.delete:
+            return None
+
+        if self.broker:
+            item = self._broker_request("get_item", item_id=item_id)
+            hit = item is not None
+        else:
+            item = None
+            snapshot = self._snapshot
+            if snapshot is not None and item_id not in self._stale_ids:
+                item = snapshot.get(item_id)
+            hit = item is not None
+            if item is None:
+                item = self._fetch_item(item_id)
+        self._audit("get_item", item_id, hit, started)
+        if item and pending:
+            item = copy.deepcopy(item)
+            self._apply_updates(item, pending.updates)
+        return item
+
+    def _fetch_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Read an item from the vault, ignoring queued mutations"""
         try:
             if not self.session_key:
                 if not self.unlock():
@@ -622,7 +1071,7 @@ class BitwardenCLIIntegration:
             
             if stdout:
                 item = json.loads(stdout)
-                logger.info(f"✅ Retrieved item: {item.get('name', 'Unknown')}")
+                logger.debug("✅ Retrieved item: %s", item_id)
                 return item
             else:
                 logger.warning(f"⚠️ Item not found: {item_id}")
@@ -643,29 +1092,44 @@ class BitwardenCLIIntegration:
         Returns:
             True if successful, False otherwise
         """
+        if self.write_queue:
+            if not self.write_queue.enqueue_update(item_id, updates):
+                logger.warning(f"⚠️ Not updating item {item_id}: its delete is already queued")
+                return False
+            logger.info(f"📝 Queued update for item: {item_id}")
+            return True
+
+        return self._write_item_updates(item_id, updates)
+
+    @staticmethod
+    def _apply_updates(item: Dict[str, Any], updates: Dict[str, Any]) -> None:
+        """Apply field updates in place, supporting nested keys like 'login.username'"""
+        for key, value in updates.items():
+            if key in item:
+                item[key] = value
+            elif '.' in key:
+                keys = key.split('.')
+                current = item
+                for k in keys[:-1]:
+                    if k not in current:
+                        current[k] = {}
+                    current = current[k]
+                current[keys[-1]] = value
+
+    def _write_item_updates(self, item_id: str, updates: Dict[str, Any]) -> bool:
+        """Fetch an item, apply updates and write it back with bw edit"""
         try:
             if not self.session_key:
                 if not self.unlock():
                     return False
             
             # Get current item
-            current_item = self.get_item(item_id)
+            current_item = self._fetch_item(item_id)
             if not current_item:
                 return False
             
             # Apply updates
-            for key, value in updates.items():
-                if key in current_item:
-                    current_item[key] = value
-                elif '.' in key:
-                    # Handle nested keys (e.g., 'login.username')
-                    keys = key.split('.')
-                    current = current_item
-                    for k in keys[:-1]:
-                        if k not in current:
-                            current[k] = {}
-                        current = current[k]
-                    current[keys[-1]] = value
+            self._apply_updates(current_item, updates)
             
             # Create temporary file for updated item data
             with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
@@ -679,6 +1143,7 @@ class BitwardenCLIIntegration:
                 ])
                 
                 if stdout:
+                    self._mark_stale(item_id)
                     logger.info(f"✅ Updated item: {item_id}")
                     return True
                 else:
@@ -701,8 +1166,17 @@ class BitwardenCLIIntegration:
             item_id: Item ID
             
         Returns:
-            True if successful, False otherwise
+            True if successful (or queued in write-behind mode), False otherwise
         """
+        if self.write_queue:
+            self.write_queue.enqueue_delete(item_id)
+            logger.info(f"📝 Queued delete for item: {item_id}")
+            return True
+
+        return self._delete_item_now(item_id)
+
+    def _delete_item_now(self, item_id: str) -> bool:
+        """Delete an item immediately via bw delete"""
         try:
             if not self.session_key:
                 if not self.unlock():
@@ -713,6 +1187,7 @@ class BitwardenCLIIntegration:
             ])
             
             if not stderr:
+                self._mark_stale(item_id)
                 logger.info(f"✅ Deleted item: {item_id}")
                 return True
             else:
@@ -726,13 +1201,25 @@ class BitwardenCLIIntegration:
     def search_items(self, search_term: str) -> List[Dict[str, Any]]:
         """
         Search for items by name or content
-        
+
+        Served from the in-memory snapshot when one is loaded (this is also
+        what the secrets broker answers from), with queued writes applied
+        before matching.
+
         Args:
             search_term: Search term
             
         Returns:
             List of matching items
         """
+        if self.broker:
+            return self._with_pending(self._broker_request("search_items", search_term=search_term) or [])
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale_ids:
+            items = [item for item in self._with_pending(snapshot.items)
+                     if item_matches_search(item, search_term)]
+            logger.info("🔍 Found %d items matching: %s", len(items), Redacted(search_term, 50))
+            return items
         try:
             if not self.session_key:
                 if not self.unlock():
@@ -743,17 +1230,355 @@ class BitwardenCLIIntegration:
             ])
             
             if stdout:
-                items = json.loads(stdout)
-                logger.info(f"🔍 Found {len(items)} items matching: {search_term}")
+                items = self._with_pending(json.loads(stdout))
+                logger.info("🔍 Found %d items matching: %s", len(items), Redacted(search_term, 50))
                 return items
             else:
-                logger.info(f"🔍 No items found matching: {search_term}")
+                logger.info("🔍 No items found matching: %s", Redacted(search_term, 50))
                 return []
-                
+
+        except (BitwardenRateLimitError, BitwardenTransientError):
+            # Don't disguise a persistent outage as an empty result
+            raise
         except Exception as e:
             logger.error(f"❌ Failed to search items: {e}")
             return []
 
+    def list_items(self) -> List[Dict[str, Any]]:
+        """
+        List all items in the vault
+
+        Served from the in-memory snapshot when one is loaded. In write-behind
+        mode, queued updates and deletes are applied to the result.
+
+        Returns:
+            List of item dictionaries
+        """
+        if self.broker:
+            return self._with_pending(self._broker_request("list_items") or [])
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale_ids:
+            return self._with_pending(snapshot.items)
+        return self._with_pending(self._list_items_from_cli())
+
+    def _list_items_from_cli(self) -> List[Dict[str, Any]]:
+        """List all items via bw, bypassing the snapshot"""
+        try:
+            if not self.session_key:
+                if not self.unlock():
+                    return []
+
+            stdout, stderr = self._run_bw_command(["list", "items"])
+
+            if stdout:
+                items = json.loads(stdout)
+                logger.info("📋 Retrieved %d items", len(items))
+                return items
+            else:
+                logger.info("📋 No items found")
+                return []
+
+        except (BitwardenRateLimitError, BitwardenTransientError):
+            # Don't disguise a persistent outage as an empty result
+            raise
+        except Exception as e:
+            logger.error(f"❌ Failed to list items: {e}")
+            return []
+
+    def find_logins_for_url(self, url: str) -> List[Dict[str, Any]]:
+        """
+        Find login items for a website, ranked by match specificity
+
+        Honours each URI's match detection type (domain, host, starts with,
+        exact, regex, never). Served from the snapshot's URI index when a
+        snapshot is loaded; otherwise the index is built from list_items().
+
+        Args:
+            url: Website URL or bare host (e.g. 'example.com')
+
+        Returns:
+            List of {"item", "uri", "match"} dicts, best match first
+        """
+        started = time.perf_counter()
+        if self.broker:
+            matches = self._broker_request("find_logins_for_url", url=url) or []
+            pending = self._pending_mutations()
+            fresh_matches = []
+            for match in matches:
+                # Queued deletes drop the match, queued updates patch its item
+                items = self._with_pending([match["item"]], pending)
+                if items:
+                    fresh_matches.append(dict(match, item=items[0]))
+            return fresh_matches
+
+        snapshot = self._snapshot
+        index = snapshot.uri_index if snapshot is not None else URIIndex(self.list_items())
+        matches = index.find(url)
+        if snapshot is not None and (self._stale_ids or self.write_queue is not None):
+            # Re-read items changed since the snapshot was taken
+            fresh_matches = []
+            for match in matches:
+                item_id = match["item"].get('id')
+                if item_id in self._stale_ids or (self.write_queue is not None and self.write_queue.get_pending(item_id)):
+                    item = self.get_item(item_id)
+                    if item is None:
+                        continue
+                    match = dict(match, item=item)
+                fresh_matches.append(match)
+            matches = fresh_matches
+        for match in matches:
+            self._audit("find_logins_for_url", match["item"].get('id'), snapshot is not None, started)
+        logger.info("🔗 Found %d logins for %s", len(matches), Redacted(url, 100))
+        return matches
+
+    # Attachment Operations
+    def list_attachments(self, item_id: str) -> List[Dict[str, Any]]:
+        """
+        List attachments of an item
+
+        Args:
+            item_id: Item ID
+
+        Returns:
+            List of attachment metadata (id, fileName, size, sizeName)
+        """
+        item = self.get_item(item_id)
+        if not item:
+            return []
+        return [
+            {key: attachment.get(key) for key in ("id", "fileName", "size", "sizeName")}
+            for attachment in item.get('attachments') or []
+        ]
+
+    def download_attachment(self, item_id: str, attachment_id: str,
+                            destination: Union[str, Path, BinaryIO]) -> Optional[str]:
+        """
+        Download an attachment to a path or file-like object
+
+        bw writes the file to disk (--output); file-like destinations are fed
+        from a private temp file in chunks, so the content is never held in
+        memory or logged. Concurrent transfers are bounded.
+
+        Args:
+            item_id: Item ID
+            attachment_id: Attachment ID
+            destination: Target file path, existing directory, or writable binary file object
+
+        Returns:
+            Path written to (or the attachment ID for file objects), None on failure
+        """
+        started = time.perf_counter()
+        with self._attachment_slots:
+            try:
+                if not self.session_key:
+                    if not self.unlock():
+                        return None
+
+                if hasattr(destination, 'write'):
+                    temp_dir = tempfile.mkdtemp(prefix="bw-attachment-")
+                    try:
+                        temp_path = os.path.join(temp_dir, "attachment")
+                        self._run_bw_command([
+                            "get", "attachment", attachment_id, "--itemid", item_id, "--output", temp_path
+                        ])
+                        with open(temp_path, 'rb') as source:
+                            shutil.copyfileobj(source, destination, ATTACHMENT_CHUNK_SIZE)
+                    finally:
+                        shutil.rmtree(temp_dir, ignore_errors=True)
+                    logger.info(f"✅ Downloaded attachment {attachment_id} of item {item_id}")
+                    self._audit("download_attachment", item_id, False, started)
+                    return attachment_id
+
+                target = str(destination)
+                if os.path.isdir(target):
+                    file_name = next(
+                        (a.get('fileName') for a in self.list_attachments(item_id) if a.get('id') == attachment_id),
+                        None
+                    )
+                    target = self._attachment_target(target, file_name, attachment_id)
+
+                self._run_bw_command([
+                    "get", "attachment", attachment_id, "--itemid", item_id, "--output", target
+                ])
+                logger.info(f"✅ Downloaded attachment {attachment_id} of item {item_id} to {target}")
+                self._audit("download_attachment", item_id, False, started)
+                return target
+
+            except Exception as e:
+                logger.error(f"❌ Failed to download attachment {attachment_id}: {e}")
+                return None
+
+    @staticmethod
+    def _attachment_target(directory: str, file_name: Optional[str], attachment_id: str) -> str:
+        """
+        Path inside directory for an attachment, never outside it
+
+        The file name comes from the vault, so it is reduced to its last path
+        component; empty, "." and ".." names fall back to the attachment ID.
+
+        Raises:
+            BitwardenCLIError: The resulting path would leave the directory (e.g. via a symlink)
+        """
+        name = os.path.basename((file_name or "").replace("\\", "/"))
+        if name in ("", ".", ".."):
+            name = attachment_id
+        target = os.path.join(directory, name)
+        real_directory = os.path.realpath(directory)
+        if os.path.commonpath([real_directory, os.path.realpath(target)]) != real_directory:
+            raise BitwardenCLIError(f"Attachment file name {file_name!r} leaves the destination directory")
+        return target
+
+    def create_attachment(self, item_id: str, source: Union[str, Path, BinaryIO],
+                          file_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Attach a file to an item
+
+        Args:
+            item_id: Item ID
+            source: File path or readable binary file object (streamed to a temp file in chunks)
+            file_name: Attachment name for file objects (default: "attachment")
+
+        Returns:
+            Updated item dictionary if successful, None otherwise
+        """
+        with self._attachment_slots:
+            temp_dir = None
+            try:
+                if not self.session_key:
+                    if not self.unlock():
+                        return None
+
+                if hasattr(source, 'read'):
+                    temp_dir = tempfile.mkdtemp(prefix="bw-attachment-")
+                    path = os.path.join(temp_dir, file_name or "attachment")
+                    with open(path, 'wb') as target:
+                        shutil.copyfileobj(source, target, ATTACHMENT_CHUNK_SIZE)
+                else:
+                    path = str(source)
+
+                stdout, stderr = self._run_bw_command([
+                    "create", "attachment", "--file", path, "--itemid", item_id
+                ])
+
+                if stdout:
+                    self._mark_stale(item_id)
+                    logger.info(f"✅ Created attachment on item: {item_id}")
+                    return json.loads(stdout)
+                else:
+                    logger.error(f"❌ Failed to create attachment: {stderr}")
+                    return None
+
+            except Exception as e:
+                logger.error(f"❌ Failed to create attachment: {e}")
+                return None
+            finally:
+                if temp_dir:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+
+    # Generator and TOTP Operations
+    def generate_password(self, passphrase: bool = False, **options: Any) -> Optional[str]:
+        """
+        Generate a password or passphrase in-process (no bw spawn)
+
+        Args:
+            passphrase: Generate a passphrase instead of a password
+            **options: Options of generate_password / generate_passphrase
+                (e.g. length, special, words, separator, capitalize)
+
+        Returns:
+            Generated password, None on invalid options
+        """
+        try:
+            if passphrase:
+                return generate_passphrase(**options)
+            return generate_password(**options)
+        except (ValueError, TypeError) as e:
+            logger.error(f"❌ Failed to generate password: {e}")
+            return None
+
+    def get_totp(self, item_id: str) -> Optional[Tuple[str, int]]:
+        """
+        Compute the current TOTP code of a login item from cached item data
+
+        Args:
+            item_id: Item ID
+
+        Returns:
+            Tuple of (code, seconds remaining), None if the item has no TOTP
+        """
+        item = self.get_item(item_id)
+        totp = ((item or {}).get('login') or {}).get('totp')
+        if not totp:
+            logger.warning(f"⚠️ No TOTP configured for item: {item_id}")
+            return None
+        try:
+            return compute_totp(totp)
+        except (ValueError, binascii.Error) as e:
+            logger.error(f"❌ Invalid TOTP secret on item {item_id}: {e}")
+            return None
+
+    # Write-behind Operations
+    def _pending_mutations(self) -> Dict[str, PendingMutation]:
+        """Queued and in-flight mutations by item ID (empty without write-behind)"""
+        return self.write_queue.pending_mutations() if self.write_queue else {}
+
+    def _with_pending(self, items: List[Dict[str, Any]],
+                      pending: Optional[Dict[str, PendingMutation]] = None) -> List[Dict[str, Any]]:
+        """
+        Apply queued mutations to items read from the vault, so reads see this
+        process's own writes: deleted items are dropped, updated ones copied
+        and patched (shared snapshot items are never modified)
+
+        Args:
+            items: Items as read from the snapshot, the broker or bw
+            pending: Mutations from _pending_mutations() (fetched if not given)
+
+        Returns:
+            Items as they will be once the queue is flushed
+        """
+        if pending is None:
+            pending = self._pending_mutations()
+        if not pending:
+            return items
+        result = []
+        for item in items:
+            mutation = pending.get(item.get('id'))
+            if mutation is None:
+                result.append(item)
+            elif not mutation.delete:
+                item = copy.deepcopy(item)
+                self._apply_updates(item, mutation.updates)
+                result.append(item)
+        return result
+
+    def _apply_mutation(self, mutation: PendingMutation) -> bool:
+        """Write a coalesced mutation to the vault (write-behind callback)"""
+        if mutation.delete:
+            return self._delete_item_now(mutation.item_id)
+        return self._write_item_updates(mutation.item_id, mutation.updates)
+
+    def flush(self) -> bool:
+        """
+        Flush queued mutations to the vault
+
+        Returns:
+            True if nothing is left pending, False if any mutation failed
+        """
+        if not self.write_queue:
+            return True
+        return self.write_queue.flush()
+
+    def failed_mutations(self) -> List[PendingMutation]:
+        """
+        Get mutations that could not be written after all retries
+
+        Returns:
+            List of failed mutations with their last error
+        """
+        if not self.write_queue:
+            return []
+        return self.write_queue.failed_mutations()
+
     # Folder Operations
     def create_folder(self, name: str) -> Optional[str]:
         """
@@ -0,0 +1,124 @@
+"""
+Pool of independent Bitwarden CLI contexts
+
+The bw CLI keeps all state in one data.json per appdata directory, so
+concurrent invocations against the same directory contend. Each context in
+the pool has its own BITWARDENCLI_APPDATA_DIR and session, which lets read
+commands from several agents run in parallel.
+"""
+
+import os
+import sys
+import queue
+import atexit
+import shutil
+import logging
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, List, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+def default_appdata_dir() -> str:
+    """Appdata directory the bw CLI uses when BITWARDENCLI_APPDATA_DIR is unset"""
+    if os.getenv('BITWARDENCLI_APPDATA_DIR'):
+        return os.environ['BITWARDENCLI_APPDATA_DIR']
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Bitwarden CLI")
+    if sys.platform == "win32":
+        return os.path.join(os.getenv('APPDATA', ''), "Bitwarden CLI")
+    config_home = os.getenv('XDG_CONFIG_HOME', os.path.expanduser("~/.config"))
+    return os.path.join(config_home, "Bitwarden CLI")
+
+
+@dataclass
+class CLIContext:
+    """One isolated bw CLI state directory plus its session"""
+    name: str
+    appdata_dir: str
+    session_key: Optional[str] = None
+    generation: int = -1  # Pool generation this context was last refreshed for
+
+
+class BitwardenContextPool:
+    """Hands out CLI contexts to concurrent readers"""
+
+    def __init__(self, size: int, base_dir: Optional[str] = None,
+                 seed_appdata_dir: Optional[str] = None):
+        """
+        Args:
+            size: Number of independent contexts
+            base_dir: Directory to create context appdata dirs in (default: a private
+                temp dir, removed by close() or at exit)
+            seed_appdata_dir: Logged-in appdata dir whose data.json is copied into
+                each context, so contexts reuse the main session without a new login
+        """
+        # Every context holds a copy of the encrypted vault: owner-only access
+        self._owns_base_dir = base_dir is None
+        self.base_dir = base_dir or tempfile.mkdtemp(prefix="bw-contexts-")
+        os.makedirs(self.base_dir, mode=0o700, exist_ok=True)
+        os.chmod(self.base_dir, 0o700)
+        self.seed_appdata_dir = seed_appdata_dir or default_appdata_dir()
+        self.generation = 0
+        self.contexts: List[CLIContext] = []
+        self._available: "queue.Queue[CLIContext]" = queue.Queue()
+
+        for index in range(size):
+            appdata_dir = os.path.join(self.base_dir, f"context-{index}")
+            os.makedirs(appdata_dir, mode=0o700, exist_ok=True)
+            context = CLIContext(name=f"context-{index}", appdata_dir=appdata_dir)
+            self.contexts.append(context)
+            self._available.put(context)
+        atexit.register(self.close)
+
+    @property
+    def size(self) -> int:
+        return len(self.contexts)
+
+    def can_seed(self) -> bool:
+        """Whether a logged-in data.json is available to copy into contexts"""
+        return os.path.exists(os.path.join(self.seed_appdata_dir, "data.json"))
+
+    def seed(self, context: CLIContext, session_key: Optional[str]) -> None:
+        """
+        Copy the seed data.json into a context and adopt the seed session
+
+        The copy keeps the same encrypted user key, so the main session
+        unlocks it without another login.
+        """
+        source = os.path.join(self.seed_appdata_dir, "data.json")
+        target = os.path.join(context.appdata_dir, "data.json")
+        temp_target = target + ".tmp"
+        shutil.copyfile(source, temp_target)
+        os.chmod(temp_target, 0o600)
+        os.replace(temp_target, target)
+        context.session_key = session_key
+        context.generation = self.generation
+
+    def invalidate(self) -> None:
+        """Mark every context stale (e.g. after a sync or write in the main context)"""
+        self.generation += 1
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[CLIContext]:
+        """
+        Borrow a context exclusively for the duration of the block
+
+        Args:
+            timeout: Seconds to wait for a free context (None waits indefinitely)
+        """
+        context = self._available.get(timeout=timeout)
+        try:
+            yield context
+        finally:
+            self._available.put(context)
+
+    def close(self) -> None:
+        """Remove all context directories (and the temp dir the pool created)"""
+        if self._owns_base_dir:
+            shutil.rmtree(self.base_dir, ignore_errors=True)
+        else:
+            for context in self.contexts:
+                shutil.rmtree(context.appdata_dir, ignore_errors=True)
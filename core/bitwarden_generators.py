@@ -0,0 +1,222 @@
+"""
+In-process password/passphrase generation and TOTP computation
+
+Mirrors the options of `bw generate` and computes RFC 6238 codes from cached
+item data, so agents don't pay a bw process spawn for either. Passphrases use
+the EFF large wordlist, as bw does (bundled in core/data, CC BY 3.0 US,
+https://www.eff.org/dice).
+"""
+
+import os
+import re
+import time
+import hmac
+import base64
+import struct
+import hashlib
+import secrets
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs, unquote
+
+# Same character sets as the Bitwarden generator (ambiguous characters excluded by default)
+LOWERCASE = "abcdefghijkmnopqrstuvwxyz"
+UPPERCASE = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+NUMBERS = "23456789"
+SPECIAL = "!@#$%^&*"
+AMBIGUOUS_LOWERCASE = "l"
+AMBIGUOUS_UPPERCASE = "IO"
+AMBIGUOUS_NUMBERS = "01"
+
+STEAM_ALPHABET = "23456789BCDFGHJKMNPQRTVWXY"
+EFF_WORDLIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "eff_large_wordlist.txt")
+# Plain ASCII words; hyphenated EFF words ("t-shirt") are kept as bw keeps them
+_WORD = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+
+def generate_password(length: int = 14, uppercase: bool = True, lowercase: bool = True,
+                      number: bool = True, special: bool = False, min_number: int = 1,
+                      min_special: int = 1, ambiguous: bool = False) -> str:
+    """
+    Generate a random password (same options as `bw generate`)
+
+    Args:
+        length: Password length (minimum 5, as in bw)
+        uppercase: Include uppercase characters
+        lowercase: Include lowercase characters
+        number: Include numbers
+        special: Include special characters
+        min_number: Minimum count of numbers when numbers are enabled
+        min_special: Minimum count of special characters when enabled
+        ambiguous: Also allow ambiguous characters (l, I, O, 0, 1)
+
+    Returns:
+        Generated password
+    """
+    if length < 5:
+        raise ValueError("Password length must be at least 5")
+    if not (uppercase or lowercase or number or special):
+        raise ValueError("At least one character class must be enabled")
+
+    pools = []
+    required = []
+    if lowercase:
+        pool = LOWERCASE + (AMBIGUOUS_LOWERCASE if ambiguous else "")
+        pools.append(pool)
+        required.append(pool)
+    if uppercase:
+        pool = UPPERCASE + (AMBIGUOUS_UPPERCASE if ambiguous else "")
+        pools.append(pool)
+        required.append(pool)
+    if number:
+        pool = NUMBERS + (AMBIGUOUS_NUMBERS if ambiguous else "")
+        pools.append(pool)
+        required.extend([pool] * max(min_number, 1))
+    if special:
+        pools.append(SPECIAL)
+        required.extend([SPECIAL] * max(min_special, 1))
+
+    if len(required) > length:
+        raise ValueError("Password length is too short for the requested minimums")
+
+    all_characters = "".join(pools)
+    characters = [secrets.choice(pool) for pool in required]
+    characters += [secrets.choice(all_characters) for _ in range(length - len(required))]
+    # Fisher-Yates shuffle with a CSPRNG so required characters land anywhere
+    for i in range(len(characters) - 1, 0, -1):
+        j = secrets.randbelow(i + 1)
+        characters[i], characters[j] = characters[j], characters[i]
+    return "".join(characters)
+
+
+@lru_cache(maxsize=4)
+def load_wordlist(path: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Load a passphrase wordlist
+
+    Accepts the EFF format ("11111<TAB>abacus") or one word per line.
+    Defaults to BITWARDEN_WORDLIST, then the bundled EFF large wordlist
+    (7776 words, ~12.9 bits per word, the same list as bw).
+
+    Args:
+        path: Wordlist file path
+
+    Returns:
+        Tuple of words
+    """
+    path = path or os.getenv('BITWARDEN_WORDLIST') or EFF_WORDLIST
+    if not os.path.exists(path):
+        raise ValueError(f"Wordlist not found: {path} (set BITWARDEN_WORDLIST)")
+
+    words = []
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+            word = parts[-1]
+            # Keep short, plain ASCII lowercase words (other lists have names, plurals and accents)
+            if _WORD.fullmatch(word) and 3 <= len(word) <= 9:
+                words.append(word)
+    if len(words) < 1000:
+        raise ValueError(f"Wordlist {path} is too small for secure passphrases")
+    return tuple(words)
+
+
+def generate_passphrase(words: int = 3, separator: str = "-", capitalize: bool = False,
+                        include_number: bool = False, wordlist: Optional[str] = None) -> str:
+    """
+    Generate a passphrase (same options as `bw generate --passphrase`)
+
+    Args:
+        words: Number of words (minimum 3, as in bw)
+        separator: Word separator
+        capitalize: Capitalize each word
+        include_number: Append a digit to one random word
+        wordlist: Wordlist file path (see load_wordlist)
+
+    Returns:
+        Generated passphrase
+    """
+    if words < 3:
+        raise ValueError("Passphrase must contain at least 3 words")
+    word_pool = load_wordlist(wordlist)
+
+    chosen: List[str] = [secrets.choice(word_pool) for _ in range(words)]
+    if capitalize:
+        chosen = [word.capitalize() for word in chosen]
+    if include_number:
+        index = secrets.randbelow(words)
+        chosen[index] += str(secrets.randbelow(10))
+    return separator.join(chosen)
+
+
+def parse_totp(totp: str) -> dict:
+    """
+    Parse a Bitwarden login.totp value
+
+    Supports bare base32 secrets, otpauth://totp/ URIs and steam:// secrets.
+
+    Args:
+        totp: Value of the item's login.totp field
+
+    Returns:
+        Dictionary with secret (bytes), digits, period, algorithm and steam flag
+    """
+    params = {"digits": 6, "period": 30, "algorithm": "sha1", "steam": False}
+    value = totp.strip()
+
+    if value.lower().startswith("otpauth://"):
+        query = parse_qs(urlparse(value).query)
+        secret = unquote(query.get("secret", [""])[0])
+        if "digits" in query:
+            params["digits"] = int(query["digits"][0])
+        if "period" in query:
+            params["period"] = int(query["period"][0])
+        if "algorithm" in query:
+            params["algorithm"] = query["algorithm"][0].lower()
+    elif value.lower().startswith("steam://"):
+        secret = value[len("steam://"):]
+        params["digits"] = 5
+        params["steam"] = True
+    else:
+        secret = value
+
+    secret = secret.replace(" ", "").upper()
+    secret += "=" * (-len(secret) % 8)
+    params["secret"] = base64.b32decode(secret)
+    if params["algorithm"] not in ("sha1", "sha256", "sha512"):
+        raise ValueError(f"Unsupported TOTP algorithm: {params['algorithm']}")
+    return params
+
+
+def compute_totp(totp: str, timestamp: Optional[float] = None) -> Tuple[str, int]:
+    """
+    Compute the current TOTP code (RFC 6238)
+
+    Args:
+        totp: Value of the item's login.totp field
+        timestamp: Unix time to compute for (default: now)
+
+    Returns:
+        Tuple of (code, seconds until the code changes)
+    """
+    params = parse_totp(totp)
+    now = time.time() if timestamp is None else timestamp
+    period = params["period"]
+    counter = int(now // period)
+
+    digest = hmac.new(params["secret"], struct.pack(">Q", counter),
+                      getattr(hashlib, params["algorithm"])).digest()
+    offset = digest[-1] & 0x0F
+    code_int = struct.unpack(">I", digest[offset:offset + 4])[0] & 0x7FFFFFFF
+
+    if params["steam"]:
+        code = ""
+        for _ in range(params["digits"]):
+            code += STEAM_ALPHABET[code_int % len(STEAM_ALPHABET)]
+            code_int //= len(STEAM_ALPHABET)
+    else:
+        code = str(code_int % (10 ** params["digits"])).zfill(params["digits"])
+
+    return code, period - int(now % period)
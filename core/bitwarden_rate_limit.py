@@ -0,0 +1,103 @@
+"""
+Client-side rate limiting and backoff for Bitwarden CLI calls
+
+A process-wide token bucket throttles commands that reach the Bitwarden
+server, so a busy crew does not trip the server's own rate limits.
+"""
+
+import os
+import time
+import random
+import threading
+
+# bw subcommands that talk to the Bitwarden server (reads use the local cache)
+SERVER_COMMANDS = {
+    "login", "logout", "sync", "create", "edit", "delete",
+    "restore", "share", "move", "confirm", "send", "receive"
+}
+
+
+def is_server_command(command) -> bool:
+    """Whether a bw command (argument list) reaches the Bitwarden server"""
+    if not command:
+        return False
+    # Attachment downloads are fetched from the server on every call
+    return command[0] in SERVER_COMMANDS or list(command[:2]) == ["get", "attachment"]
+
+
+class TokenBucket:
+    """Thread-safe token bucket"""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if available
+
+        Returns:
+            0.0 if a token was taken, otherwise seconds until one is available
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Block until a token is available
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if a token was taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Exponential backoff with full jitter
+
+    Args:
+        attempt: Zero-based retry attempt
+        base_delay: Delay for the first retry in seconds
+        max_delay: Upper bound for the delay in seconds
+
+    Returns:
+        Seconds to sleep before the next attempt
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+# Shared by every BitwardenCLIIntegration instance in the process
+server_rate_limiter = TokenBucket(
+    rate=float(os.getenv('BITWARDEN_SERVER_RATE', '2')),
+    capacity=int(os.getenv('BITWARDEN_SERVER_BURST', '5'))
+)
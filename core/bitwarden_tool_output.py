@@ -0,0 +1,244 @@
+"""
+Output shaping for the Bitwarden agent tool
+
+Keeps tool responses small enough for the manager's context window:
+paging (offset/limit), field projection with dotted paths, name filters
+and compact JSON with a hard size cap.
+"""
+
+import os
+import json
+import shlex
+from typing import Dict, Any, List, Optional, Tuple
+
+# Defaults can be tuned per deployment via environment variables
+DEFAULT_PAGE_SIZE = int(os.getenv('BITWARDEN_TOOL_PAGE_SIZE', '20'))
+DEFAULT_MAX_CHARS = int(os.getenv('BITWARDEN_TOOL_MAX_CHARS', '4000'))
+# Smallest size cap honoured: below it not even one shortened item fits
+MIN_MAX_CHARS = 200
+PAGING_USAGE = "offset=<n> limit=<n> max_chars=<n> fields=<a,b.c> name=<text>"
+
+DEFAULT_LIST_FIELDS = ["id", "name"]
+DEFAULT_ITEM_FIELDS = [
+    "id", "name", "type", "login.username", "login.password",
+    "login.uris.uri", "notes", "fields.name", "fields.value"
+]
+# Fields shown for find logins matches ({"item", "uri", "match"})
+LOGIN_MATCH_FIELDS = ["item.id", "item.name", "item.login.username", "uri", "match"]
+
+PAGING_OPTIONS = ("offset", "limit", "fields", "name", "max_chars")
+
+# key=value options of the generate command and their types
+GENERATOR_OPTIONS = {
+    "length": int, "uppercase": bool, "lowercase": bool, "number": bool,
+    "special": bool, "min_number": int, "min_special": int, "ambiguous": bool,
+    "words": int, "separator": str, "capitalize": bool, "include_number": bool,
+}
+
+
+def parse_tool_arguments(tokens: List[str], allowed=PAGING_OPTIONS) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Split tool arguments into positional words and key=value options
+
+    Args:
+        tokens: Remaining command tokens after the action
+        allowed: Option keys to recognize (other tokens are positional)
+
+    Returns:
+        Tuple of (positional arguments, options dictionary)
+    """
+    positional = []
+    options = {}
+    for token in tokens:
+        key, sep, value = token.partition("=")
+        if sep and key in allowed:
+            options[key] = value
+        else:
+            positional.append(token)
+    return positional, options
+
+
+def parse_generator_options(options: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Convert generate command options to typed keyword arguments
+
+    Args:
+        options: Raw options from parse_tool_arguments(tokens, GENERATOR_OPTIONS)
+
+    Returns:
+        Keyword arguments for BitwardenCLIIntegration.generate_password
+    """
+    parsed = {}
+    for key, value in options.items():
+        option_type = GENERATOR_OPTIONS[key]
+        if option_type is bool:
+            parsed[key] = value.lower() in ("1", "true", "yes", "on")
+        elif option_type is int:
+            parsed[key] = int(value)
+        else:
+            parsed[key] = value
+    return parsed
+
+
+def _int_option(options: Dict[str, str], key: str, default: int, minimum: int) -> int:
+    """
+    Read a whole-number option, clamped to minimum
+
+    Raises:
+        ValueError: The value is not a whole number (message names the option)
+    """
+    value = options.get(key)
+    if value is None:
+        return max(default, minimum)
+    try:
+        return max(int(value), minimum)
+    except ValueError:
+        raise ValueError(f"Invalid option {key}={value!r}: expected a whole number") from None
+
+
+def split_command(command: str) -> List[str]:
+    """
+    Tokenize a tool command, honouring quotes (e.g. name="my site")
+
+    Args:
+        command: Raw command string from the agent
+
+    Returns:
+        List of tokens
+    """
+    try:
+        return shlex.split(command)
+    except ValueError:
+        # Unbalanced quotes - fall back to whitespace splitting
+        return command.split()
+
+
+def parse_fields(value: Optional[str], default: List[str]) -> List[str]:
+    """Parse a comma separated field list (e.g. 'name,login.username')"""
+    if not value:
+        return list(default)
+    return [field.strip() for field in value.split(",") if field.strip()]
+
+
+def _extract(value: Any, path: List[str]) -> Any:
+    """Resolve a dotted path, mapping over lists (e.g. login.uris.uri)"""
+    for index, key in enumerate(path):
+        if isinstance(value, list):
+            return [_extract(entry, path[index:]) for entry in value]
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def project_item(item: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Project an item onto the requested fields
+
+    Args:
+        item: Raw Bitwarden item dictionary
+        fields: Dotted field paths to keep
+
+    Returns:
+        Flat dictionary keyed by field path, omitting empty values
+    """
+    projected = {}
+    for field in fields:
+        value = _extract(item, field.split("."))
+        if value not in (None, "", [], {}):
+            projected[field] = value
+    return projected
+
+
+def filter_by_name(items: List[Dict[str, Any]], name_filter: Optional[str]) -> List[Dict[str, Any]]:
+    """Case-insensitive substring filter on item names"""
+    if not name_filter:
+        return items
+    needle = name_filter.lower()
+    return [item for item in items if needle in (item.get('name') or '').lower()]
+
+
+def to_compact_json(data: Any) -> str:
+    """Serialize without whitespace to keep token counts low"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _shorten_values(value: Any, width: int) -> Any:
+    """Cut every string in a projected item to width characters"""
+    if isinstance(value, str):
+        return value if len(value) <= width else value[:width] + "..."
+    if isinstance(value, list):
+        return [_shorten_values(entry, width) for entry in value]
+    if isinstance(value, dict):
+        return {key: _shorten_values(entry, width) for key, entry in value.items()}
+    return value
+
+
+def format_item_page(items: List[Dict[str, Any]], options: Dict[str, str],
+                     default_fields: List[str] = DEFAULT_LIST_FIELDS) -> str:
+    """
+    Render a page of items as compact JSON under the configured size cap
+
+    Args:
+        items: Full list of items (already filtered by search, if any)
+        options: Parsed key=value options (offset, limit, fields, name, max_chars)
+        default_fields: Fields used when no projection was requested
+
+    Returns:
+        Compact JSON string with total, offset, items and paging hints, or a usage
+        message for invalid options
+    """
+    try:
+        offset = _int_option(options, 'offset', 0, 0)
+        limit = _int_option(options, 'limit', DEFAULT_PAGE_SIZE, 1)
+        max_chars = _int_option(options, 'max_chars', DEFAULT_MAX_CHARS, MIN_MAX_CHARS)
+    except ValueError as e:
+        return f"{e}. Usage: {PAGING_USAGE}"
+    items = filter_by_name(items, options.get('name'))
+    fields = parse_fields(options.get('fields'), default_fields)
+
+    page = [project_item(item, fields) for item in items[offset:offset + limit]]
+    response = {"total": len(items), "offset": offset, "items": page}
+    if offset + len(page) < len(items):
+        response["next_offset"] = offset + len(page)
+
+    output = to_compact_json(response)
+    # Drop trailing items until the response fits the size budget; keep at least one
+    # so next_offset always advances
+    while len(output) > max_chars and len(page) > 1:
+        page.pop()
+        response["items"] = page
+        response["next_offset"] = offset + len(page)
+        response["truncated"] = True
+        output = to_compact_json(response)
+    if len(output) > max_chars and page:
+        # A single oversized item: shorten its values instead
+        first, width = page[0], max(max_chars // 2, 16)
+        while len(output) > max_chars and width >= 16:
+            page[0] = _shorten_values(first, width)
+            response["truncated"] = True
+            output = to_compact_json(response)
+            width //= 2
+    return output
+
+
+def format_item(item: Dict[str, Any], options: Dict[str, str]) -> str:
+    """
+    Render a single item as compact JSON under the configured size cap
+
+    Args:
+        item: Raw Bitwarden item dictionary
+        options: Parsed key=value options (fields, max_chars)
+
+    Returns:
+        Compact JSON string of the projected item, or a usage message for invalid options
+    """
+    try:
+        max_chars = _int_option(options, 'max_chars', DEFAULT_MAX_CHARS, MIN_MAX_CHARS)
+    except ValueError as e:
+        return f"{e}. Usage: fields=<a,b.c> max_chars=<n>"
+    fields = parse_fields(options.get('fields'), DEFAULT_ITEM_FIELDS)
+    output = to_compact_json(project_item(item, fields))
+    if len(output) > max_chars:
+        output = output[:max_chars] + "...(truncated, request fewer fields)"
+    return output
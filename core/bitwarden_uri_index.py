@@ -0,0 +1,208 @@
+"""
+URI/domain index over login items
+
+Maps normalized hosts and registrable domains to the login URIs that can
+match them, so "the login for example.com" is answered from memory. Matching
+follows Bitwarden's URI match detection types.
+"""
+
+import re
+import logging
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tldextract
+    # Bundled public suffix snapshot only; never fetch the list over the network
+    _tld_extract = tldextract.TLDExtract(suffix_list_urls=())
+except ImportError:
+    _tld_extract = None
+
+# Bitwarden URI match detection types (login.uris[].match)
+MATCH_DOMAIN = 0
+MATCH_HOST = 1
+MATCH_STARTS_WITH = 2
+MATCH_EXACT = 3
+MATCH_REGEX = 4
+MATCH_NEVER = 5
+
+MATCH_NAMES = {
+    MATCH_DOMAIN: "domain", MATCH_HOST: "host", MATCH_STARTS_WITH: "starts_with",
+    MATCH_EXACT: "exact", MATCH_REGEX: "regex", MATCH_NEVER: "never",
+}
+
+# Rank of a match (higher is more specific)
+_MATCH_SCORES = {MATCH_EXACT: 4, MATCH_STARTS_WITH: 3, MATCH_HOST: 2, MATCH_REGEX: 2, MATCH_DOMAIN: 1}
+
+# Common multi-label public suffixes, used when tldextract is not installed
+_MULTI_LABEL_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "ltd.uk", "plc.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.nz", "org.nz", "co.jp", "ne.jp", "or.jp", "co.za", "com.br", "com.mx",
+    "com.tr", "com.cn", "com.hk", "com.sg", "co.in", "co.kr", "co.at", "or.at",
+}
+
+
+def _split_url(url: str):
+    """urlsplit that accepts bare hosts like 'example.com/login'"""
+    url = url.strip()
+    if "://" not in url:
+        url = "http://" + url
+    return urlsplit(url)
+
+
+def normalize_host(url: str) -> Optional[str]:
+    """
+    Lower-cased host of a URL, including a non-default port
+
+    Args:
+        url: URL or bare host
+
+    Returns:
+        Host (e.g. 'app.example.com:8443') or None if the URL has no host
+    """
+    try:
+        parts = _split_url(url)
+        host = (parts.hostname or "").rstrip(".")
+        port = parts.port
+    except ValueError:
+        return None
+    if not host:
+        return None
+    return f"{host}:{port}" if port else host
+
+
+@lru_cache(maxsize=4096)
+def registrable_domain(host: str) -> str:
+    """
+    Registrable domain of a host (e.g. 'login.example.co.uk' -> 'example.co.uk')
+
+    Args:
+        host: Host as returned by normalize_host (the port is ignored)
+
+    Returns:
+        Registrable domain, or the host itself for IPs and single labels
+    """
+    host = host.split(":", 1)[0]
+    if re.fullmatch(r"[\d.]+|\[?[0-9a-f:]+\]?", host) or "." not in host:
+        return host
+    if _tld_extract is not None:
+        extracted = _tld_extract(host)
+        if extracted.domain and extracted.suffix:
+            return f"{extracted.domain}.{extracted.suffix}"
+        return host
+    labels = host.split(".")
+    if len(labels) >= 3 and ".".join(labels[-2:]) in _MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+@lru_cache(maxsize=1024)
+def _compile(pattern: str) -> Optional["re.Pattern"]:
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+def uri_matches(uri: str, match_type: int, url: str, host: Optional[str], domain: Optional[str]) -> bool:
+    """
+    Whether a stored login URI matches a URL under the given match type
+
+    Args:
+        uri: Stored login URI
+        match_type: Bitwarden match detection type
+        url: URL being looked up
+        host: normalize_host(url)
+        domain: registrable_domain(host)
+
+    Returns:
+        True on match
+    """
+    if match_type == MATCH_NEVER:
+        return False
+    if match_type == MATCH_EXACT:
+        return url == uri
+    if match_type == MATCH_STARTS_WITH:
+        return url.startswith(uri)
+    if match_type == MATCH_REGEX:
+        pattern = _compile(uri)
+        return bool(pattern and pattern.search(url))
+    uri_host = normalize_host(uri)
+    if not uri_host or not host:
+        return False
+    if match_type == MATCH_HOST:
+        return uri_host == host
+    return registrable_domain(uri_host) == domain
+
+
+class URIIndex:
+    """Index of login URIs by registrable domain, plus regex URIs"""
+
+    def __init__(self, items: Iterable[Dict[str, Any]], default_match: int = MATCH_DOMAIN):
+        """
+        Args:
+            items: Vault items (only logins with URIs are indexed)
+            default_match: Match type for URIs without one (Bitwarden's default is domain)
+        """
+        self.default_match = default_match
+        self.by_domain: Dict[str, List[Tuple[Dict[str, Any], str, int]]] = {}
+        self.regex_entries: List[Tuple[Dict[str, Any], str, int]] = []
+
+        for item in items:
+            for entry in ((item.get('login') or {}).get('uris') or []):
+                uri = (entry or {}).get('uri')
+                if not uri:
+                    continue
+                match_type = entry.get('match')
+                if match_type not in MATCH_NAMES:
+                    # Unset, or a match type this code does not know (newer Bitwarden): use the default
+                    match_type = default_match
+                if match_type == MATCH_NEVER:
+                    continue
+                if match_type == MATCH_REGEX:
+                    self.regex_entries.append((item, uri, match_type))
+                    continue
+                host = normalize_host(uri)
+                if host:
+                    self.by_domain.setdefault(registrable_domain(host), []).append((item, uri, match_type))
+
+    def find(self, url: str) -> List[Dict[str, Any]]:
+        """
+        Ranked login matches for a URL
+
+        Args:
+            url: Website URL or bare host (e.g. 'example.com')
+
+        Returns:
+            List of {"item", "uri", "match"} dicts, most specific first;
+            each item appears once with its best matching URI
+        """
+        if "://" not in url:
+            url = "https://" + url.strip()
+        host = normalize_host(url)
+        domain = registrable_domain(host) if host else None
+
+        candidates = list(self.by_domain.get(domain, [])) if domain else []
+        candidates.extend(self.regex_entries)
+
+        best: Dict[Any, Tuple[int, int, Dict[str, Any], str, int]] = {}
+        for item, uri, match_type in candidates:
+            if not uri_matches(uri, match_type, url, host, domain):
+                continue
+            # Longer prefixes are more specific among starts-with matches
+            score = (_MATCH_SCORES.get(match_type, _MATCH_SCORES[MATCH_DOMAIN]),
+                     len(uri) if match_type == MATCH_STARTS_WITH else 0)
+            # Items without an id (e.g. queued creates) are told apart by identity
+            item_id = item.get('id') or id(item)
+            if item_id not in best or score > best[item_id][:2]:
+                best[item_id] = (score[0], score[1], item, uri, match_type)
+
+        ranked = sorted(best.values(), key=lambda entry: (entry[0], entry[1]), reverse=True)
+        return [
+            {"item": item, "uri": uri, "match": MATCH_NAMES.get(match_type, "domain")}
+            for _, _, item, uri, match_type in ranked
+        ]
@@ -0,0 +1,154 @@
+"""
+In-memory vault snapshot and background sync scheduler
+
+A VaultSnapshot is an immutable, indexed view of the vault. Refreshes build
+a new snapshot next to the current one and swap the reference, so readers
+never block and always see a consistent view.
+"""
+
+import time
+import random
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Iterable
+
+from core.bitwarden_uri_index import URIIndex
+
+logger = logging.getLogger(__name__)
+
+
+def item_matches_search(item: Dict[str, Any], search_term: str) -> bool:
+    """
+    Whether an item matches a search term the way `bw list items --search` does
+
+    Case-insensitive substring of the name, login username or a login URI,
+    or an ID prefix for terms of 8+ characters.
+    """
+    term = search_term.strip().lower()
+    if not term:
+        return True
+    if len(term) >= 8 and (item.get('id') or '').lower().startswith(term):
+        return True
+    login = item.get('login') or {}
+    texts = [item.get('name'), login.get('username')]
+    texts.extend(uri.get('uri') for uri in login.get('uris') or [])
+    return any(term in text.lower() for text in texts if text)
+
+
+class VaultSnapshot:
+    """Immutable, indexed view of vault items at one point in time"""
+
+    def __init__(self, items: Iterable[Dict[str, Any]], previous: Optional["VaultSnapshot"] = None,
+                 collections: Optional[List[Dict[str, Any]]] = None):
+        """
+        Build indexes, reusing unchanged items from the previous snapshot
+
+        Args:
+            items: Items as returned by `bw list items`
+            previous: Snapshot to reuse unchanged entries from
+            collections: Collections as returned by `bw list collections`
+                (defaults to the previous snapshot's collections)
+        """
+        self.loaded_at = time.time()
+        if collections is None and previous is not None:
+            collections = previous.collections
+        self.collections = collections or []
+        self.collection_ids = {c.get('name'): c.get('id') for c in self.collections}
+        self.added = 0
+        self.updated = 0
+
+        previous_by_id = previous.by_id if previous else {}
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            item_id = item.get('id')
+            if not item_id:
+                continue
+            old = previous_by_id.get(item_id)
+            if old is not None and old.get('revisionDate') == item.get('revisionDate'):
+                # Unchanged since the last refresh - keep the existing object
+                by_id[item_id] = old
+                continue
+            by_id[item_id] = item
+            if old is None:
+                self.added += 1
+            else:
+                self.updated += 1
+
+        self.removed = sum(1 for item_id in previous_by_id if item_id not in by_id)
+        self.by_id = by_id
+
+        by_name: Dict[str, List[Dict[str, Any]]] = {}
+        for item in by_id.values():
+            by_name.setdefault((item.get('name') or '').lower(), []).append(item)
+        self.by_name = by_name
+        self._uri_index: Optional[URIIndex] = None
+
+    @property
+    def items(self) -> List[Dict[str, Any]]:
+        """All items in the snapshot"""
+        return list(self.by_id.values())
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Look up an item by ID"""
+        return self.by_id.get(item_id)
+
+    def find_by_name(self, name: str) -> List[Dict[str, Any]]:
+        """Look up items by exact (case-insensitive) name"""
+        return list(self.by_name.get(name.lower(), []))
+
+    @property
+    def uri_index(self) -> URIIndex:
+        """Login URI index, built on first use (snapshots never change)"""
+        if self._uri_index is None:
+            self._uri_index = URIIndex(self.by_id.values())
+        return self._uri_index
+
+    def collection_id(self, collection_name: str) -> Optional[str]:
+        """Look up a collection ID by name"""
+        return self.collection_ids.get(collection_name)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+
+class VaultSyncScheduler:
+    """Runs vault sync plus snapshot refresh periodically in a background thread"""
+
+    def __init__(self, client: Any, interval: float = 300.0, jitter: float = 0.1):
+        """
+        Args:
+            client: BitwardenCLIIntegration instance to sync
+            interval: Seconds between syncs
+            jitter: Fraction of the interval to randomize by (0.1 = +/-10%)
+        """
+        self.client = client
+        self.interval = interval
+        self.jitter = jitter
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _next_delay(self) -> float:
+        return max(1.0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def start(self) -> None:
+        """Start the scheduler thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="bw-sync-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"🔄 Vault sync scheduled every {self.interval:.0f}s")
+
+    def stop(self) -> None:
+        """Stop the scheduler thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._next_delay()):
+            try:
+                self.client.sync()
+            except Exception as e:
+                logger.error(f"❌ Scheduled sync failed: {e}")
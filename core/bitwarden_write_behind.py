@@ -0,0 +1,214 @@
+"""
+Write-behind queue for Bitwarden vault mutations
+
+Coalesces repeated updates to the same item and flushes them in batches
+on a timer, on explicit flush() or at process exit.
+"""
+
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingMutation:
+    """A queued, coalesced mutation for a single item"""
+    item_id: str
+    updates: Dict[str, Any] = field(default_factory=dict)
+    delete: bool = False
+    attempts: int = 0
+    last_error: Optional[str] = None
+
+    def merge(self, updates: Optional[Dict[str, Any]] = None, delete: bool = False) -> None:
+        """Merge a newer mutation into this one (later values win)"""
+        if delete:
+            self.delete = True
+            self.updates.clear()
+        elif updates and not self.delete:
+            self.updates.update(updates)
+
+
+class WriteBehindQueue:
+    """Queues item mutations and applies them in the background"""
+
+    def __init__(self, apply_mutation: Callable[[PendingMutation], bool],
+                 flush_interval: float = 5.0, max_batch_size: int = 50,
+                 max_retries: int = 3,
+                 on_failure: Optional[Callable[[PendingMutation], None]] = None):
+        """
+        Args:
+            apply_mutation: Callback writing one mutation to the vault, returns success
+            flush_interval: Seconds between background flushes
+            max_batch_size: Maximum mutations applied per flush batch
+            max_retries: Flush attempts before a mutation is reported as failed
+            on_failure: Optional callback invoked for permanently failed mutations
+        """
+        self._apply_mutation = apply_mutation
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.on_failure = on_failure
+
+        self._pending: "OrderedDict[str, PendingMutation]" = OrderedDict()
+        # Mutations currently being written; still visible to readers
+        self._inflight: Dict[str, PendingMutation] = {}
+        self._failed: List[PendingMutation] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, name="bw-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enqueue_update(self, item_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Queue field updates for an item, merging with pending ones
+
+        Returns:
+            False (nothing queued) if the item already has a queued or in-flight delete
+        """
+        with self._lock:
+            pending = self._pending.get(item_id)
+            inflight = self._inflight.get(item_id)
+            if (pending and pending.delete) or (inflight and inflight.delete):
+                return False
+            if pending:
+                pending.merge(updates=updates)
+            else:
+                self._pending[item_id] = PendingMutation(item_id, dict(updates))
+            return True
+
+    def enqueue_delete(self, item_id: str) -> None:
+        """Queue deletion of an item, superseding pending updates"""
+        with self._lock:
+            pending = self._pending.get(item_id)
+            if pending:
+                pending.merge(delete=True)
+            else:
+                self._pending[item_id] = PendingMutation(item_id, delete=True)
+
+    def get_pending(self, item_id: str) -> Optional[PendingMutation]:
+        """Return the combined in-flight and pending mutation for an item, if any"""
+        with self._lock:
+            inflight = self._inflight.get(item_id)
+            pending = self._pending.get(item_id)
+            if not inflight and not pending:
+                return None
+            combined = PendingMutation(item_id)
+            for mutation in (inflight, pending):
+                if mutation:
+                    combined.merge(updates=mutation.updates, delete=mutation.delete)
+            return combined
+
+    def pending_mutations(self) -> Dict[str, PendingMutation]:
+        """Combined in-flight and pending mutations of all items, keyed by item ID"""
+        with self._lock:
+            combined: Dict[str, PendingMutation] = {}
+            for mutations in (self._inflight, self._pending):
+                for item_id, mutation in mutations.items():
+                    entry = combined.setdefault(item_id, PendingMutation(item_id))
+                    entry.merge(updates=mutation.updates, delete=mutation.delete)
+            return combined
+
+    @property
+    def pending_count(self) -> int:
+        """Number of items with unflushed mutations"""
+        with self._lock:
+            return len(self._pending)
+
+    def failed_mutations(self) -> List[PendingMutation]:
+        """Mutations that exhausted their retries"""
+        with self._lock:
+            return list(self._failed)
+
+    def flush(self) -> bool:
+        """
+        Apply all pending mutations in batches
+
+        Returns:
+            True if every mutation was applied, False if any failed
+        """
+        with self._flush_lock:
+            success = True
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return success
+                for mutation in batch:
+                    if not self._apply(mutation):
+                        success = False
+                # Retried mutations stay queued for the next timer tick
+                if not success:
+                    return False
+
+    def close(self) -> None:
+        """Stop the background thread and flush remaining mutations"""
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+        # Final drain: retry until every mutation is applied or exhausted
+        for _ in range(self.max_retries):
+            if self.flush():
+                break
+        if self.pending_count:
+            logger.error(f"❌ {self.pending_count} vault mutations could not be flushed on exit")
+
+    def _take_batch(self) -> List[PendingMutation]:
+        with self._lock:
+            batch = []
+            while self._pending and len(batch) < self.max_batch_size:
+                item_id, mutation = self._pending.popitem(last=False)
+                self._inflight[item_id] = mutation
+                batch.append(mutation)
+            return batch
+
+    def _apply(self, mutation: PendingMutation) -> bool:
+        try:
+            if self._apply_mutation(mutation):
+                with self._lock:
+                    self._inflight.pop(mutation.item_id, None)
+                return True
+            mutation.last_error = "write rejected"
+        except Exception as e:
+            mutation.last_error = str(e)
+
+        mutation.attempts += 1
+        if mutation.attempts >= self.max_retries:
+            with self._lock:
+                self._inflight.pop(mutation.item_id, None)
+                self._failed.append(mutation)
+            logger.error(
+                f"❌ Giving up on {'delete' if mutation.delete else 'update'} of item "
+                f"{mutation.item_id} after {mutation.attempts} attempts: {mutation.last_error}"
+            )
+            if self.on_failure:
+                self.on_failure(mutation)
+            return False
+
+        with self._lock:
+            self._inflight.pop(mutation.item_id, None)
+            # Re-queue at the front; newer mutations queued meanwhile take precedence
+            newer = self._pending.pop(mutation.item_id, None)
+            if newer:
+                mutation.merge(updates=newer.updates, delete=newer.delete)
+            self._pending[mutation.item_id] = mutation
+            self._pending.move_to_end(mutation.item_id, last=False)
+        logger.warning(
+            f"⚠️ Flush of item {mutation.item_id} failed "
+            f"(attempt {mutation.attempts}/{self.max_retries}): {mutation.last_error}"
+        )
+        return False
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Background flush failed: {e}")
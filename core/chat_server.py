@@ -0,0 +1,466 @@
+"""
+HTTP/WebSocket server for the manager chat
+
+Serves many users against the same agents. Every session has its own
+ConversationManager; messages of one session are processed in order,
+messages of different sessions concurrently. Crew runs are bounded by a
+global limit (max_concurrency); up to max_queue further messages wait for
+a slot and anything beyond that is rejected at once with 503 and
+Retry-After, so a saturated LLM backend does not build an unbounded
+backlog. A message that exceeds request_timeout is answered with 504 but
+keeps its slot until the crew run actually ends (a crew running in a
+thread cannot be interrupted).
+
+Endpoints:
+    POST   /chat                 {"message": "...", "session_id": "..."} -> {"session_id", "response", "timing"}
+    GET    /ws?session_id=...    WebSocket; send text or {"message": "..."}, receive {"type": "response", ...}
+                                 (with stream=True first {"type": "token" | "tool_started" | "tool_finished", ...})
+    DELETE /sessions/{id}        End a session
+    GET    /stats                Load, rejections, latency and time-to-first-token percentiles
+    GET    /health               Liveness
+
+Shutdown (SIGINT/SIGTERM) stops accepting messages, waits up to
+shutdown_timeout for running crews, closes WebSockets and sessions.
+
+Load test against a running server:
+    python core/chat_server.py load-test --url http://127.0.0.1:8080 --concurrency 1 2 4 8
+"""
+
+import sys
+import time
+import json
+import uuid
+import asyncio
+import logging
+import argparse
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from aiohttp import ClientSession, ClientTimeout, WSMsgType, web
+
+logger = logging.getLogger(__name__)
+
+
+class ServerBusy(Exception):
+    """Raised when a message cannot be admitted (saturated or shutting down)"""
+
+
+@dataclass
+class ChatSession:
+    """State of one chat session"""
+    session_id: str
+    manager: Any
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+    messages: int = 0
+
+
+class ChatServer:
+    """Multi-session chat server with bounded crew concurrency and backpressure"""
+
+    def __init__(self, handler: Callable[[str, Any], Awaitable[str]], session_factory: Callable[[str], Any],
+                 max_concurrency: int = 4, max_queue: int = 16, request_timeout: float = 600.0,
+                 session_ttl: float = 3600.0, shutdown_timeout: float = 60.0, stream: bool = False):
+        """
+        Args:
+            handler: Coroutine answering a message, e.g. chat_with_manager(message, conversation_manager)
+            session_factory: Creates the ConversationManager for a session ID
+            max_concurrency: Crew runs at the same time
+            max_queue: Messages waiting for a slot before new ones are rejected
+            request_timeout: Seconds before a message is answered with 504
+            session_ttl: Seconds of inactivity after which a session is closed
+            shutdown_timeout: Seconds to wait for running crews on shutdown
+            stream: Forward tokens and tool steps to WebSocket clients while a message runs;
+                the handler must accept an on_event keyword (see core.chat_stream)
+        """
+        self.handler = handler
+        self.session_factory = session_factory
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.request_timeout = request_timeout
+        self.session_ttl = session_ttl
+        self.shutdown_timeout = shutdown_timeout
+        self.stream = stream
+        self.sessions: Dict[str, ChatSession] = {}
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._pending = 0
+        self._running = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._delivering = 0
+        self._delivered: Optional[asyncio.Event] = None
+        self._websockets: Set[web.WebSocketResponse] = set()
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._first_tokens: Deque[float] = deque(maxlen=1000)
+        self._closing = False
+        self._sweeper: Optional[asyncio.Task] = None
+
+    # Sessions
+
+    def session(self, session_id: Optional[str] = None) -> ChatSession:
+        """Existing session or a new one (a given unknown ID is created, e.g. to resume a stored session)"""
+        session_id = session_id or uuid.uuid4().hex
+        session = self.sessions.get(session_id)
+        if session is None:
+            manager = self.session_factory(session_id)
+            # The manager may normalize the ID (e.g. a store-assigned one)
+            session_id = getattr(manager, "session_id", None) or session_id
+            session = self.sessions[session_id] = ChatSession(session_id, manager)
+        session.last_used = time.monotonic()
+        return session
+
+    def close_session(self, session_id: str) -> bool:
+        """Close a session and its conversation manager"""
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        close = getattr(session.manager, "close", None)
+        if close is not None:
+            close()
+        return True
+
+    async def _sweep_sessions(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, min(self.session_ttl / 4, 300.0)))
+            now = time.monotonic()
+            for session_id, session in list(self.sessions.items()):
+                if not session.lock.locked() and now - session.last_used > self.session_ttl:
+                    self.close_session(session_id)
+                    logger.info(f"💤 Closed idle chat session {session_id}")
+
+    # Message processing
+
+    async def _process(self, session: ChatSession, message: str, timing: Dict[str, float],
+                       on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """Run one message: in order within its session, within the global concurrency limit"""
+        async with session.lock:
+            async with self._slots:
+                timing["queued_ms"] = (time.perf_counter() - timing["start"]) * 1000
+                self._running += 1
+                started = time.perf_counter()
+                try:
+                    if on_event is None:
+                        return await self.handler(message, session.manager)
+                    return await self.handler(message, session.manager, on_event=on_event)
+                finally:
+                    self._running -= 1
+                    timing["run_ms"] = (time.perf_counter() - started) * 1000
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._pending -= 1
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ Chat message failed: {task.exception()}")
+
+    async def respond(self, session: ChatSession, message: str,
+                      on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Answer a message of a session
+
+        Args:
+            session: Chat session
+            message: User message
+            on_event: Receives the run's stream events (tokens, tool steps) as they happen
+
+        Returns:
+            {"session_id", "response", "timing": {"queued_ms", "run_ms", "total_ms"[, "first_token_ms"]}}
+
+        Raises:
+            ServerBusy: Saturated or shutting down
+            asyncio.TimeoutError: No answer within request_timeout
+        """
+        if self._closing:
+            raise ServerBusy("Server is shutting down")
+        if self._pending >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise ServerBusy(f"{self._pending} messages in progress or queued")
+        self._pending += 1
+        timing = {"start": time.perf_counter()}
+        if on_event is not None:
+            forward = on_event
+
+            def on_event(event: Dict[str, Any]) -> None:
+                if event["type"] == "token" and "first_token_ms" not in timing:
+                    timing["first_token_ms"] = (time.perf_counter() - timing["start"]) * 1000
+                forward(event)
+        task = asyncio.create_task(self._process(session, message, timing, on_event))
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+        session.messages += 1
+        try:
+            # Shielded: a timeout or disconnect does not abandon a crew that keeps running in its thread
+            response = await asyncio.wait_for(asyncio.shield(task), self.request_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            session.last_used = time.monotonic()
+        total_ms = (time.perf_counter() - timing.pop("start")) * 1000
+        timing["total_ms"] = total_ms
+        self._latencies.append(total_ms)
+        if "first_token_ms" in timing:
+            self._first_tokens.append(timing["first_token_ms"])
+        self.completed += 1
+        first_token = f", first token {timing['first_token_ms']:.0f}ms" if "first_token_ms" in timing else ""
+        logger.info(f"✅ Session {session.session_id[:8]}: answered in {total_ms:.0f}ms "
+                    f"(queued {timing.get('queued_ms', 0):.0f}ms, crew {timing.get('run_ms', 0):.0f}ms{first_token})")
+        return {"session_id": session.session_id, "response": response,
+                "timing": {key: round(value, 1) for key, value in timing.items()}}
+
+    @asynccontextmanager
+    async def _delivery(self) -> AsyncIterator[None]:
+        """Track a message from admission until its answer is sent (shutdown waits for these)"""
+        self._delivering += 1
+        self._delivered.clear()
+        try:
+            yield
+        finally:
+            self._delivering -= 1
+            if not self._delivering:
+                self._delivered.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Load, counters and latency (and streamed time to first token) percentiles of the last 1000 answers"""
+        def percentile(values: Deque[float], p: float) -> Optional[float]:
+            values = sorted(values)
+            return round(values[min(len(values) - 1, int(p * len(values)))], 1) if values else None
+
+        return {
+            "sessions": len(self.sessions),
+            "running": self._running,
+            "queued": self._pending - self._running,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "latency_ms": {"p50": percentile(self._latencies, 0.5), "p95": percentile(self._latencies, 0.95),
+                           "max": percentile(self._latencies, 1.0)},
+            "first_token_ms": {"p50": percentile(self._first_tokens, 0.5),
+                               "p95": percentile(self._first_tokens, 0.95)},
+        }
+
+    # HTTP and WebSocket handlers
+
+    def _retry_after(self) -> str:
+        """Rough wait estimate: median latency per queued round"""
+        median = sorted(self._latencies)[len(self._latencies) // 2] / 1000 if self._latencies else 5.0
+        return str(max(1, int(median * (self._pending / self.max_concurrency))))
+
+    async def _handle_chat(self, request: web.Request) -> web.Response:
+        try:
+            payload = await request.json()
+            message = str(payload["message"]).strip()
+        except (ValueError, KeyError, TypeError):
+            return web.json_response({"error": 'Expected JSON {"message": "...", "session_id": "..."}'}, status=400)
+        if not message:
+            return web.json_response({"error": "Empty message"}, status=400)
+        session = self.session(payload.get("session_id"))
+        async with self._delivery():
+            try:
+                return web.json_response(await self.respond(session, message))
+            except ServerBusy as e:
+                return web.json_response({"error": f"Busy: {e}"}, status=503,
+                                         headers={"Retry-After": self._retry_after()})
+            except asyncio.TimeoutError:
+                return web.json_response({"session_id": session.session_id,
+                                          "error": f"No answer within {self.request_timeout:.0f}s"}, status=504)
+            except Exception as e:
+                return web.json_response({"session_id": session.session_id, "error": str(e)}, status=500)
+
+    @staticmethod
+    async def _forward_events(ws: web.WebSocketResponse, events: asyncio.Queue) -> None:
+        """Send stream events in order until the None sentinel (a dead socket drops the rest)"""
+        while (event := await events.get()) is not None:
+            if ws.closed:
+                continue
+            try:
+                await ws.send_json(event)
+            except ConnectionResetError:
+                pass
+
+    async def _handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        session = self.session(request.query.get("session_id"))
+        self._websockets.add(ws)
+        await ws.send_json({"type": "session", "session_id": session.session_id})
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    message = str(json.loads(msg.data)["message"]).strip()
+                except (ValueError, KeyError, TypeError):
+                    message = msg.data.strip()
+                if not message:
+                    continue
+                async with self._delivery():
+                    events: Optional[asyncio.Queue] = asyncio.Queue() if self.stream else None
+                    sender = asyncio.create_task(self._forward_events(ws, events)) if events is not None else None
+                    try:
+                        on_event = events.put_nowait if events is not None else None
+                        reply = {"type": "response", **await self.respond(session, message, on_event)}
+                    except ServerBusy as e:
+                        reply = {"type": "error", "status": 503, "error": f"Busy: {e}",
+                                 "retry_after": int(self._retry_after())}
+                    except asyncio.TimeoutError:
+                        reply = {"type": "error", "status": 504,
+                                 "error": f"No answer within {self.request_timeout:.0f}s"}
+                    except Exception as e:
+                        reply = {"type": "error", "status": 500, "error": str(e)}
+                    if sender is not None:
+                        # Streamed events go out before the reply; a run past its timeout streams no further
+                        events.put_nowait(None)
+                        await sender
+                    try:
+                        await ws.send_json(reply)
+                    except ConnectionResetError:
+                        logger.warning(f"⚠️ Session {session.session_id[:8]}: client left before the answer")
+                        break
+        finally:
+            self._websockets.discard(ws)
+        return ws
+
+    async def _handle_delete_session(self, request: web.Request) -> web.Response:
+        if self.close_session(request.match_info["session_id"]):
+            return web.json_response({"closed": True})
+        return web.json_response({"error": "Unknown session"}, status=404)
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "shutting down" if self._closing else "ok"},
+                                 status=503 if self._closing else 200)
+
+    # Lifecycle
+
+    async def _on_startup(self, app: web.Application) -> None:
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._delivered = asyncio.Event()
+        self._delivered.set()
+        self._sweeper = asyncio.create_task(self._sweep_sessions())
+
+    async def _on_shutdown(self, app: web.Application) -> None:
+        """Drain: refuse new messages, let running crews finish, close WebSockets and sessions"""
+        self._closing = True
+        deadline = time.monotonic() + self.shutdown_timeout
+        if self._delivering:
+            logger.info(f"🛑 Waiting up to {self.shutdown_timeout:.0f}s for {self._delivering} chat messages")
+            try:
+                await asyncio.wait_for(self._delivered.wait(), self.shutdown_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ {self._delivering} chat messages unanswered at shutdown")
+        if self._tasks and deadline > time.monotonic():
+            # Crews of timed-out messages still record their answers in the conversation
+            await asyncio.wait(set(self._tasks), timeout=deadline - time.monotonic())
+        for task in list(self._tasks):
+            task.cancel()
+        for ws in list(self._websockets):
+            await ws.close(code=1001, message=b"Server shutting down")
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        for session_id in list(self.sessions):
+            self.close_session(session_id)
+        logger.info("🛑 Chat server stopped")
+
+    def app(self) -> web.Application:
+        """aiohttp application with the chat routes"""
+        app = web.Application()
+        app.add_routes([
+            web.post("/chat", self._handle_chat),
+            web.get("/ws", self._handle_websocket),
+            web.delete("/sessions/{session_id}", self._handle_delete_session),
+            web.get("/stats", self._handle_stats),
+            web.get("/health", self._handle_health),
+        ])
+        app.on_startup.append(self._on_startup)
+        app.on_shutdown.append(self._on_shutdown)
+        return app
+
+    def run(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """Serve until SIGINT/SIGTERM"""
+        logger.info(f"✅ Chat server on http://{host}:{port} (concurrency {self.max_concurrency}, "
+                    f"queue {self.max_queue})")
+        web.run_app(self.app(), host=host, port=port, print=None,
+                    shutdown_timeout=self.shutdown_timeout + 5)
+
+
+async def load_test(url: str, concurrency: int, requests: int, message: str = "Wie ist der Projektstatus?",
+                    timeout: float = 600.0) -> Dict[str, Any]:
+    """
+    Send requests to POST /chat from concurrent clients, one session per client
+
+    Args:
+        url: Server base URL
+        concurrency: Concurrent clients
+        requests: Total messages
+        message: Message text
+        timeout: Seconds per request
+
+    Returns:
+        {"concurrency", "ok", "rejected", "failed", "seconds", "throughput", "p50_ms", "p95_ms"}
+    """
+    latencies: List[float] = []
+    counts = {"ok": 0, "rejected": 0, "failed": 0}
+    remaining = iter(range(requests))
+
+    async def client(http: ClientSession) -> None:
+        session_id = uuid.uuid4().hex
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                async with http.post(f"{url}/chat", json={"message": message, "session_id": session_id}) as resp:
+                    await resp.read()
+                    outcome = "ok" if resp.status == 200 else "rejected" if resp.status == 503 else "failed"
+            except Exception:
+                outcome = "failed"
+            counts[outcome] += 1
+            if outcome == "ok":
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    async with ClientSession(timeout=ClientTimeout(total=timeout)) as http:
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        **counts,
+        "seconds": seconds,
+        "throughput": counts["ok"] / seconds if seconds else 0.0,
+        "p50_ms": latencies[len(latencies) // 2] if latencies else None,
+        "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Chat server tools (the server itself runs via main.py --serve)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    load_parser = subparsers.add_parser("load-test", help="Measure throughput of a running chat server")
+    load_parser.add_argument("--url", default="http://127.0.0.1:8080")
+    load_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    load_parser.add_argument("--requests", type=int, default=16, help="Messages per concurrency level")
+    load_parser.add_argument("--message", default="Wie ist der Projektstatus?")
+    args = parser.parse_args(argv)
+
+    for concurrency in args.concurrency:
+        result = asyncio.run(load_test(args.url, concurrency, args.requests, args.message))
+        p50 = f"{result['p50_ms']:.0f}ms" if result["p50_ms"] is not None else "-"
+        print(f"concurrency {concurrency:>3}: {result['throughput']:6.2f} msg/s, p50 {p50}, "
+              f"ok {result['ok']}, rejected {result['rejected']}, failed {result['failed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Streaming of crew runs to the chat
+
+With streaming LLMs (stream=True) CrewAI emits every token as an
+LLMStreamChunkEvent and every tool call as ToolUsage*Event on its global
+event bus, tagged with the task that caused it. ChatStreamer subscribes
+once and forwards the events of the tasks a StreamRun has attached to
+that run's callback, on the caller's event loop, so concurrent runs
+(server mode) each see only their own events.
+
+ReAct-style output ("Thought: ... Action: ..." followed eventually by
+"Final Answer: ...") is split so the client can show the reasoning
+differently from the answer: tokens after "Final Answer:", or all tokens
+of a reply that does not use the ReAct format, are marked final.
+
+Events passed to the callback:
+    {"type": "token", "text": "...", "final": bool}
+    {"type": "tool_started", "tool": "...", "args": {...}}
+    {"type": "tool_finished", "tool": "...", "ms": 812.0, "error": bool}
+
+Each run records time to first token and to the first answer token.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from crewai.events.types.tool_usage_events import (
+    ToolUsageErrorEvent, ToolUsageFinishedEvent, ToolUsageStartedEvent
+)
+
+logger = logging.getLogger(__name__)
+
+FINAL_MARKER = "Final Answer:"
+REACT_MARKERS = ("Thought:", "Action:", FINAL_MARKER)
+
+
+class FinalAnswerSplitter:
+    """Splits one LLM reply, chunk by chunk, into reasoning and final-answer text"""
+
+    def __init__(self):
+        self._mode: Optional[str] = None  # None (undecided), "react" or "final"
+        self._buffer = ""
+        self._answer_started = True  # False right after the marker: whitespace before the answer is dropped
+
+    def feed(self, chunk: str) -> List[Tuple[str, bool]]:
+        """
+        Args:
+            chunk: Next piece of the reply
+
+        Returns:
+            (text, final) pieces ready to show
+        """
+        if self._mode == "final":
+            if not self._answer_started:
+                # The marker ended the previous chunk; this one may start with its space
+                chunk = chunk.lstrip()
+                self._answer_started = bool(chunk)
+            return [(chunk, True)] if chunk else []
+        self._buffer += chunk
+        if self._mode is None:
+            start = self._buffer.lstrip()
+            if any(start.startswith(marker) for marker in REACT_MARKERS):
+                self._mode = "react"
+            elif any(marker.startswith(start) for marker in REACT_MARKERS):
+                return []  # Could still become a marker
+            else:
+                # Plain reply (e.g. native function calling): all of it is the answer
+                self._mode, text, self._buffer = "final", self._buffer, ""
+                return [(text, True)]
+        index = self._buffer.find(FINAL_MARKER)
+        if index >= 0:
+            before, after = self._buffer[:index + len(FINAL_MARKER)], self._buffer[index + len(FINAL_MARKER):]
+            self._mode, self._buffer = "final", ""
+            self._answer_started = bool(after.strip())
+            return [(text, final) for text, final in ((before, False), (after.lstrip(), True)) if text]
+        # Hold back a possible partial marker at the end
+        keep = len(FINAL_MARKER) - 1
+        if len(self._buffer) <= keep:
+            return []
+        text, self._buffer = self._buffer[:-keep], self._buffer[-keep:]
+        return [(text, False)]
+
+    def flush(self) -> List[Tuple[str, bool]]:
+        """Remaining held-back text at the end of the reply"""
+        text, self._buffer = self._buffer, ""
+        return [(text, self._mode == "final")] if text else []
+
+
+class StreamRun:
+    """Events of one crew run, delivered to a callback on the caller's loop"""
+
+    def __init__(self, streamer: "ChatStreamer", on_event: Callable[[Dict[str, Any]], None]):
+        self.streamer = streamer
+        self.on_event = on_event
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.task_ids: Set[str] = set()
+        self.started = time.perf_counter()
+        self.first_token_ms: Optional[float] = None
+        self.first_answer_ms: Optional[float] = None
+        self.final_text = ""
+        self.tools = 0
+        self._splitters: Dict[str, FinalAnswerSplitter] = {}
+        self._finished_calls: Set[str] = set()
+        self._tool_started: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()  # Tokens come from the LLM's thread, tool events from the bus's executor
+
+    def attach(self, crew: Any) -> None:
+        """Receive the events of a crew's tasks (e.g. CrewPool before_kickoff)"""
+        self.task_ids.update(str(task.id) for task in crew.tasks)
+        self.streamer._register(self)
+
+    @property
+    def answer_streamed(self) -> bool:
+        """Whether answer tokens were streamed (False e.g. for cached responses)"""
+        return bool(self.final_text.strip())
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        if threading.get_ident() == self._loop_thread:
+            # close() on the loop: deliver now, after the crew thread's already scheduled events
+            self.on_event(event)
+        else:
+            self.loop.call_soon_threadsafe(self.on_event, event)
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def _flush(self) -> None:
+        for splitter in self._splitters.values():
+            self._pieces(splitter.flush(), self._now_ms())
+
+    def _token(self, call_id: str, chunk: str) -> None:
+        # Emitting thread; chunks of one call arrive in order
+        with self._lock:
+            if self.first_token_ms is None:
+                self.first_token_ms = self._now_ms()
+            splitter = self._splitters.get(call_id)
+            if splitter is None:
+                if call_id in self._finished_calls:
+                    return  # Late chunks of a superseded call (e.g. a hedged duplicate) would interleave
+                # A new LLM call: the previous one is complete
+                self._finished_calls.update(self._splitters)
+                self._flush()
+                splitter = self._splitters[call_id] = FinalAnswerSplitter()
+                self._splitters = {call_id: splitter}
+            self._pieces(splitter.feed(chunk), self._now_ms())
+
+    def _pieces(self, pieces: List[Tuple[str, bool]], now_ms: float) -> None:
+        for text, final in pieces:
+            if final:
+                if self.first_answer_ms is None:
+                    self.first_answer_ms = now_ms
+                self.final_text += text
+            self._emit({"type": "token", "text": text, "final": final})
+
+    def _tool(self, event: Any) -> None:
+        key = (event.tool_name, str(event.tool_args))
+        if isinstance(event, ToolUsageStartedEvent):
+            with self._lock:
+                # The step that asked for the tool is complete: show its held-back tail first
+                self._flush()
+                self.tools += 1
+                self._tool_started[key] = time.perf_counter()
+                self._emit({"type": "tool_started", "tool": event.tool_name, "args": event.tool_args})
+            return
+        started = self._tool_started.pop(key, None)
+        elapsed = (time.perf_counter() - started) * 1000 if started else None
+        error = isinstance(event, ToolUsageErrorEvent) or getattr(event, "failure", None) is not None
+        self._emit({"type": "tool_finished", "tool": event.tool_name,
+                    "ms": round(elapsed, 1) if elapsed is not None else None, "error": error})
+
+    def close(self) -> None:
+        """Flush held-back text and stop receiving events"""
+        self.streamer._unregister(self)
+        with self._lock:
+            self._flush()
+            self._splitters = {}
+
+    def __enter__(self) -> "StreamRun":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+        self.streamer._record(self)
+
+
+class ChatStreamer:
+    """Routes CrewAI token and tool events to the StreamRun of their task"""
+
+    def __init__(self):
+        self._runs: Dict[str, StreamRun] = {}
+        self._lock = threading.Lock()
+        self._subscribed = False
+        self.runs = 0
+        self._first_token_ms: Deque[float] = deque(maxlen=1000)
+        self._first_answer_ms: Deque[float] = deque(maxlen=1000)
+
+    def _subscribe(self) -> None:
+        if self._subscribed:
+            return
+        self._subscribed = True
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def on_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+            run = self._run_for(event)
+            if run is not None and event.chunk and event.tool_call is None:
+                run._token(event.call_id, event.chunk)
+
+        for event_type in (ToolUsageStartedEvent, ToolUsageFinishedEvent, ToolUsageErrorEvent):
+            @crewai_event_bus.on(event_type)
+            def on_tool(source: Any, event: Any) -> None:
+                run = self._run_for(event)
+                if run is not None:
+                    run._tool(event)
+
+    def _run_for(self, event: Any) -> Optional[StreamRun]:
+        task_id = getattr(event, "task_id", None)
+        if task_id is None:
+            return None
+        with self._lock:
+            return self._runs.get(task_id)
+
+    def _register(self, run: StreamRun) -> None:
+        with self._lock:
+            for task_id in run.task_ids:
+                self._runs[task_id] = run
+
+    def _unregister(self, run: StreamRun) -> None:
+        with self._lock:
+            for task_id in run.task_ids:
+                if self._runs.get(task_id) is run:
+                    del self._runs[task_id]
+
+    def _record(self, run: StreamRun) -> None:
+        self.runs += 1
+        if run.first_token_ms is not None:
+            self._first_token_ms.append(run.first_token_ms)
+        if run.first_answer_ms is not None:
+            self._first_answer_ms.append(run.first_answer_ms)
+
+    def run(self, on_event: Callable[[Dict[str, Any]], None]) -> StreamRun:
+        """
+        Start streaming a run (call from the loop that should receive the events)
+
+        Args:
+            on_event: Called on this loop with each event dict
+
+        Returns:
+            StreamRun; attach the crew before kickoff and use it as a context manager
+        """
+        self._subscribe()
+        return StreamRun(self, on_event)
+
+    def stats(self) -> Dict[str, Any]:
+        """Median time to first token and to first answer token over the last 1000 runs"""
+        def median(values: Deque[float]) -> Optional[float]:
+            return round(sorted(values)[len(values) // 2], 1) if values else None
+
+        return {"runs": self.runs, "ttft_ms_p50": median(self._first_token_ms),
+                "first_answer_ms_p50": median(self._first_answer_ms)}
@@ -0,0 +1,300 @@
+"""
+Conversation history for the manager chat
+
+By default the context for a new task is the last few turns verbatim. With
+a token budget, the context keeps as many recent turns verbatim as fit and
+replaces older turns (and single oversized turns such as full research
+reports) with short summaries. Summaries are written by a cheap LLM on a
+background thread and cached by content; until a summary is ready the turn
+is represented by a truncated preview, so a chat turn never waits for it.
+
+Token counts are computed once per turn and the running totals are updated
+incrementally, so assembling the context costs the same at turn 500 as at
+turn 5.
+
+With a ConversationStore, every turn is also persisted; a session can be
+resumed after a restart and earlier turns are found with recall().
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# tiktoken caches downloaded encodings under the SHA-1 of their URL
+_TIKTOKEN_URL = "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+_encoding: Any = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+SUMMARY_PROMPT = (
+    "Summarize the following {role} message from a conversation in at most {words} words. "
+    "Keep names, numbers, decisions and open questions; drop formatting and pleasantries.\n\n{content}"
+)
+
+
+def _load_encoding() -> Any:
+    """
+    tiktoken's cl100k_base, only if it is already in TIKTOKEN_CACHE_DIR
+
+    tiktoken would otherwise download the encoding (or, offline, wait for the
+    network to time out), so without a cached copy the word estimate is used.
+    """
+    cache_dir = os.getenv("TIKTOKEN_CACHE_DIR")
+    if not cache_dir or not os.path.exists(os.path.join(cache_dir, hashlib.sha1(_TIKTOKEN_URL.encode()).hexdigest())):
+        return None
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"⚠️ tiktoken unavailable, estimating tokens from words: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with a locally cached tiktoken encoding or a word/punctuation estimate
+
+    Both approximate the local Llama tokenizer, close enough for budgeting. The
+    encoding is loaded on the first call, never at import time.
+    """
+    global _encoding, _encoding_loaded
+    if not text:
+        return 0
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                _encoding = _load_encoding()
+                _encoding_loaded = True
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(_WORD_RE.findall(text))
+
+
+def _preview(text: str, tokens: int) -> str:
+    """Cheap stand-in for a summary: the start of the text"""
+    limit = tokens * 4
+    text = " ".join(text[:limit + 200].split())
+    return text if len(text) <= limit else text[:limit].rstrip() + " …"
+
+
+class ConversationManager:
+    """Chat history with an optional token-budgeted, summarizing context window"""
+
+    def __init__(self, max_history_length: int = 20, token_budget: Optional[int] = None,
+                 summarizer: Any = None, summary_cache: Any = None, summary_tokens: int = 120,
+                 max_turn_tokens: Optional[int] = None, store: Any = None, session_id: Optional[str] = None):
+        """
+        Args:
+            max_history_length: Turns kept in memory (conversation_history)
+            token_budget: Token limit for get_recent_context (None keeps the last-N-turns behavior)
+            summarizer: LLM used to summarize older turns (None uses truncated previews only)
+            summary_cache: Optional LLMResponseCache persisting summaries across runs
+            summary_tokens: Target length of one summary
+            max_turn_tokens: Turns longer than this are summarized even while recent
+                (default: half of the budget left for verbatim turns)
+            store: Optional ConversationStore persisting turns
+            session_id: Session to resume or create in the store (default: a new session)
+        """
+        self.conversation_history: Deque[Dict] = deque(maxlen=max_history_length)
+        self.max_history_length = max_history_length
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.summary_cache = summary_cache
+        self.summary_tokens = summary_tokens
+
+        # A quarter of the budget holds summaries of older turns, the rest recent turns
+        self._summary_budget = token_budget // 4 if token_budget else 0
+        self._window_budget = (token_budget or 0) - self._summary_budget
+        self.max_turn_tokens = max_turn_tokens or self._window_budget // 2
+
+        self._window: Deque[Dict] = deque()
+        self._older: Deque[Dict] = deque()
+        self._window_tokens = 0
+        self._older_tokens = 0
+        self._context: Optional[str] = None
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if token_budget and summarizer is not None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-summary")
+
+        self.store = store
+        self.session_id = session_id
+        if store is not None:
+            self.session_id = store.create_session(session_id=session_id)
+            for message in store.recent(self.session_id, max_history_length):
+                self._remember(message["role"], message["content"])
+
+    def add_turn(self, role: str, content: str):
+        self._remember(role, content)
+        if self.store is not None:
+            self.store.append(self.session_id, role, content)
+
+    def _remember(self, role: str, content: str) -> None:
+        turn = {
+            "role": role,
+            "content": content,
+            "timestamp": os.times()
+        }
+        self.conversation_history.append(turn)
+        if self.token_budget:
+            self._track(role, content)
+
+    def get_recent_context(self, turns: int = 5) -> str:
+        """
+        Context for the next task
+
+        Args:
+            turns: Number of verbatim turns without a token budget (ignored with a budget)
+
+        Returns:
+            Formatted conversation context
+        """
+        if not self.token_budget:
+            recent = list(self.conversation_history)[-turns:]
+            return "\n".join([f"{msg['role']}: {msg['content']}" for msg in recent])
+        with self._lock:
+            if self._context is None:
+                self._context = self._assemble()
+            return self._context
+
+    def recall(self, query: str, limit: int = 5, since: Optional[float] = None,
+               all_sessions: bool = False) -> List[Dict[str, Any]]:
+        """
+        Find earlier turns about a topic through the store's full-text index
+
+        Args:
+            query: Free text, e.g. "what did we find about solar subsidies"
+            limit: Maximum number of turns
+            since: Only turns at or after this Unix timestamp
+            all_sessions: Search every session instead of the current one
+
+        Returns:
+            Matching turns, best first (empty without a store)
+        """
+        if self.store is None:
+            return []
+        return self.store.search(query, session_id=None if all_sessions else self.session_id,
+                                 since=since, limit=limit)
+
+    def context_tokens(self) -> int:
+        """Tokens currently used by the budgeted context"""
+        with self._lock:
+            return self._window_tokens + self._older_tokens
+
+    def close(self) -> None:
+        """Stop the background summarizer"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # Budgeted context
+
+    def _track(self, role: str, content: str) -> None:
+        tokens = count_tokens(content)
+        entry = {"role": role, "content": content, "tokens": tokens, "key": self._summary_key(role, content)}
+        entry["compact"] = tokens > self.max_turn_tokens
+        summary = self._cached_summary(entry["key"])
+        entry["summary"] = summary
+        entry["brief"] = summary or _preview(content, self.summary_tokens)
+        entry["brief_tokens"] = count_tokens(entry["brief"])
+        entry["where"] = "window"
+
+        # Only turns shown as summaries are sent to the summarizer
+        to_summarize = [entry] if entry["compact"] and summary is None else []
+        with self._lock:
+            self._window.append(entry)
+            self._window_tokens += self._cost(entry)
+            # Turns falling out of the verbatim window are kept as summaries
+            while self._window_tokens > self._window_budget and len(self._window) > 1:
+                moved = self._window.popleft()
+                self._window_tokens -= self._cost(moved)
+                moved["where"] = "older"
+                self._older.append(moved)
+                self._older_tokens += moved["brief_tokens"]
+                if not moved["compact"]:
+                    moved["compact"] = True
+                    if moved["tokens"] > self.summary_tokens and moved["summary"] is None:
+                        to_summarize.append(moved)
+            while self._older_tokens > self._summary_budget and self._older:
+                dropped = self._older.popleft()
+                dropped["where"] = None
+                self._older_tokens -= dropped["brief_tokens"]
+            self._context = None
+
+        if self._executor is not None:
+            for pending in to_summarize:
+                self._executor.submit(self._summarize, pending)
+
+    @staticmethod
+    def _cost(entry: Dict) -> int:
+        return entry["brief_tokens"] if entry["compact"] else entry["tokens"]
+
+    def _assemble(self) -> str:
+        lines = []
+        if self._older:
+            lines.append("Earlier conversation (summarized):")
+            lines.extend(f"- {entry['role']}: {entry['brief']}" for entry in self._older)
+            lines.append("")
+            lines.append("Recent conversation:")
+        for entry in self._window:
+            if entry["compact"]:
+                lines.append(f"{entry['role']} (summary): {entry['brief']}")
+            else:
+                lines.append(f"{entry['role']}: {entry['content']}")
+        return "\n".join(lines)
+
+    # Summaries
+
+    def _summary_key(self, role: str, content: str) -> str:
+        model = getattr(self.summarizer, "model", "")
+        return hashlib.sha256(f"{model}\0{self.summary_tokens}\0{role}\0{content}".encode()).hexdigest()
+
+    def _cached_summary(self, key: str) -> Optional[str]:
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is not None:
+                self._summaries.move_to_end(key)
+                return summary
+        if self.summary_cache is not None:
+            return self.summary_cache.get(key, "conversation-summary")
+        return None
+
+    def _remember_summary(self, key: str, summary: str) -> None:
+        self._summaries[key] = summary
+        if len(self._summaries) > 1024:
+            self._summaries.popitem(last=False)
+
+    def _summarize(self, entry: Dict) -> None:
+        """Background job: summarize one turn and swap the summary into the context"""
+        prompt = SUMMARY_PROMPT.format(role=entry["role"], words=int(self.summary_tokens * 0.75),
+                                       content=entry["content"])
+        try:
+            summary = str(self.summarizer.call([{"role": "user", "content": prompt}]) or "").strip()
+        except Exception as e:
+            logger.warning(f"⚠️ Conversation summary failed, keeping preview: {e}")
+            return
+        if not summary or entry["where"] is None:
+            return
+        if self.summary_cache is not None:
+            self.summary_cache.put(entry["key"], summary, "conversation-summary")
+
+        tokens = count_tokens(summary)
+        with self._lock:
+            self._remember_summary(entry["key"], summary)
+            delta = tokens - entry["brief_tokens"]
+            entry["summary"] = entry["brief"] = summary
+            entry["brief_tokens"] = tokens
+            if entry["where"] == "older":
+                self._older_tokens += delta
+            elif entry["where"] == "window" and entry["compact"]:
+                self._window_tokens += delta
+            self._context = None
@@ -0,0 +1,248 @@
+"""
+Persistent conversation store
+
+Chat turns of all sessions are kept in one SQLite database (WAL mode, so
+the chat loop and other readers do not block each other). Message text is
+indexed with FTS5, so questions like "what did we find about X last week"
+are answered from the index rather than by scanning history. Large
+messages (typically research reports) are stored zlib-compressed; the FTS
+table is contentless and only holds the index, so compressed text is not
+duplicated in the index.
+"""
+
+import os
+import re
+import time
+import uuid
+import zlib
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONVERSATION_DB = os.getenv('CONVERSATION_DB', os.path.expanduser("~/.cache/crew_llm/conversations.sqlite"))
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Question words that would match nearly every message (English and German)
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "about", "with", "what", "which", "who",
+    "did", "do", "does", "we", "you", "i", "it", "is", "was", "were", "are", "find", "found", "last", "week",
+    "der", "die", "das", "und", "oder", "zu", "im", "in", "über", "mit", "was", "wer", "wir", "ich", "es",
+    "ist", "war", "haben", "hatten", "letzte", "woche", "gefunden", "zum", "zur", "den", "dem", "ein", "eine",
+}
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query (quoted terms joined by OR, ranked by bm25)
+
+    Returns:
+        Query string, None if the text has no searchable terms
+    """
+    terms = [term for term in _TERM_RE.findall(text.lower()) if term not in _STOPWORDS]
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+
+class ConversationStore:
+    """SQLite message store with FTS5 recall and compression of large messages"""
+
+    def __init__(self, path: str = DEFAULT_CONVERSATION_DB, compress_threshold: int = 4096):
+        """
+        Args:
+            path: SQLite file (":memory:" for a throwaway store)
+            compress_threshold: Messages larger than this many bytes are stored zlib-compressed
+        """
+        self.path = path
+        self.compress_threshold = compress_threshold
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY, title TEXT, created REAL NOT NULL, updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, role TEXT NOT NULL,
+                content BLOB NOT NULL, compressed INTEGER NOT NULL, created REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='', tokenize='unicode61');
+        """)
+
+    def _encode(self, content: str) -> Any:
+        data = content.encode()
+        if len(data) > self.compress_threshold:
+            return sqlite3.Binary(zlib.compress(data, 6)), 1
+        return content, 0
+
+    @staticmethod
+    def _decode(content: Any, compressed: int) -> str:
+        return zlib.decompress(content).decode() if compressed else content
+
+    def create_session(self, title: Optional[str] = None, session_id: Optional[str] = None) -> str:
+        """
+        Register a chat session (existing sessions are kept)
+
+        Args:
+            title: Optional label
+            session_id: Session ID to use, a new one is generated if omitted
+
+        Returns:
+            Session ID
+        """
+        session_id = session_id or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO sessions (id, title, created, updated) VALUES (?, ?, ?, ?)",
+                               (session_id, title, now, now))
+        return session_id
+
+    def append(self, session_id: str, role: str, content: str, created: Optional[float] = None) -> int:
+        """
+        Store one message
+
+        Args:
+            session_id: Session ID
+            role: "user" or "assistant"
+            content: Message text
+            created: Unix timestamp (default: now)
+
+        Returns:
+            Message ID
+        """
+        created = created or time.time()
+        stored, compressed = self._encode(content)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                message_id = self._conn.execute(
+                    "INSERT INTO messages (session_id, role, content, compressed, created) VALUES (?, ?, ?, ?, ?)",
+                    (session_id, role, stored, compressed, created)
+                ).lastrowid
+                self._conn.execute("INSERT INTO messages_fts (rowid, content) VALUES (?, ?)", (message_id, content))
+                self._conn.execute(
+                    "INSERT INTO sessions (id, created, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET updated = excluded.updated",
+                    (session_id, created, created)
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+        return message_id
+
+    def recent(self, session_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Latest messages of a session, oldest first
+
+        Args:
+            session_id: Session ID
+            limit: Maximum number of messages
+
+        Returns:
+            List of {"id", "role", "content", "created"}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, role, content, compressed, created FROM messages WHERE session_id = ? "
+                "ORDER BY id DESC LIMIT ?", (session_id, limit)
+            ).fetchall()
+        return [
+            {"id": row[0], "role": row[1], "content": self._decode(row[2], row[3]), "created": row[4]}
+            for row in reversed(rows)
+        ]
+
+    def search(self, query: str, session_id: Optional[str] = None, since: Optional[float] = None,
+               role: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Full-text search over stored messages
+
+        Args:
+            query: Free text; stopwords are dropped and the remaining terms are OR-ed
+            session_id: Restrict to one session
+            since: Only messages created at or after this Unix timestamp
+            role: Restrict to "user" or "assistant" messages
+            limit: Maximum number of results
+
+        Returns:
+            Best matches first: {"id", "session_id", "role", "content", "created", "rank"}
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        sql = ("SELECT m.id, m.session_id, m.role, m.content, m.compressed, m.created, messages_fts.rank "
+               "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid WHERE messages_fts MATCH ?")
+        params: List[Any] = [match]
+        if session_id is not None:
+            sql += " AND m.session_id = ?"
+            params.append(session_id)
+        if since is not None:
+            sql += " AND m.created >= ?"
+            params.append(since)
+        if role is not None:
+            sql += " AND m.role = ?"
+            params.append(role)
+        sql += " ORDER BY messages_fts.rank LIMIT ?"
+        params.append(limit)
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"⚠️ Conversation search failed: {e}")
+            return []
+        return [
+            {"id": row[0], "session_id": row[1], "role": row[2], "content": self._decode(row[3], row[4]),
+             "created": row[5], "rank": row[6]}
+            for row in rows
+        ]
+
+    def sessions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recently active sessions with their message counts"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.id, s.title, s.created, s.updated, "
+                "(SELECT COUNT(*) FROM messages m WHERE m.session_id = s.id) "
+                "FROM sessions s ORDER BY s.updated DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"id": row[0], "title": row[1], "created": row[2], "updated": row[3], "messages": row[4]}
+                for row in rows]
+
+    def delete_session(self, session_id: str) -> int:
+        """
+        Remove a session and its messages from the store and the index
+
+        Returns:
+            Number of deleted messages
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, content, compressed FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchall()
+            self._conn.execute("BEGIN")
+            try:
+                # A contentless FTS5 table needs the original text to remove its index entries
+                self._conn.executemany(
+                    "INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', ?, ?)",
+                    [(row[0], self._decode(row[1], row[2])) for row in rows]
+                )
+                self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
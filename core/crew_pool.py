@@ -0,0 +1,248 @@
+"""
+Pool of pre-built crews per chat route
+
+Building a Crew (agents, tools, task wiring) for every chat message is
+wasted work: the crew for a route only differs in the task description.
+CrewPool builds one crew per route up front from a factory whose tasks
+use {placeholders}; each run checks a crew out, kicks it off with the
+per-request values as inputs (CrewAI re-interpolates the original task
+templates on every kickoff) and returns it to the pool.
+
+A crew instance serves one run at a time. When all instances of a route
+are busy, the pool adds copies (Crew.copy() clones agents and tasks) up to
+max_per_route and otherwise waits for one to be returned.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CrewPool:
+    """Reusable crews keyed by route"""
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]], max_per_route: int = 1, prebuild: bool = True):
+        """
+        Args:
+            factories: Route name -> function building that route's crew (task templates with placeholders)
+            max_per_route: Crews per route that may run concurrently
+            prebuild: Build one crew per route now instead of on first use
+        """
+        self.factories = factories
+        self.max_per_route = max(1, max_per_route)
+        self._idle: Dict[str, Deque[Any]] = {route: deque() for route in factories}
+        self._templates: Dict[str, Any] = {}
+        self._size: Dict[str, int] = {route: 0 for route in factories}
+        self._condition = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.builds = 0
+        self.reuses = 0
+        self.build_seconds = 0.0
+        self.orphaned = 0  # Cancelled runs whose threads are still running
+        if prebuild:
+            for route in factories:
+                with self._condition:
+                    self._size[route] += 1
+                self._idle[route].append(self._build(route))
+
+    def _build(self, route: str) -> Any:
+        """Build a crew for a route: from the factory the first time, then by copying a pristine template"""
+        started = time.perf_counter()
+        template = self._templates.get(route)
+        if template is not None:
+            crew = template.copy()
+        else:
+            crew = self.factories[route]()
+            # Kickoff overwrites task descriptions, so copies are taken from a never-run snapshot.
+            # Kept even for one crew per route: a discarded crew is replaced by a copy with cloned
+            # agents, never by another factory crew on the factory's (shared) agent objects
+            self._templates[route] = crew.copy()
+        elapsed = time.perf_counter() - started
+        with self._condition:
+            self.builds += 1
+            self.build_seconds += elapsed
+        logger.info(f"✅ Built {route} crew in {elapsed * 1000:.0f}ms")
+        return crew
+
+    def checkout(self, route: str, timeout: Optional[float] = None) -> Any:
+        """
+        Take an idle crew for a route, building one if the route is below max_per_route
+
+        Args:
+            route: Route name
+            timeout: Seconds to wait for a busy crew (None waits indefinitely)
+
+        Returns:
+            Crew, reset for a new run
+
+        Raises:
+            KeyError: Unknown route
+            TimeoutError: No crew became available in time
+        """
+        if route not in self.factories:
+            raise KeyError(f"Unknown crew route: {route}")
+        build = False
+        with self._condition:
+            while not self._idle[route]:
+                if self._size[route] < self.max_per_route:
+                    self._size[route] += 1
+                    build = True
+                    break
+                if not self._condition.wait(timeout):
+                    raise TimeoutError(f"No {route} crew available after {timeout}s")
+            if not build:
+                crew = self._idle[route].pop()
+                self.reuses += 1
+        if build:
+            try:
+                crew = self._build(route)
+            except Exception:
+                with self._condition:
+                    self._size[route] -= 1
+                    self._condition.notify()
+                raise
+        self._reset(crew)
+        return crew
+
+    def release(self, route: str, crew: Any) -> None:
+        """Return a crew to the pool"""
+        with self._condition:
+            self._idle[route].append(crew)
+            self._condition.notify()
+        self._wake_async_waiters()
+
+    def discard(self, route: str) -> None:
+        """Forget a checked-out crew that may be in a broken state (a fresh one is built on demand)"""
+        with self._condition:
+            self._size[route] -= 1
+            self._condition.notify()
+        self._wake_async_waiters()
+
+    def _wake_async_waiters(self) -> None:
+        """Let coroutines waiting in checkout_async look again (they recheck their route)"""
+        with self._condition:
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            if not waiter.done():
+                loop.call_soon_threadsafe(lambda waiter=waiter: waiter.done() or waiter.set_result(None))
+
+    async def checkout_async(self, route: str) -> Any:
+        """
+        checkout() for coroutines: waiting for a busy crew holds no executor thread
+
+        Waiting in a thread would let more queued messages than the default executor has
+        threads starve the crew runs (which also need them) that would free a crew.
+        """
+        if route not in self.factories:
+            raise KeyError(f"Unknown crew route: {route}")
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                available = bool(self._idle[route]) or self._size[route] < self.max_per_route
+                if not available:
+                    waiter = loop.create_future()
+                    self._async_waiters.append((loop, waiter))
+            if not available:
+                await waiter
+                continue
+            try:
+                # In a thread: checking out may build a crew
+                return await asyncio.to_thread(self.checkout, route, 0)
+            except TimeoutError:
+                continue  # Taken by another caller in the meantime
+
+    @staticmethod
+    def _reset(crew: Any) -> None:
+        """Clear per-run state that CrewAI keeps on agents and tasks between kickoffs"""
+        for task in crew.tasks:
+            task.output = None
+        for agent in crew.agents:
+            agent.tools_results = []
+
+    @contextmanager
+    def crew(self, route: str, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Check out a crew for the duration of a with block"""
+        crew = self.checkout(route, timeout)
+        try:
+            yield crew
+        except BaseException:
+            # An interrupted run may leave the crew half-updated: build a new one next time
+            self.discard(route)
+            raise
+        else:
+            self.release(route, crew)
+
+    def kickoff(self, route: str, inputs: Dict[str, Any],
+                before_kickoff: Optional[Callable[[Any], None]] = None) -> Any:
+        """
+        Run a route's crew with the given template inputs
+
+        Args:
+            route: Route name
+            inputs: Template inputs
+            before_kickoff: Called with the checked-out crew before it starts (e.g. to
+                subscribe to the events of its tasks)
+        """
+        with self.crew(route) as crew:
+            if before_kickoff is not None:
+                before_kickoff(crew)
+            return crew.kickoff(inputs=inputs)
+
+    async def kickoff_async(self, route: str, inputs: Dict[str, Any],
+                            before_kickoff: Optional[Callable[[Any], None]] = None) -> Any:
+        """
+        Async variant of kickoff (waiting for a busy crew does not block the event loop)
+
+        Cancelling the caller cannot stop the crew's thread. Its crew is discarded
+        (the replacement is a template copy with its own agents, so the two runs
+        never share agent state) and the run counts as orphaned until it ends.
+        """
+        crew = await self.checkout_async(route)
+        run: Optional[asyncio.Future] = None
+        try:
+            if before_kickoff is not None:
+                before_kickoff(crew)
+            run = asyncio.ensure_future(crew.kickoff_async(inputs=inputs))
+            result = await asyncio.shield(run)
+        except asyncio.CancelledError:
+            self.discard(route)
+            if run is not None and not run.done():
+                self._track_orphan(route, run)
+            raise
+        except BaseException:
+            self.discard(route)
+            raise
+        self.release(route, crew)
+        return result
+
+    def _track_orphan(self, route: str, run: asyncio.Future) -> None:
+        """Count a cancelled run until its thread actually finishes"""
+        with self._condition:
+            self.orphaned += 1
+        logger.warning(f"⚠️ Cancelled {route} run keeps running in the background; its crew is discarded")
+
+        def finished(future: asyncio.Future) -> None:
+            with self._condition:
+                self.orphaned -= 1
+            error = None if future.cancelled() else future.exception()
+            logger.info(f"✅ Cancelled {route} run finished" + (f" ({type(error).__name__})" if error else ""))
+
+        run.add_done_callback(finished)
+
+    def stats(self) -> Dict[str, Any]:
+        """Build/reuse counters and pool occupancy"""
+        with self._condition:
+            return {
+                "builds": self.builds,
+                "reuses": self.reuses,
+                "build_seconds": self.build_seconds,
+                "crews": dict(self._size),
+                "idle": {route: len(idle) for route, idle in self._idle.items()},
+                "orphaned": self.orphaned,
+            }
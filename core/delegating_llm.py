@@ -0,0 +1,99 @@
+"""
+Base class for LLM wrappers
+
+CrewAI's before_llm_call hooks can modify or block a call but cannot answer
+it, so features that short-circuit or redirect calls (response caches,
+routing) wrap an LLM instead. A DelegatingLLM is a BaseLLM, so it can be
+passed to Agent(llm=...) anywhere a plain LLM is accepted.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+from crewai.llms.base_llm import BaseLLM, call_stop_override, call_stream_override
+
+
+class DelegatingLLM(BaseLLM):
+    """Forwards calls and capability queries to an inner LLM"""
+
+    llm_type: str = "delegating"
+    inner: BaseLLM
+
+    def __init__(self, inner: BaseLLM, **kwargs: Any):
+        """
+        Args:
+            inner: LLM that serves calls
+            **kwargs: Additional fields of the subclass
+        """
+        kwargs.setdefault("model", inner.model)
+        kwargs.setdefault("temperature", inner.temperature)
+        kwargs.setdefault("provider", inner.provider)
+        kwargs.setdefault("stop", list(inner.stop))
+        super().__init__(inner=inner, **kwargs)
+
+    @contextmanager
+    def _forwarding(self, llm: Optional[BaseLLM] = None) -> Iterator[BaseLLM]:
+        """Apply this wrapper's per-call stop/stream overrides to the target LLM"""
+        llm = llm or self.inner
+        with call_stop_override(llm, self.stop_sequences):
+            stream = self._effective_stream()
+            if stream is None:
+                yield llm
+            else:
+                with call_stream_override(llm, stream):
+                    yield llm
+
+    def _streams(self, llm: Optional[BaseLLM] = None) -> bool:
+        """Whether a call forwarded to llm (default: the inner LLM) streams tokens, through nested wrappers"""
+        stream = self._effective_stream()
+        llm = llm or self.inner
+        while stream is None and llm is not None:
+            stream = llm._effective_stream()
+            llm = getattr(llm, "inner", None)
+        return bool(stream)
+
+    def _call_inner(self, llm: BaseLLM, messages: Any, tools: Optional[List[dict]] = None,
+                    callbacks: Optional[List[Any]] = None, available_functions: Optional[dict] = None,
+                    from_task: Any = None, from_agent: Any = None, response_model: Any = None) -> Any:
+        """Call a wrapped LLM with this wrapper's call overrides"""
+        with self._forwarding(llm) as target:
+            return target.call(messages, tools=tools, callbacks=callbacks,
+                               available_functions=available_functions, from_task=from_task,
+                               from_agent=from_agent, response_model=response_model)
+
+    async def _acall_inner(self, llm: BaseLLM, messages: Any, tools: Optional[List[dict]] = None,
+                           callbacks: Optional[List[Any]] = None, available_functions: Optional[dict] = None,
+                           from_task: Any = None, from_agent: Any = None, response_model: Any = None) -> Any:
+        """Async variant of _call_inner"""
+        with self._forwarding(llm) as target:
+            return await target.acall(messages, tools=tools, callbacks=callbacks,
+                                      available_functions=available_functions, from_task=from_task,
+                                      from_agent=from_agent, response_model=response_model)
+
+    def call(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[dict] = None, from_task: Any = None, from_agent: Any = None,
+             response_model: Any = None) -> Any:
+        return self._call_inner(self.inner, messages, tools, callbacks, available_functions,
+                                from_task, from_agent, response_model)
+
+    async def acall(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+                    available_functions: Optional[dict] = None, from_task: Any = None, from_agent: Any = None,
+                    response_model: Any = None) -> Any:
+        return await self._acall_inner(self.inner, messages, tools, callbacks, available_functions,
+                                       from_task, from_agent, response_model)
+
+    # Capability queries describe the wrapped model
+    def supports_function_calling(self) -> bool:
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def supports_multimodal(self) -> bool:
+        return self.inner.supports_multimodal()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
+
+    def get_token_usage_summary(self) -> Any:
+        return self.inner.get_token_usage_summary()
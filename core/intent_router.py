@@ -0,0 +1,206 @@
+"""
+Intent routing for the manager chat
+
+Each route (research, editor, management) is described by example
+requests. Their bge-m3 embeddings form a prototype matrix; an incoming
+message is embedded once and scored against every prototype with a single
+matrix product, and the route of the best-matching prototype wins. The
+prototype matrix is cached on disk, keyed by the embedding model and the
+example texts, so startup does not re-embed unchanged examples.
+
+Without the embedding server (or below the minimum similarity) the
+keyword lists previously used by chat_with_manager decide.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROTOTYPE_CACHE_DIR = os.getenv(
+    'INTENT_PROTOTYPE_CACHE_DIR', os.path.expanduser("~/.cache/crew_llm/intent_prototypes")
+)
+
+# Route definitions: keyword lists (fallback) and example requests (prototypes)
+CHAT_ROUTES: Dict[str, Dict[str, List[str]]] = {
+    "research": {
+        "keywords": ["recherche", "bericht", "analyse", "studie", "untersuchung", "informationen", "daten"],
+        "examples": [
+            "Recherchiere die aktuellen Entwicklungen bei Festkörperbatterien",
+            "Erstelle einen Bericht über den Markt für Wärmepumpen in Deutschland",
+            "Analysiere die Vor- und Nachteile von Open-Source-LLMs",
+            "Welche Studien gibt es zu den Auswirkungen von Homeoffice auf die Produktivität?",
+            "Finde Informationen und Quellen zur neuen EU-KI-Verordnung",
+            "Wie hat sich der Bitcoin-Kurs in den letzten Jahren entwickelt und warum?",
+            "Research the latest developments in solid-state batteries",
+            "Compare the pricing of the major cloud GPU providers with sources",
+            "What does current research say about intermittent fasting?",
+            "Give me data on renewable energy adoption in Europe",
+        ],
+    },
+    "editor": {
+        "keywords": ["content", "artikel", "schreiben", "text", "inhalt", "erstellen", "wordpress", "forum", "social"],
+        "examples": [
+            "Schreibe einen Blogartikel über nachhaltiges Reisen",
+            "Formuliere einen LinkedIn-Post zur Produkteinführung",
+            "Verfasse einen WordPress-Beitrag mit SEO-optimierter Überschrift",
+            "Überarbeite diesen Text, damit er freundlicher klingt",
+            "Erstelle drei Tweets zu unserem neuen Feature",
+            "Schreib eine Antwort für den Forenthread über Datenschutz",
+            "Write a blog post introducing our new app",
+            "Draft a newsletter for our customers about the summer sale",
+            "Rewrite this paragraph in a more professional tone",
+            "Create social media captions for the product launch",
+        ],
+    },
+    "management": {
+        "keywords": ["projekt", "management", "koordination", "planung", "bitwarden", "passwort", "api"],
+        "examples": [
+            "Plane die nächsten Schritte für das Website-Projekt",
+            "Wer im Team sollte die Migration übernehmen?",
+            "Hole den API-Schlüssel für den WordPress-Zugang aus Bitwarden",
+            "Erstelle einen Zeitplan für den Relaunch mit Meilensteinen",
+            "Koordiniere Recherche und Redaktion für die Kampagne",
+            "Welche Aufgaben sind diese Woche noch offen?",
+            "Prioritize the backlog for the next sprint",
+            "Store the new database password in the vault",
+            "Assign the research and writing tasks for the launch campaign",
+            "What is the status of the project and what are the risks?",
+        ],
+    },
+}
+
+
+@dataclass
+class RouteDecision:
+    """Result of routing one message"""
+    route: str
+    confidence: float
+    method: str  # "embedding", "keyword" or "default"
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+def keyword_route(message: str, routes: Dict[str, Dict[str, List[str]]], default_route: str) -> RouteDecision:
+    """
+    Route by keyword hits (the route with the most hits wins, ties go to the earlier route)
+
+    Confidence is the winning route's share of all keyword hits.
+    """
+    message_lower = message.lower()
+    hits = {name: sum(k in message_lower for k in spec.get("keywords", [])) for name, spec in routes.items()}
+    total = sum(hits.values())
+    if not total:
+        return RouteDecision(default_route, 0.0, "default", {name: 0.0 for name in routes})
+    best = max(hits, key=hits.get)
+    return RouteDecision(best, hits[best] / total, "keyword", {name: count / total for name, count in hits.items()})
+
+
+class IntentRouter:
+    """Routes chat messages by embedding similarity to route prototypes"""
+
+    def __init__(self, embedder: Any = None, routes: Optional[Dict[str, Dict[str, List[str]]]] = None,
+                 default_route: str = "management", min_similarity: float = 0.45,
+                 cache_dir: Optional[str] = DEFAULT_PROTOTYPE_CACHE_DIR, retry_interval: float = 60.0):
+        """
+        Args:
+            embedder: BGEEmbedder (None routes by keywords only)
+            routes: Route definitions with "keywords" and "examples" (default: CHAT_ROUTES)
+            default_route: Route when nothing matches
+            min_similarity: Best cosine similarity below which the keyword route is preferred
+            cache_dir: Directory for cached prototype matrices (None disables the cache)
+            retry_interval: Seconds to route by keywords after an embedding failure
+        """
+        self.embedder = embedder
+        self.routes = routes or CHAT_ROUTES
+        self.default_route = default_route
+        self.min_similarity = min_similarity
+        self.cache_dir = cache_dir
+        self.retry_interval = retry_interval
+        self._retry_at = 0.0
+        self.route_names = list(self.routes)
+        self._prototypes: Optional[np.ndarray] = None
+        # Row ranges of each route in the prototype matrix
+        self._offsets = np.cumsum([0] + [len(self.routes[name].get("examples", [])) for name in self.route_names])
+
+    def _cache_path(self) -> Optional[str]:
+        if not self.cache_dir or self.embedder is None:
+            return None
+        payload = json.dumps([getattr(self.embedder, "model", ""), self.route_names,
+                              [self.routes[name].get("examples", []) for name in self.route_names]])
+        digest = hashlib.sha256(payload.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.npy")
+
+    def prototypes(self) -> Optional[np.ndarray]:
+        """
+        Prototype matrix (one unit-length row per example), embedded once and cached
+
+        Returns:
+            Matrix or None if the examples cannot be embedded
+        """
+        if self._prototypes is not None or self.embedder is None:
+            return self._prototypes
+        path = self._cache_path()
+        if path and os.path.exists(path):
+            try:
+                matrix = np.load(path)
+                if len(matrix) == self._offsets[-1]:
+                    self._prototypes = matrix
+                    return matrix
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Ignoring unreadable prototype cache {path}: {e}")
+
+        examples = [example for name in self.route_names for example in self.routes[name].get("examples", [])]
+        matrix = self.embedder.embed_many(examples) if examples else None
+        if matrix is None:
+            return None
+        self._prototypes = np.ascontiguousarray(matrix, dtype=np.float32)
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.save(path, self._prototypes)
+            logger.info(f"✅ Cached {len(examples)} intent prototypes in {path}")
+        return self._prototypes
+
+    def score(self, vector: np.ndarray) -> Dict[str, float]:
+        """Best cosine similarity per route for a unit-length message embedding"""
+        similarities = self._prototypes @ vector
+        best = np.maximum.reduceat(similarities, self._offsets[:-1])
+        return dict(zip(self.route_names, best.tolist()))
+
+    def route(self, message: str) -> RouteDecision:
+        """
+        Pick the route for a message
+
+        Args:
+            message: User message
+
+        Returns:
+            RouteDecision with the route, its confidence and how it was decided
+        """
+        if time.monotonic() < self._retry_at:
+            return keyword_route(message, self.routes, self.default_route)
+        prototypes = self.prototypes()
+        vector = self.embedder.embed(message) if prototypes is not None else None
+        if vector is None or vector.shape[0] != prototypes.shape[1]:
+            if self.embedder is not None:
+                # Embedding server down: skip it for a while instead of waiting on every message
+                self._retry_at = time.monotonic() + self.retry_interval
+            return keyword_route(message, self.routes, self.default_route)
+
+        scores = self.score(vector)
+        ranked = sorted(scores.values(), reverse=True)
+        best = max(scores, key=scores.get)
+        if ranked[0] < self.min_similarity:
+            fallback = keyword_route(message, self.routes, self.default_route)
+            if fallback.method == "keyword":
+                return fallback
+        # Confidence: similarity of the winner, discounted when the runner-up is close
+        margin = ranked[0] - ranked[1] if len(ranked) > 1 else ranked[0]
+        confidence = float(max(0.0, min(1.0, ranked[0])) * min(1.0, 0.5 + 5 * margin))
+        return RouteDecision(best, confidence, "embedding", scores)
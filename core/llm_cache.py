@@ -0,0 +1,340 @@
+"""
+On-disk exact-match LLM response cache
+
+Identical calls (same model, messages, temperature and tools) are answered
+from a local SQLite file instead of the llama server or a cloud API.
+Caching is opt-in per LLM: wrap only models whose answers are worth
+reusing, e.g. CachedLLM(local_llm, cache=response_cache). A semantic cache
+(see core.llm_semantic_cache) can be layered behind the exact-match cache.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import Field
+
+from core.delegating_llm import DelegatingLLM
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.expanduser("~/.cache/crew_llm/responses.sqlite"))
+
+
+def _stable_default(value: Any) -> Any:
+    """JSON fallback that never includes memory addresses"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return getattr(value, "name", type(value).__name__)
+
+
+def make_cache_key(model: str, messages: Any, temperature: Optional[float] = None,
+                   tools: Optional[List[dict]] = None) -> str:
+    """
+    Hash the inputs that determine an LLM response
+
+    Args:
+        model: Model identifier
+        messages: Prompt string or message list
+        temperature: Sampling temperature
+        tools: Tool schemas offered to the model
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "tools": tools},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_stable_default
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed response store with TTL and size-based eviction"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = 7 * 86400,
+                 max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite file
+            ttl: Seconds an entry stays valid
+            max_bytes: Total response size before least recently used entries are evicted
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._model_stats: Dict[str, Dict[str, int]] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL,"
+            " size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _count(self, model: str, outcome: str) -> None:
+        stats = self._model_stats.setdefault(model, {"hits": 0, "misses": 0})
+        stats[outcome] += 1
+
+    def get(self, key: str, model: str = "") -> Optional[str]:
+        """
+        Look up a response
+
+        Args:
+            key: Cache key (see make_cache_key)
+            model: Model name, for per-model statistics
+
+        Returns:
+            Cached response or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._delete(key)
+                self.misses += 1
+                self._count(model, "misses")
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self._count(model, "hits")
+            return row[0]
+
+    def put(self, key: str, response: str, model: str = "") -> None:
+        """
+        Store a response, evicting least recently used entries over the size limit
+
+        Args:
+            key: Cache key (see make_cache_key)
+            response: Response text
+            model: Model name
+        """
+        size = len(response.encode())
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                "INSERT INTO responses (key, model, response, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now)
+            )
+            self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict(now)
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= row[0]
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones down to 90% of the limit"""
+        removed = self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,)).rowcount
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        target = self.max_bytes * 0.9
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            removed += 1
+        self.evictions += removed
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, per-model breakdown and storage usage"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "models": {model: dict(stats) for model, stats in self._model_stats.items()},
+        }
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
+
+
+_ACTION_LINE = re.compile(r"^\s*Action\s*:", re.MULTILINE)
+
+
+def is_final_answer(response: str) -> bool:
+    """
+    Whether a reply ends the agent loop: a ReAct "Final Answer" or a plain reply
+
+    Intermediate "Thought/Action/Action Input" steps are never reused semantically:
+    replayed for another question they would run tools with that question's
+    arguments. (The exact-match key covers the whole conversation, so replaying
+    an identical step there is safe.)
+    """
+    return "Final Answer:" in response or not _ACTION_LINE.search(response)
+
+
+def semantic_prompt(messages: Any) -> Optional[str]:
+    """
+    Final user message of the opening turn of a conversation
+
+    Later turns (after an assistant reply) depend on intermediate tool
+    results and are never answered semantically.
+    """
+    if isinstance(messages, str):
+        return messages
+    prompt = None
+    for message in messages:
+        role = message.get("role")
+        if role == "assistant":
+            return None
+        if role == "user" and isinstance(message.get("content"), str):
+            prompt = message["content"]
+    return prompt
+
+
+def semantic_route(model: str, messages: Any, tools: Optional[List[dict]] = None) -> str:
+    """Route key: model plus a hash of the system prompt and offered tools"""
+    system = [] if isinstance(messages, str) else [
+        message.get("content") for message in messages if message.get("role") == "system"
+    ]
+    tool_names = sorted(
+        str(((tool.get("function") or tool) if isinstance(tool, dict) else {}).get("name", "")) for tool in (tools or [])
+    )
+    digest = hashlib.sha256(json.dumps([system, tool_names], default=str).encode()).hexdigest()[:16]
+    return f"{model}|{digest}"
+
+
+class CachedLLM(DelegatingLLM):
+    """LLM wrapper that answers repeated calls from exact-match and/or semantic caches"""
+
+    llm_type: str = "cached"
+    cache: Any = Field(default=None, exclude=True)
+    semantic_cache: Any = Field(default=None, exclude=True)
+    embedder: Any = Field(default=None, exclude=True)
+    # Maps the opening user message to the text compared semantically (e.g. the user's request
+    # without task template and conversation context); None skips the semantic cache for the call
+    prompt_extractor: Optional[Callable[[str], Optional[str]]] = Field(default=None, exclude=True)
+
+    def _cacheable(self, response_model: Any) -> bool:
+        # Structured objects are never replayed; offered tools are part of the cache key
+        return response_model is None
+
+    @staticmethod
+    def _watching(available_functions: Optional[dict], ran: List[str]) -> Optional[dict]:
+        """
+        available_functions that record when the LLM executes one
+
+        With available_functions the LLM runs a requested tool itself and returns
+        its output: that string is a tool result, not a reply, and is not cached.
+        """
+        if not available_functions:
+            return available_functions
+
+        def watch(name: str, function: Callable[..., Any]) -> Callable[..., Any]:
+            def run(*args: Any, **kwargs: Any) -> Any:
+                ran.append(name)
+                return function(*args, **kwargs)
+            return run
+
+        return {name: watch(name, function) for name, function in available_functions.items()}
+
+    def _lookup(self, messages: Any, tools: Optional[List[dict]]) -> Any:
+        """Return (store state, cached response or None)"""
+        model = self.inner.model
+        key = make_cache_key(model, messages, self.inner.temperature, tools) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key, model)
+            if cached is not None:
+                return (key, None, None, None), cached
+
+        vector = route = prompt = None
+        if self.semantic_cache is not None and self.embedder is not None:
+            prompt = semantic_prompt(messages)
+            if prompt and self.prompt_extractor is not None:
+                prompt = self.prompt_extractor(prompt)
+            vector = self.embedder.embed(prompt) if prompt else None
+            if vector is not None:
+                route = semantic_route(model, messages, tools)
+                cached = self.semantic_cache.lookup(vector, route)
+                if cached is not None and is_final_answer(cached):
+                    if key is not None:
+                        # Identical follow-ups are then served by the exact-match cache
+                        self.cache.put(key, cached, model)
+                    return (key, None, None, None), cached
+        return (key, vector, route, prompt), None
+
+    def _store(self, state: Any, response: Any) -> None:
+        if not isinstance(response, str) or not response:
+            return
+        key, vector, route, prompt = state
+        if key is not None:
+            self.cache.put(key, response, self.inner.model)
+        if vector is not None and is_final_answer(response):
+            self.semantic_cache.put(vector, route, prompt, response)
+
+    def call(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[dict] = None, from_task: Any = None, from_agent: Any = None,
+             response_model: Any = None) -> Any:
+        if not self._cacheable(response_model):
+            return self._call_inner(self.inner, messages, tools, callbacks, available_functions,
+                                    from_task, from_agent, response_model)
+        state, cached = self._lookup(messages, tools)
+        if cached is not None:
+            logger.debug("💾 LLM cache hit for %s", self.inner.model)
+            return cached
+        ran: List[str] = []
+        functions = self._watching(available_functions, ran)
+        response = self._call_inner(self.inner, messages, tools, callbacks, functions,
+                                    from_task, from_agent, response_model)
+        if not ran:
+            self._store(state, response)
+        return response
+
+    async def acall(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+                    available_functions: Optional[dict] = None, from_task: Any = None, from_agent: Any = None,
+                    response_model: Any = None) -> Any:
+        if not self._cacheable(response_model):
+            return await self._acall_inner(self.inner, messages, tools, callbacks, available_functions,
+                                           from_task, from_agent, response_model)
+        state, cached = self._lookup(messages, tools)
+        if cached is not None:
+            logger.debug("💾 LLM cache hit for %s", self.inner.model)
+            return cached
+        ran: List[str] = []
+        functions = self._watching(available_functions, ran)
+        response = await self._acall_inner(self.inner, messages, tools, callbacks, functions,
+                                           from_task, from_agent, response_model)
+        if not ran:
+            self._store(state, response)
+        return response
@@ -0,0 +1,295 @@
+"""
+Latency-aware LLM router with circuit breaking and hedged requests
+
+RoutingLLM presents one LLM to agents and spreads calls over several
+backends (e.g. the local llama server and the cloud models). It tracks
+latency and errors per backend, stops sending traffic to a backend whose
+circuit breaker is open, fails over on errors, and can hedge: if the chosen
+backend has not answered after its p95 latency, the next backend is asked
+too and the first answer wins. Streaming backends are never hedged: both
+calls would emit their tokens, interleaved, into the same chat stream.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import Field, PrivateAttr
+
+from crewai.llms.base_llm import BaseLLM
+
+from core.delegating_llm import DelegatingLLM
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class BackendStats:
+    """Latency window, error counters and circuit breaker state of one backend"""
+
+    def __init__(self, name: str, window: int = 100, failure_threshold: int = 3,
+                 cooldown: float = 30.0, max_cooldown: float = 600.0):
+        """
+        Args:
+            name: Backend label (model name)
+            window: Number of recent latencies kept for percentiles
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown: Seconds before an open circuit lets a trial call through
+            max_cooldown: Upper bound when the cooldown doubles after failed trials
+        """
+        self.name = name
+        self.latencies: deque = deque(maxlen=window)
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.state = CIRCUIT_CLOSED
+        self.opened_at = 0.0
+        self.ewma_latency: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def available(self, now: float) -> bool:
+        """Whether a call could be sent (read-only: an open circuit qualifies once its cooldown passed)"""
+        with self._lock:
+            return self.state == CIRCUIT_CLOSED or (
+                self.state == CIRCUIT_OPEN and now - self.opened_at >= self.cooldown
+            )
+
+    def acquire(self, now: float) -> bool:
+        """
+        Admit a call that is about to be sent
+
+        An open circuit past its cooldown admits exactly one trial call and
+        turns half-open until that call is recorded; other calls are refused.
+        """
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return True
+            if self.state == CIRCUIT_OPEN and now - self.opened_at >= self.cooldown:
+                self.state = CIRCUIT_HALF_OPEN
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.latencies.append(latency)
+            self.ewma_latency = latency if self.ewma_latency is None else 0.8 * self.ewma_latency + 0.2 * latency
+            if self.state != CIRCUIT_CLOSED:
+                logger.info(f"✅ LLM backend {self.name} recovered, circuit closed")
+            self.state = CIRCUIT_CLOSED
+            self.cooldown = self.base_cooldown
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == CIRCUIT_HALF_OPEN:
+                # Trial call failed: back off longer before the next one
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+            elif self.state == CIRCUIT_CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def force_open(self) -> None:
+        """Open the circuit immediately (e.g. a failed startup health check)"""
+        with self._lock:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = CIRCUIT_OPEN
+        self.opened_at = time.monotonic()
+        logger.warning(f"⚠️ LLM backend {self.name} circuit open for {self.cooldown:.0f}s")
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency percentile in seconds, None without samples"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+    @property
+    def error_rate(self) -> float:
+        total = self.successes + self.failures
+        return self.failures / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Metrics for logging/monitoring"""
+        return {
+            "state": self.state,
+            "successes": self.successes,
+            "failures": self.failures,
+            "error_rate": self.error_rate,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+        }
+
+
+class RoutingLLM(DelegatingLLM):
+    """Routes calls over several backends with failover, circuit breaking and hedging"""
+
+    llm_type: str = "routing"
+    backends: List[BaseLLM] = Field(exclude=True)
+    latency_aware: bool = False
+    hedge: bool = False
+    hedge_min_samples: int = 20
+    hedge_min_delay: float = 1.0
+    failure_threshold: int = 3
+    cooldown: float = 30.0
+    _stats: List[BackendStats] = PrivateAttr(default_factory=list)
+
+    def __init__(self, backends: List[BaseLLM], **kwargs: Any):
+        """
+        Args:
+            backends: LLMs in priority order (the first one describes the router's capabilities)
+            **kwargs: latency_aware (order by measured latency instead of priority),
+                hedge, hedge_min_samples, hedge_min_delay, failure_threshold, cooldown
+        """
+        if not backends:
+            raise ValueError("RoutingLLM needs at least one backend")
+        super().__init__(backends[0], backends=backends, **kwargs)
+        self._stats = [
+            BackendStats(backend.model, failure_threshold=self.failure_threshold, cooldown=self.cooldown)
+            for backend in backends
+        ]
+
+    def _candidates(self) -> Tuple[List[int], bool]:
+        """Backend indexes to try, best first, and whether they are a fallback past open circuits"""
+        now = time.monotonic()
+        available = [index for index, stats in enumerate(self._stats) if stats.available(now)]
+        if not available:
+            # Every circuit is open: try the least recently opened one rather than fail outright
+            return [min(range(len(self._stats)), key=lambda index: self._stats[index].opened_at)], True
+        if self.latency_aware:
+            # Fastest smoothed latency first; unmeasured backends are tried (in priority order) to get a sample
+            available.sort(key=lambda index: (self._stats[index].ewma_latency or 0.0, index))
+        return available, False
+
+    def _admit(self, index: int, fallback: bool) -> bool:
+        """Claim a backend right before dispatching to it (a recovering backend takes one trial at a time)"""
+        return fallback or self._stats[index].acquire(time.monotonic())
+
+    def _hedge_delay(self, index: int) -> Optional[float]:
+        stats = self._stats[index]
+        if len(stats.latencies) < self.hedge_min_samples:
+            return None
+        return max(stats.percentile(0.95), self.hedge_min_delay)
+
+    def _call_backend(self, index: int, args: tuple) -> Any:
+        """Call one backend and record the outcome"""
+        started = time.monotonic()
+        try:
+            result = self._call_inner(self.backends[index], *args)
+        except Exception:
+            self._stats[index].record_failure()
+            raise
+        self._stats[index].record_success(time.monotonic() - started)
+        return result
+
+    def call(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[dict] = None, from_task: Any = None, from_agent: Any = None,
+             response_model: Any = None) -> Any:
+        args = (messages, tools, callbacks, available_functions, from_task, from_agent, response_model)
+        candidates, fallback = self._candidates()
+        # Calls that execute tools or stream tokens are never duplicated
+        if (self.hedge and not available_functions and len(candidates) > 1
+                and not any(self._streams(self.backends[index]) for index in candidates)):
+            return self._hedged_call(candidates, fallback, args)
+
+        last_error: Optional[Exception] = None
+        for index in candidates:
+            if not self._admit(index, fallback):
+                continue  # Its trial call is already running
+            try:
+                return self._call_backend(index, args)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"⚠️ LLM backend {self.backends[index].model} failed ({type(e).__name__}), failing over")
+        raise last_error or RuntimeError("No LLM backend available (recovery trials in progress)")
+
+    def _start(self, index: int, args: tuple) -> Future:
+        """
+        Call a backend on a thread of its own
+
+        A losing hedged call cannot be cancelled and keeps running; with its own
+        thread it never delays later calls (a shared pool would queue them, and the
+        queueing would count toward the hedge delay).
+        """
+        future: Future = Future()
+        context = contextvars.copy_context()
+
+        def run() -> None:
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(context.run(self._call_backend, index, args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"llm-{self.backends[index].model}", daemon=True).start()
+        return future
+
+    def _hedged_call(self, candidates: List[int], fallback: bool, args: tuple) -> Any:
+        """Start the best backend; add the next one after its p95 latency or on failure"""
+        pending: Dict[Any, int] = {}
+        remaining = list(candidates)
+        last_error: Optional[Exception] = None
+
+        def launch() -> Optional[float]:
+            while remaining:
+                index = remaining.pop(0)
+                if self._admit(index, fallback):
+                    pending[self._start(index, args)] = index
+                    # The timer starts now: the call runs at once on its own thread
+                    return self._hedge_delay(index)
+            return None
+
+        delay = launch()
+        while pending:
+            done, _ = wait(list(pending), timeout=delay if remaining else None, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.info(f"⏱️ Hedging LLM call to {self.backends[remaining[0]].model}")
+                delay = launch()
+                continue
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"⚠️ LLM backend {self.backends[index].model} failed ({type(e).__name__})")
+            if not pending and remaining:
+                delay = launch()
+        raise last_error or RuntimeError("No LLM backend available (recovery trials in progress)")
+
+    async def acall(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+                    available_functions: Optional[dict] = None, from_task: Any = None, from_agent: Any = None,
+                    response_model: Any = None) -> Any:
+        return await asyncio.to_thread(self.call, messages, tools, callbacks, available_functions,
+                                       from_task, from_agent, response_model)
+
+    def open_circuit(self, index: int = 0) -> None:
+        """Take a backend out of rotation until its cooldown passes"""
+        self._stats[index].force_open()
+
+    def get_routing_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-backend latency percentiles, error rates and circuit states"""
+        return {backend.model: stats.snapshot() for backend, stats in zip(self.backends, self._stats)}
+
+    def get_token_usage_summary(self) -> Any:
+        summary = self.backends[0].get_token_usage_summary()
+        for backend in self.backends[1:]:
+            summary.add_usage_metrics(backend.get_token_usage_summary())
+        return summary
@@ -0,0 +1,321 @@
+"""
+Semantic LLM response cache
+
+Rephrased questions reuse earlier answers: the final user message is
+embedded with bge-m3 and compared (cosine) against embeddings of earlier
+prompts on the same route. Embeddings live in a memory-mapped float32
+matrix next to a metadata array and a SQLite table of responses.
+
+Small caches are scanned with one vectorized matrix product. Larger caches
+narrow candidates with random-hyperplane LSH (several tables, probing the
+exact bucket and all buckets one bit away) before the exact cosine check,
+so lookups stay sub-millisecond at 100k entries without an ANN dependency.
+"""
+
+import os
+import json
+import time
+import atexit
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEMANTIC_CACHE_DIR = os.getenv('LLM_SEMANTIC_CACHE_DIR', os.path.expanduser("~/.cache/crew_llm/semantic"))
+
+_META_DTYPE_FIELDS = [("valid", "?"), ("route", "<i8"), ("created", "<f8"), ("last_used", "<f8")]
+
+
+class BGEEmbedder:
+    """Client for an OpenAI-compatible embeddings endpoint (bge-m3 on localhost:8001)"""
+
+    def __init__(self, base_url: str = "http://localhost:8001/v1", model: str = "bge-m3",
+                 api_key: str = "dummy", timeout: float = 5.0):
+        """
+        Args:
+            base_url: API base URL
+            model: Embedding model name
+            api_key: Bearer token (the local server ignores it)
+            timeout: Request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BGEEmbedder":
+        """Build from a CrewAI embedder config dict ({"provider", "config": {...}})"""
+        options = config.get("config", config)
+        return cls(base_url=options.get("base_url", "http://localhost:8001/v1"),
+                   model=options.get("model_name") or options.get("model", "bge-m3"),
+                   api_key=options.get("api_key", "dummy"))
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """
+        Embed one text
+
+        Returns:
+            Unit-length float32 vector, None if the embedding server is unavailable
+        """
+        vectors = self.embed_many([text])
+        if vectors is None or not np.any(vectors[0]):
+            return None
+        return vectors[0]
+
+    def embed_many(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embed several texts in one request
+
+        Returns:
+            (len(texts), dim) float32 matrix of unit-length rows, None if the embedding server is unavailable
+        """
+        try:
+            response = self._session.post(
+                f"{self.base_url}/embeddings",
+                json={"model": self.model, "input": list(texts)},
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = sorted(response.json()["data"], key=lambda row: row.get("index", 0))
+            vectors = np.asarray([row["embedding"] for row in data], dtype=np.float32)
+        except (requests.RequestException, KeyError, IndexError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Embedding request failed: {e}")
+            return None
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            logger.warning("⚠️ Embedding response does not match the request")
+            return None
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+def route_hash(route: str) -> int:
+    """Stable signed 64-bit hash of a route string"""
+    return int.from_bytes(hashlib.blake2b(route.encode(), digest_size=8).digest(), "little", signed=True)
+
+
+class SemanticResponseCache:
+    """Persistent embedding index of prompts with their cached responses"""
+
+    def __init__(self, directory: str = DEFAULT_SEMANTIC_CACHE_DIR, dim: int = 1024,
+                 capacity: int = 100_000, threshold: float = 0.92, max_age: Optional[float] = 7 * 86400,
+                 lsh_tables: int = 8, lsh_bits: int = 16, brute_force_limit: int = 2048, seed: int = 1234):
+        """
+        Args:
+            directory: Directory for the embedding matrix, metadata and responses
+            dim: Embedding dimension (bge-m3: 1024)
+            capacity: Maximum entries; the least recently used entry is replaced when full
+            threshold: Minimum cosine similarity for a hit
+            max_age: Seconds an entry stays valid (None keeps entries until evicted)
+            lsh_tables: Number of LSH hash tables
+            lsh_bits: Hyperplanes per table
+            brute_force_limit: Entry count up to which lookups scan all rows
+            seed: Seed for the LSH hyperplanes (must stay fixed for a directory)
+        """
+        self.directory = directory
+        self.dim = dim
+        self.capacity = capacity
+        self.threshold = threshold
+        self.max_age = max_age
+        self.lsh_tables = lsh_tables
+        self.lsh_bits = lsh_bits
+        self.brute_force_limit = brute_force_limit
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        config = {"dim": dim, "capacity": capacity, "lsh_tables": lsh_tables, "lsh_bits": lsh_bits, "seed": seed}
+        config_path = os.path.join(directory, "config.json")
+        embeddings_path = os.path.join(directory, "embeddings.f32")
+        meta_path = os.path.join(directory, "meta.npy")
+        reuse = False
+        if os.path.exists(config_path):
+            with open(config_path, 'r') as f:
+                reuse = json.load(f) == config and os.path.exists(embeddings_path) and os.path.exists(meta_path)
+
+        meta_dtype = np.dtype(_META_DTYPE_FIELDS + [("sig", "<u4", (lsh_tables,))])
+        if reuse:
+            self.embeddings = np.memmap(embeddings_path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+            self.meta = np.lib.format.open_memmap(meta_path, mode="r+")
+        else:
+            # New directory or changed layout: start empty
+            self.embeddings = np.memmap(embeddings_path, dtype=np.float32, mode="w+", shape=(capacity, dim))
+            self.meta = np.lib.format.open_memmap(meta_path, mode="w+", dtype=meta_dtype, shape=(capacity,))
+            with open(config_path, 'w') as f:
+                json.dump(config, f)
+
+        self._db = sqlite3.connect(os.path.join(directory, "responses.sqlite"),
+                                   check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses (slot INTEGER PRIMARY KEY, prompt TEXT, response TEXT)")
+        if not reuse:
+            self._db.execute("DELETE FROM responses")
+
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((lsh_tables * lsh_bits, dim)).astype(np.float32)
+        self._bit_weights = (1 << np.arange(lsh_bits, dtype=np.uint32)).astype(np.uint32)
+
+        # In-memory LSH buckets and free list, rebuilt from the metadata
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(lsh_tables)]
+        valid_slots = np.flatnonzero(self.meta["valid"])
+        for slot in valid_slots:
+            self._bucket_add(int(slot), self.meta["sig"][slot])
+        self._free: List[int] = [int(slot) for slot in np.flatnonzero(~self.meta["valid"])[::-1]]
+        self._count = len(valid_slots)
+        atexit.register(self.flush)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _signature(self, vector: np.ndarray) -> np.ndarray:
+        bits = (self._planes @ vector > 0).reshape(self.lsh_tables, self.lsh_bits)
+        return bits.astype(np.uint32) @ self._bit_weights
+
+    def _bucket_add(self, slot: int, signature: np.ndarray) -> None:
+        for table, key in enumerate(signature):
+            self._buckets[table].setdefault(int(key), []).append(slot)
+
+    def _bucket_remove(self, slot: int, signature: np.ndarray) -> None:
+        for table, key in enumerate(signature):
+            bucket = self._buckets[table].get(int(key))
+            if bucket and slot in bucket:
+                bucket.remove(slot)
+
+    def _candidates(self, vector: np.ndarray) -> np.ndarray:
+        """Slots sharing an LSH bucket (or a bucket one bit away) with the vector"""
+        if self._count <= self.brute_force_limit:
+            return np.flatnonzero(self.meta["valid"])
+        found = set()
+        for table, key in enumerate(self._signature(vector)):
+            buckets = self._buckets[table]
+            key = int(key)
+            for probe in [key] + [key ^ (1 << bit) for bit in range(self.lsh_bits)]:
+                bucket = buckets.get(probe)
+                if bucket:
+                    found.update(bucket)
+        # Sorted slots make the row gather below mostly sequential
+        return np.sort(np.fromiter(found, dtype=np.int64, count=len(found)))
+
+    def _fits(self, vector: np.ndarray) -> bool:
+        """Whether a vector has the configured dimension (another embedding model would not)"""
+        if np.shape(vector) == (self.dim,):
+            return True
+        logger.warning(f"⚠️ Semantic cache skipped: embedding shape {np.shape(vector)}, expected ({self.dim},)")
+        return False
+
+    def lookup(self, vector: np.ndarray, route: str) -> Optional[str]:
+        """
+        Find a cached response for a semantically similar prompt
+
+        Args:
+            vector: Unit-length prompt embedding
+            route: Route key (model, agent, tools); only entries with the same route match
+
+        Returns:
+            Cached response or None
+        """
+        if not self._fits(vector):
+            self.misses += 1
+            return None
+        now = time.time()
+        with self._lock:
+            candidates = self._candidates(vector)
+            if len(candidates):
+                keep = self.meta["valid"][candidates] & (self.meta["route"][candidates] == route_hash(route))
+                if self.max_age is not None:
+                    keep &= self.meta["created"][candidates] >= now - self.max_age
+                candidates = candidates[keep]
+            if not len(candidates):
+                self.misses += 1
+                return None
+
+            scores = np.asarray(self.embeddings)[candidates] @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            slot = int(candidates[best])
+            row = self._db.execute("SELECT response FROM responses WHERE slot = ?", (slot,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.meta["last_used"][slot] = now
+            self.hits += 1
+            logger.debug("🧠 Semantic cache hit (cosine %.3f)", float(scores[best]))
+            return row[0]
+
+    def _evict_slot(self, now: float) -> int:
+        """Free a slot: an expired entry if any, otherwise the least recently used"""
+        valid = self.meta["valid"]
+        if self.max_age is not None:
+            expired = np.flatnonzero(valid & (self.meta["created"] < now - self.max_age))
+            if len(expired):
+                for slot in expired[1:]:
+                    self._release(int(slot))
+                    self._free.append(int(slot))
+                slot = int(expired[0])
+                self._release(slot)
+                return slot
+        last_used = np.where(valid, self.meta["last_used"], np.inf)
+        slot = int(np.argmin(last_used))
+        self._release(slot)
+        return slot
+
+    def _release(self, slot: int) -> None:
+        self._bucket_remove(slot, self.meta["sig"][slot])
+        self.meta["valid"][slot] = False
+        self._db.execute("DELETE FROM responses WHERE slot = ?", (slot,))
+        self._count -= 1
+        self.evictions += 1
+
+    def put(self, vector: np.ndarray, route: str, prompt: str, response: str) -> None:
+        """
+        Store a prompt embedding with its response
+
+        Args:
+            vector: Unit-length prompt embedding
+            route: Route key (see lookup)
+            prompt: Prompt text (kept for inspection)
+            response: Response text
+        """
+        if not self._fits(vector):
+            # Called after a successful LLM call: never lose its response over the cache
+            return
+        now = time.time()
+        with self._lock:
+            slot = self._free.pop() if self._free else self._evict_slot(now)
+            signature = self._signature(vector)
+            self.embeddings[slot] = vector
+            self.meta[slot] = (True, route_hash(route), now, now, signature)
+            self._bucket_add(slot, signature)
+            self._db.execute("INSERT OR REPLACE INTO responses (slot, prompt, response) VALUES (?, ?, ?)",
+                             (slot, prompt, response))
+            self._count += 1
+
+    def flush(self) -> None:
+        """Write the memory-mapped arrays to disk"""
+        with self._lock:
+            self.embeddings.flush()
+            self.meta.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": self._count,
+            "capacity": self.capacity,
+        }
@@ -0,0 +1,171 @@
+"""
+Redacted, lazy, non-blocking logging helpers
+
+Payloads (bw output, tool results) are wrapped in Redacted so truncation and
+secret masking only run when a record is actually emitted. File logging goes
+through a QueueHandler; a QueueListener thread formats and writes records to
+a rotating file, so callers never wait on disk I/O.
+"""
+
+import os
+import re
+import queue
+import atexit
+import logging
+import logging.handlers
+from typing import Any, List, Optional
+
+REDACTED = "[REDACTED]"
+
+# Longest payload preview written to logs (characters)
+DEFAULT_PREVIEW_CHARS = int(os.getenv('LOG_PREVIEW_CHARS', '200'))
+
+# JSON keys whose string values never reach a log
+SENSITIVE_KEYS = (
+    "password", "totp", "notes", "value", "key", "privateKey", "session",
+    "token", "secret", "apiKey", "api_key", "ssn", "number", "code"
+)
+
+_SENSITIVE_FIELD_RE = re.compile(
+    # Also matches dotted keys of projected items ("login.password") and
+    # values cut off by truncation (no closing quote)
+    r'("(?:\w+\.)*(?:%s)"\s*:\s*)"(?:[^"\\]|\\.)*(?:"|$)' % "|".join(SENSITIVE_KEYS),
+    re.IGNORECASE
+)
+# Session keys, encoded item payloads and other long base64 blobs
+_TOKEN_RE = re.compile(r'[A-Za-z0-9+/_-]{40,}={0,2}')
+
+# Extra characters redacted past the preview limit, so a secret straddling
+# the cut is still recognized as a whole
+_REDACTION_SLACK = 512
+
+# bw subcommands whose arguments after the subcommand include secrets
+_SECRET_ARGUMENT_COMMANDS = {"login", "unlock", "create", "edit", "encode"}
+
+
+def redact(text: Any, limit: Optional[int] = DEFAULT_PREVIEW_CHARS) -> str:
+    """
+    Mask secrets in a payload and truncate it for logging
+
+    Args:
+        text: Payload (converted with str())
+        limit: Maximum characters to keep (None keeps everything)
+
+    Returns:
+        Log-safe string
+    """
+    text = "" if text is None else str(text)
+    total = len(text)
+    if limit is not None and total > limit + _REDACTION_SLACK:
+        # Only the part that can end up in the log is scanned
+        text = text[:limit + _REDACTION_SLACK]
+    text = _SENSITIVE_FIELD_RE.sub(r'\1"%s"' % REDACTED, text)
+    text = _TOKEN_RE.sub(REDACTED, text)
+    if limit is not None and len(text) > limit:
+        return f"{text[:limit]}... [{total} chars total]"
+    return text
+
+
+def redact_command(command: List[str]) -> str:
+    """
+    Render a bw argument list for logging without passwords or payloads
+
+    Args:
+        command: bw arguments (without the executable)
+
+    Returns:
+        Log-safe command string
+    """
+    if command and command[0] in _SECRET_ARGUMENT_COMMANDS:
+        # Keep the subcommand, object type and flags; mask positional values
+        shown = [command[0]]
+        for index, argument in enumerate(command[1:], start=1):
+            keep = argument.startswith("--") or (index == 1 and command[0] in ("create", "edit"))
+            shown.append(argument if keep else REDACTED)
+        return " ".join(shown)
+    return " ".join(command)
+
+
+class Redacted:
+    """Defers redact() until the log record is formatted"""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: Optional[int] = DEFAULT_PREVIEW_CHARS):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return redact(self.value, self.limit)
+
+    __repr__ = __str__
+
+
+class RedactedCommand:
+    """Defers redact_command() until the log record is formatted"""
+
+    __slots__ = ("command",)
+
+    def __init__(self, command: List[str]):
+        self.command = command
+
+    def __str__(self) -> str:
+        return redact_command(self.command)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    The stock handler formats in the calling thread; here records are queued
+    as-is. Arguments must not be mutated after logging (strings and the
+    Redacted wrappers are safe).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_queue_logging(logger: logging.Logger, path: str, level: int = logging.INFO,
+                        max_bytes: int = 5 * 1024 * 1024, backup_count: int = 5,
+                        fmt: str = '%(asctime)s - %(levelname)s - %(message)s',
+                        propagate: bool = True) -> logging.handlers.QueueListener:
+    """
+    Attach a non-blocking, rotating file handler to a logger
+
+    Args:
+        logger: Logger to configure
+        path: Log file path (parent directories are created)
+        level: Logger level
+        max_bytes: Rotate after this many bytes
+        backup_count: Rotated files to keep
+        fmt: Record format
+        propagate: Whether records also reach ancestor handlers
+
+    Returns:
+        Started QueueListener (stopped automatically at exit)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True
+    )
+    file_handler.setFormatter(logging.Formatter(fmt))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_queue_logging, listener)
+
+    logger.setLevel(level)
+    logger.propagate = propagate
+    logger.addHandler(_DeferredQueueHandler(log_queue))
+    return listener
+
+
+def stop_queue_logging(listener: logging.handlers.QueueListener) -> None:
+    """Flush queued records and stop the listener (safe to call more than once)"""
+    if listener._thread is not None:
+        listener.stop()
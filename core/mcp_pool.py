@@ -0,0 +1,631 @@
+"""
+Process-wide MCP server pool
+
+CrewAI's native MCP support starts a fresh server process for tool
+discovery on every task and another one for every single tool call.
+Agents that declare the same servers (Brave Search, URL reader,
+Perplexity) therefore pay process start-up and the MCP handshake over and
+over.
+
+MCPServerPool keeps one long-lived connection per distinct server (keyed
+by command, args and env) on a background event loop. Every agent that
+declares the server shares it, connections stay warm across chat turns,
+a periodic ping detects hung or crashed servers, and a crashed server is
+restarted and the failed call retried once (unless the tool looks
+non-idempotent). With a result cache, repeated calls are answered from disk.
+With a schema cache, tools of known servers are built from the cached tool
+list at once and the servers connect in the background. A server that cannot be
+started is not retried in the background; the next call tries again.
+
+In lazy mode, servers with cached tools are only spawned on their first
+tool call. Servers idle for longer than idle_timeout are shut down (and
+respawned on demand), and max_servers caps how many run at once: starting
+another server first stops the least recently used idle one. stats()
+reports spawn latency and resident memory per server.
+
+Usage:
+    tools = mcp_tools([MCPServerStdio(command="node", args=["search.js"])])
+    agent = Agent(..., tools=[*other_tools, *tools])
+"""
+
+import os
+import json
+import time
+import atexit
+import asyncio
+import logging
+import threading
+import subprocess
+from typing import Any, Dict, List, Optional
+
+from crewai.mcp.client import MCPClient
+from crewai.mcp.config import MCPServerStdio
+from crewai.mcp.tool_resolver import MCPToolResolver
+from crewai.mcp.transports.stdio import StdioTransport
+from crewai.tools import BaseTool
+from crewai.tools.mcp_native_tool import MCPNativeTool
+from crewai.tools.tool_failure import ToolFailure, ToolFailureReason
+
+from core.mcp_schema_cache import MCPSchemaCache, schema_fingerprint
+from core.mcp_result_cache import (
+    DEFAULT_NO_CACHE, DEFAULT_TTLS, MCPResultCache, idempotent, make_tool_key, parse_patterns
+)
+
+logger = logging.getLogger(__name__)
+
+
+def server_key(config: MCPServerStdio) -> str:
+    """Identity of a stdio server: command, args and environment"""
+    return json.dumps({"command": config.command, "args": list(config.args), "env": config.env or {}},
+                      sort_keys=True)
+
+
+def server_label(config: MCPServerStdio) -> str:
+    """Short name for logs (script name rather than the full path)"""
+    script = next((arg for arg in reversed(config.args) if not arg.startswith("-")), config.command)
+    parent = os.path.basename(os.path.dirname(script))
+    return f"{parent}/{os.path.basename(script)}" if parent else os.path.basename(script)
+
+
+def process_table() -> Dict[int, Dict[str, Any]]:
+    """
+    Running processes from ps (Linux and macOS)
+
+    Returns:
+        PID -> {"ppid", "rss_kb", "args"} (empty if ps is unavailable)
+    """
+    try:
+        output = subprocess.run(["ps", "-eo", "pid=,ppid=,rss=,args="], capture_output=True, text=True,
+                                timeout=5, check=True).stdout
+    except (OSError, subprocess.SubprocessError):
+        return {}
+    table = {}
+    for line in output.splitlines():
+        parts = line.split(None, 3)
+        if len(parts) == 4 and parts[0].isdigit():
+            table[int(parts[0])] = {"ppid": int(parts[1]), "rss_kb": int(parts[2] or 0), "args": parts[3]}
+    return table
+
+
+def find_server_pid(config: MCPServerStdio, table: Dict[int, Dict[str, Any]], claimed: set) -> Optional[int]:
+    """PID of our child process running a server config (not already claimed by another server)"""
+    expected_args = " ".join(config.args)
+    command = os.path.basename(config.command)
+    for pid, info in table.items():
+        if info["ppid"] == os.getpid() and pid not in claimed and command in info["args"] \
+                and info["args"].endswith(expected_args):
+            return pid
+    return None
+
+
+def tree_rss_kb(pid: int, table: Dict[int, Dict[str, Any]]) -> int:
+    """Resident memory of a process and its descendants"""
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += table.get(current, {}).get("rss_kb", 0)
+        pending.extend(child for child, info in table.items() if info["ppid"] == current)
+    return total
+
+
+class PooledMCPServer:
+    """One shared MCP server connection, owned by a lifecycle task on the pool loop"""
+
+    def __init__(self, pool: "MCPServerPool", config: MCPServerStdio):
+        self.pool = pool
+        self.config = config
+        self.key = server_key(config)
+        self.label = server_label(config)
+        # Same naming as CrewAI's native MCP tools
+        self.server_name = f"{config.command}_{'_'.join(config.args)}"
+        self.fingerprint = schema_fingerprint(config.command, list(config.args), config.env)
+        self.tools_list: Optional[List[Dict[str, Any]]] = None
+        self.cached_tools = False
+        self.starts = 0
+        self.restarts = 0
+        self.calls = 0
+        self.failures = 0
+        self.reaped = 0
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self.spawn_seconds: List[float] = []
+        self.pid: Optional[int] = None
+        self.last_error: Optional[str] = None
+        self._client: Optional[MCPClient] = None
+        self._attempt: Optional[asyncio.Future] = None
+        self._restart: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    @property
+    def running(self) -> bool:
+        """Process started or starting (lifecycle task alive)"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the lifecycle task (pool loop only)"""
+        if not self.running:
+            self._stopping = False
+            self._restart = asyncio.Event()
+            self._attempt = asyncio.get_running_loop().create_future()
+            self._task = asyncio.create_task(self._lifecycle(), name=f"mcp-{self.label}")
+            self._task.add_done_callback(lambda _: self.pool._server_stopped())
+            self.pool._server_started()
+
+    def retire(self, reason: str) -> None:
+        """Shut the server down gracefully; the next call spawns it again (pool loop only)"""
+        if self.running and not self._stopping:
+            logger.info(f"💤 Stopping MCP server {self.label} ({reason})")
+            self.reaped += 1
+            self._stopping = True
+            # Callers from now on wait for the respawned server, never the one shutting down
+            self._client = None
+            if self._attempt.done():
+                self._attempt = asyncio.get_running_loop().create_future()
+            self._restart.set()
+
+    async def _lifecycle(self) -> None:
+        """
+        Connect and stay connected until a restart is requested, then reconnect
+
+        A failed connection attempt ends the task; the next call starts a new one,
+        so an unavailable server is not retried in the background forever.
+        """
+        while not self._stopping:
+            client = MCPClient(
+                StdioTransport(command=self.config.command, args=self.config.args, env=self.config.env),
+                connect_timeout=self.pool.connect_timeout,
+                execution_timeout=self.pool.call_timeout,
+                max_retries=1,
+            )
+            started = time.perf_counter()
+            try:
+                await client.connect()
+                self._update_tools(await client.list_tools())
+                self._client = client
+                self.starts += 1
+                self.last_used = time.monotonic()
+                elapsed = time.perf_counter() - started
+                self.spawn_seconds = (self.spawn_seconds + [elapsed])[-20:]
+                logger.info(f"✅ MCP server {self.label} ready in {elapsed:.2f}s ({len(self.tools_list)} tools)")
+                self.pid = await asyncio.to_thread(self.pool._find_pid, self)
+                if not self._attempt.done():
+                    self._attempt.set_result(client)
+                await self._restart.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"⚠️ MCP server {self.label} failed to start: {e}")
+                if not self._attempt.done():
+                    self._attempt.set_exception(ConnectionError(f"MCP server {self.label} unavailable: {e}"))
+                    self._attempt.exception()  # mark retrieved; waiters get it from the future
+                self._stopping = True
+            finally:
+                self._client = None
+                self.pid = None
+                self._restart.clear()
+                try:
+                    await client.disconnect()
+                except Exception as e:
+                    logger.debug("MCP disconnect of %s failed: %s", self.label, e)
+            if self._stopping:
+                break
+            if self._attempt.done():
+                self._attempt = asyncio.get_running_loop().create_future()
+            self.restarts += 1
+
+    def _update_tools(self, tools_list: List[Dict[str, Any]]) -> None:
+        """Take the live tool list and refresh the schema cache if it differs"""
+        if self.tools_list is not None and tools_list != self.tools_list and self.cached_tools:
+            logger.warning(f"⚠️ MCP server {self.label} reports different tools than its cached schema; "
+                           f"agents see the new tools after a restart")
+        schema_cache = self.pool.schema_cache
+        if schema_cache is not None and tools_list != self.tools_list:
+            schema_cache.put(self.fingerprint, tools_list)
+        self.tools_list = tools_list
+
+    def request_restart(self, reason: str) -> None:
+        """Drop the current connection; the lifecycle task reconnects (pool loop only)"""
+        if self._client is not None and not self._restart.is_set():
+            logger.warning(f"🔄 Restarting MCP server {self.label}: {reason}")
+            # Callers from now on wait for the next connection, never the dead one
+            self._client = None
+            if self._attempt.done():
+                self._attempt = asyncio.get_running_loop().create_future()
+            self._restart.set()
+
+    async def wait_ready(self) -> MCPClient:
+        """Connected client, waiting for a connection in progress"""
+        if self._client is not None:
+            return self._client
+        if self._stopping and self._task is not None:
+            # Retired (or failed) and still shutting down: let it finish, then spawn anew
+            await asyncio.wait({self._task})
+        if not self.running:
+            await self.pool._reserve_slot(self)
+            self.start()
+        return await asyncio.wait_for(asyncio.shield(self._attempt), self.pool.connect_timeout + 5)
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any], retry: bool = True) -> Any:
+        """Call a tool; on a connection failure restart the server and retry once (if retry)"""
+        self.calls += 1
+        self.in_flight += 1
+        try:
+            for attempt in range(2 if retry else 1):
+                client = await self.wait_ready()
+                try:
+                    return await client.call_tool_result(tool_name, arguments)
+                except ConnectionError as e:
+                    self.failures += 1
+                    self.last_error = str(e)
+                    if attempt or not retry:
+                        raise
+                    self.request_restart(f"call to {tool_name} failed ({e})")
+                    # Let the lifecycle task tear down the dead connection before waiting again
+                    await asyncio.sleep(0)
+        finally:
+            self.in_flight -= 1
+            self.last_used = time.monotonic()
+            if not self.in_flight:
+                # A server waiting for a slot may now stop this one
+                self.pool._server_stopped()
+
+    async def ping(self) -> bool:
+        """Health check; restarts the server when it does not answer"""
+        client = self._client
+        if client is None:
+            return False
+        try:
+            await asyncio.wait_for(client.session.send_ping(), timeout=self.pool.ping_timeout)
+            return True
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"ping failed: {e!r}"
+            self.request_restart(self.last_error)
+            return False
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._restart is not None:
+            self._restart.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+
+    def snapshot(self, table: Optional[Dict[int, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Counters, spawn latency and (with a process table) resident memory"""
+        spawns = self.spawn_seconds
+        return {
+            "connected": self.connected,
+            "pid": self.pid,
+            "rss_mb": round(tree_rss_kb(self.pid, table) / 1024, 1) if self.pid and table else None,
+            "spawn_seconds_last": spawns[-1] if spawns else None,
+            "spawn_seconds_avg": sum(spawns) / len(spawns) if spawns else None,
+            "idle_seconds": round(time.monotonic() - self.last_used, 1) if self.connected else None,
+            "in_flight": self.in_flight,
+            "reaped": self.reaped,
+            "tools": len(self.tools_list or []),
+            "cached_tools": self.cached_tools,
+            "starts": self.starts,
+            "restarts": self.restarts,
+            "calls": self.calls,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class MCPServerPool:
+    """Shared, health-checked MCP server connections on a background event loop"""
+
+    def __init__(self, connect_timeout: int = 30, call_timeout: int = 30, health_interval: float = 30.0,
+                 ping_timeout: float = 5.0, result_cache: Optional[MCPResultCache] = None,
+                 schema_cache: Optional[MCPSchemaCache] = None, lazy: bool = False, idle_timeout: float = 0.0,
+                 max_servers: int = 0):
+        """
+        Args:
+            connect_timeout: Seconds to start a server and complete the MCP handshake
+            call_timeout: Seconds a tool call may take
+            health_interval: Seconds between pings of connected servers (0 disables health checks)
+            ping_timeout: Seconds a server has to answer a ping
+            result_cache: Optional MCPResultCache answering repeated tool calls
+            schema_cache: Optional MCPSchemaCache; servers with a cached tool list connect in the background
+            lazy: Spawn servers with a cached tool list on their first tool call instead of in the background
+            idle_timeout: Seconds without calls after which a server is shut down (0 keeps servers running)
+            max_servers: Servers running at the same time (0: no limit)
+        """
+        self.connect_timeout = connect_timeout
+        self.call_timeout = call_timeout
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.result_cache = result_cache
+        self.schema_cache = schema_cache
+        self.lazy = lazy
+        self.idle_timeout = idle_timeout
+        self.max_servers = max(0, max_servers)
+        self.peak_servers = 0
+        self._servers: Dict[str, PooledMCPServer] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._health: Any = None
+        self._reaper: Any = None
+        self._slot_freed = asyncio.Event()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._slot_freed = asyncio.Event()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-pool", daemon=True)
+                self._thread.start()
+                if self.health_interval:
+                    self._health = asyncio.run_coroutine_threadsafe(self._health_loop(), self._loop)
+                if self.idle_timeout:
+                    self._reaper = asyncio.run_coroutine_threadsafe(self._reap_loop(), self._loop)
+            return self._loop
+
+    def run(self, coro: Any, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the pool loop from any thread and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result(timeout)
+
+    async def run_async(self, coro: Any) -> Any:
+        """Await a coroutine on the pool loop from another event loop"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()))
+
+    def server(self, config: MCPServerStdio) -> PooledMCPServer:
+        """Shared server entry for a config (created on first use)"""
+        key = server_key(config)
+        with self._lock:
+            server = self._servers.get(key)
+            if server is None:
+                server = self._servers[key] = PooledMCPServer(self, config)
+        return server
+
+    def start(self, config: MCPServerStdio) -> PooledMCPServer:
+        """Connect a server (if not connected yet) and wait until its tools are known"""
+        server = self.server(config)
+
+        async def connect():
+            await server.wait_ready()
+
+        self.run(connect(), timeout=self.connect_timeout + 10)
+        return server
+
+    def tools(self, configs: List[MCPServerStdio]) -> List[BaseTool]:
+        """
+        CrewAI tools for several servers (started in parallel), backed by the shared connections
+
+        Servers with a cached tool list are not waited for: their tools are built
+        from the cache and the connection is established in the background.
+
+        Returns:
+            Tools of all servers that could be started or have a cached tool list
+        """
+        servers = [self.server(config) for config in configs]
+        for server in servers:
+            if server.tools_list is None and self.schema_cache is not None:
+                cached = self.schema_cache.get(server.fingerprint)
+                if cached is not None:
+                    server.tools_list = cached
+                    server.cached_tools = True
+        waiting = [server for server in servers if not server.cached_tools]
+
+        async def connect_all():
+            for server in servers:
+                if server.cached_tools and not self.lazy:
+                    await self._reserve_slot(server)
+                    server.start()
+            return await asyncio.gather(*(server.wait_ready() for server in waiting), return_exceptions=True)
+
+        outcomes = self.run(connect_all(), timeout=self.connect_timeout + 10)
+        results = {server.key: outcome for server, outcome in zip(waiting, outcomes)}
+        tools: List[BaseTool] = []
+        for config, server in zip(configs, servers):
+            result = results.get(server.key)
+            if isinstance(result, BaseException):
+                logger.error(f"❌ MCP server {server.label} unavailable, its tools are disabled: {result}")
+                continue
+            tools.extend(build_tools(server, server.tools_list or [], config))
+        return tools
+
+    def _running(self, exclude: Optional[PooledMCPServer] = None) -> List[PooledMCPServer]:
+        return [server for server in list(self._servers.values()) if server.running and server is not exclude]
+
+    def _server_started(self) -> None:
+        self.peak_servers = max(self.peak_servers, len(self._running()))
+
+    def _server_stopped(self) -> None:
+        """Wake servers waiting for a slot (a server stopped or became idle)"""
+        self._slot_freed.set()
+
+    async def _reserve_slot(self, server: PooledMCPServer) -> None:
+        """Wait until another server may run, stopping the least recently used idle one if needed"""
+        if not self.max_servers:
+            return
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            running = self._running(exclude=server)
+            if len(running) < self.max_servers:
+                return
+            idle = [other for other in running if other.connected and not other.in_flight]
+            if idle:
+                min(idle, key=lambda other: other.last_used).retire(f"making room for {server.label}")
+            self._slot_freed.clear()
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(self._slot_freed.wait(), remaining)
+            except asyncio.TimeoutError:
+                raise ConnectionError(f"MCP server {server.label} not started: "
+                                      f"all {self.max_servers} server slots are busy") from None
+
+    def _find_pid(self, server: PooledMCPServer) -> Optional[int]:
+        claimed = {other.pid for other in list(self._servers.values()) if other.pid}
+        return find_server_pid(server.config, process_table(), claimed)
+
+    async def _reap_loop(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, min(self.idle_timeout / 4, 30.0)))
+            now = time.monotonic()
+            for server in self._running():
+                if server.connected and not server.in_flight and now - server.last_used > self.idle_timeout:
+                    server.retire(f"idle for {now - server.last_used:.0f}s")
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for server in list(self._servers.values()):
+                if server.connected:
+                    await server.ping()
+
+    def stats(self) -> Dict[str, Any]:
+        """Running/peak server counts and per-server state, spawn latency and memory"""
+        servers = list(self._servers.values())
+        table = process_table() if any(server.pid for server in servers) else None
+        return {
+            "running": sum(server.running for server in servers),
+            "peak": self.peak_servers,
+            "max": self.max_servers,
+            "servers": {server.label: server.snapshot(table) for server in servers},
+        }
+
+    def close(self) -> None:
+        """Stop all servers and the pool loop"""
+        if self._loop is None:
+            return
+        for task in (self._health, self._reaper):
+            if task is not None:
+                task.cancel()
+
+        async def stop_all():
+            await asyncio.gather(*(server.stop() for server in list(self._servers.values())))
+
+        try:
+            self.run(stop_all(), timeout=30)
+        except Exception as e:
+            logger.warning(f"⚠️ MCP pool shutdown incomplete: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+class PooledMCPTool(MCPNativeTool):
+    """MCP tool that calls through the pool's shared connection instead of spawning a server"""
+
+    def __init__(self, server: PooledMCPServer, tool_name: str, tool_schema: Dict[str, Any],
+                 original_tool_name: Optional[str] = None):
+        super().__init__(client_factory=None, tool_name=tool_name, tool_schema=tool_schema,
+                         server_name=server.server_name, original_tool_name=original_tool_name)
+        self._server = server
+
+    async def _run_async(self, **kwargs: Any) -> Any:
+        tool = self.original_tool_name
+        cache = self._server.pool.result_cache
+        key = None
+        if cache is not None and cache.cacheable(tool):
+            key = make_tool_key(self._server.key, tool, kwargs)
+            cached = cache.get(key, tool)
+            if cached is not None:
+                logger.debug("💾 MCP cache hit for %s", tool)
+                return cached
+        # Calls that may have side effects are not repeated after a connection failure
+        retry = idempotent(tool, cache.no_cache if cache is not None else DEFAULT_NO_CACHE)
+        # MCPNativeTool runs this on a private event loop; the connection lives on the pool loop
+        tool_result = await self._server.pool.run_async(self._server.call(tool, kwargs, retry=retry))
+        if tool_result.is_error:
+            return ToolFailure(
+                message=tool_result.content,
+                reason=ToolFailureReason.MCP_ERROR,
+                details={"server": self._server_name, "tool": self._original_tool_name},
+            )
+        if key is not None and tool_result.content:
+            cache.put(key, tool_result.content, tool)
+        return tool_result.content
+
+
+def _tool_allowed(config: MCPServerStdio, server: PooledMCPServer, tool_def: Dict[str, Any]) -> bool:
+    """Apply a static (tool) or dynamic (context, tool) tool_filter"""
+    try:
+        return bool(config.tool_filter(tool_def))
+    except TypeError:
+        from crewai.mcp.filters import ToolFilterContext
+        context = ToolFilterContext(agent=None, server_name=server.server_name, run_context=None)
+        return bool(config.tool_filter(context, tool_def))
+
+
+def build_tools(server: PooledMCPServer, tools_list: List[Dict[str, Any]],
+                config: MCPServerStdio) -> List[BaseTool]:
+    """Wrap discovered tool definitions as pooled CrewAI tools (honoring the config's tool_filter)"""
+    tools: List[BaseTool] = []
+    for tool_def in tools_list:
+        tool_name = tool_def.get("name", "")
+        if not tool_name:
+            continue
+        if config.tool_filter is not None and not _tool_allowed(config, server, tool_def):
+            continue
+        args_schema = None
+        if tool_def.get("inputSchema"):
+            try:
+                args_schema = MCPToolResolver._json_schema_to_pydantic(tool_name, tool_def["inputSchema"])
+            except Exception as e:
+                logger.warning(f"⚠️ MCP tool {tool_name}: no typed schema ({e})")
+        tools.append(PooledMCPTool(
+            server, tool_name,
+            {"description": tool_def.get("description", ""), "args_schema": args_schema},
+            original_tool_name=tool_def.get("original_name", tool_name),
+        ))
+    return tools
+
+
+_default_pool: Optional[MCPServerPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_mcp_pool() -> MCPServerPool:
+    """Process-wide pool shared by all agents"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            result_cache = None
+            if os.getenv("MCP_CACHE", "0") == "1":
+                # Configured patterns are matched before the defaults
+                ttls = parse_patterns(os.getenv("MCP_CACHE_TTLS", ""))
+                ttls.update({pattern: ttl for pattern, ttl in DEFAULT_TTLS.items() if pattern not in ttls})
+                result_cache = MCPResultCache(
+                    default_ttl=float(os.getenv("MCP_CACHE_TTL", "86400")),
+                    ttls=ttls,
+                    no_cache=DEFAULT_NO_CACHE + tuple(filter(None, os.getenv("MCP_CACHE_SKIP", "").split(","))),
+                )
+            _default_pool = MCPServerPool(
+                health_interval=float(os.getenv("MCP_HEALTH_INTERVAL", "30")),
+                result_cache=result_cache,
+                schema_cache=MCPSchemaCache() if os.getenv("MCP_SCHEMA_CACHE", "1") != "0" else None,
+                lazy=os.getenv("MCP_LAZY", "1") != "0",
+                idle_timeout=float(os.getenv("MCP_IDLE_TIMEOUT", "600")),
+                max_servers=int(os.getenv("MCP_MAX_SERVERS", "0")),
+            )
+            # Terminate server processes cleanly instead of leaving them to die with the pipe
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+def mcp_tools(configs: List[MCPServerStdio], pool: Optional[MCPServerPool] = None) -> List[BaseTool]:
+    """
+    Pooled tools for a list of stdio MCP server configs
+
+    Args:
+        configs: Server declarations (identical declarations share one server)
+        pool: Pool to use (default: the process-wide pool)
+
+    Returns:
+        Tools of all servers that could be started
+    """
+    return (pool or get_mcp_pool()).tools(configs)
@@ -0,0 +1,284 @@
+"""
+On-disk cache for MCP tool results
+
+The researcher and the manager repeat the same Brave searches, URL reads
+and Perplexity questions across turns. Results are cached in a local
+SQLite file keyed by server, tool name and canonicalized arguments, so
+{"query": " Solar subsidies "} and {"query": "Solar subsidies"} share an
+entry. TTLs are set per tool (search results age faster than page
+contents), the store is bounded in size (least recently used entries are
+evicted), and identical contents returned for different calls (the same
+page reached through two URLs) are stored once.
+
+Tools that change something must not be answered from a cache: tool names
+matching the no_cache patterns always reach the server.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MCP_CACHE_PATH = os.getenv('MCP_CACHE_PATH', os.path.expanduser("~/.cache/crew_llm/mcp_results.sqlite"))
+
+# Tool names that suggest side effects; such tools are never cached
+DEFAULT_NO_CACHE = ("*post*", "*create*", "*write*", "*update*", "*delete*", "*send*", "*publish*")
+
+# Search results go stale faster than page contents (default_ttl)
+DEFAULT_TTLS = {"*search*": 3600.0}
+
+
+def idempotent(tool: str, no_cache: Iterable[str] = DEFAULT_NO_CACHE) -> bool:
+    """Whether a tool may be called twice with the same effect (its name matches no no_cache pattern)"""
+    return not any(fnmatchcase(tool, pattern) for pattern in no_cache)
+
+
+def _canonical_value(value: Any) -> Any:
+    if isinstance(value, str):
+        text = value.strip()
+        if text.lower().startswith(("http://", "https://")) and not any(c.isspace() for c in text):
+            # Scheme and host are case-insensitive; the fragment never reaches the server
+            parts = urlsplit(text)
+            return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+        return text
+    if isinstance(value, dict):
+        return {str(k): _canonical_value(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(v) for v in value]
+    return value
+
+
+def canonical_arguments(arguments: Dict[str, Any]) -> str:
+    """
+    Arguments as canonical JSON: sorted keys, no None values, stripped strings, normalized URLs
+    """
+    return json.dumps(_canonical_value(arguments or {}), sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False, default=str)
+
+
+def make_tool_key(server: str, tool: str, arguments: Dict[str, Any]) -> str:
+    """
+    Hash the inputs that determine a tool result
+
+    Args:
+        server: Server identity (e.g. core.mcp_pool.server_key)
+        tool: Tool name on the server
+        arguments: Call arguments
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = f"{server}\0{tool}\0{canonical_arguments(arguments)}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def parse_patterns(spec: str) -> Dict[str, float]:
+    """
+    Parse "pattern=seconds,pattern=seconds" (e.g. MCP_CACHE_TTLS) into a dict
+
+    Returns:
+        Pattern -> TTL (malformed items are skipped with a warning)
+    """
+    ttls: Dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        pattern, _, seconds = item.partition("=")
+        try:
+            ttls[pattern.strip()] = float(seconds)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring malformed MCP cache TTL '{item}'")
+    return ttls
+
+
+class MCPResultCache:
+    """SQLite-backed tool result store with per-tool TTLs, LRU eviction and content dedup"""
+
+    def __init__(self, path: str = DEFAULT_MCP_CACHE_PATH, default_ttl: float = 86400,
+                 ttls: Optional[Dict[str, float]] = None, no_cache: Iterable[str] = DEFAULT_NO_CACHE,
+                 max_bytes: int = 128 * 1024 * 1024, dedup: bool = True):
+        """
+        Args:
+            path: SQLite file
+            default_ttl: Seconds a result stays valid unless a TTL pattern matches the tool
+            ttls: Tool name pattern (fnmatch) -> TTL in seconds (default: DEFAULT_TTLS);
+                the first match wins, 0 disables caching
+            no_cache: Tool name patterns that are never cached (non-idempotent tools)
+            max_bytes: Total content size before least recently used entries are evicted
+            dedup: Store identical contents once (keyed by content hash)
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.no_cache = tuple(no_cache)
+        self.max_bytes = max_bytes
+        self.dedup = dedup
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._tool_stats: Dict[str, Dict[str, int]] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, tool TEXT NOT NULL, digest TEXT NOT NULL,
+                expires REAL NOT NULL, accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+            CREATE INDEX IF NOT EXISTS results_digest ON results (digest);
+            CREATE TABLE IF NOT EXISTS contents (
+                digest TEXT PRIMARY KEY, content TEXT NOT NULL, size INTEGER NOT NULL
+            );
+        """)
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+
+    def ttl_for(self, tool: str) -> float:
+        """TTL of a tool's results (0: not cached)"""
+        if not idempotent(tool, self.no_cache):
+            return 0.0
+        for pattern, ttl in self.ttls.items():
+            if fnmatchcase(tool, pattern):
+                return ttl
+        return self.default_ttl
+
+    def cacheable(self, tool: str) -> bool:
+        """Whether a tool's results may be cached (False for non-idempotent tools)"""
+        return self.ttl_for(tool) > 0
+
+    def _count(self, tool: str, outcome: str) -> None:
+        stats = self._tool_stats.setdefault(tool, {"hits": 0, "misses": 0})
+        stats[outcome] += 1
+
+    def get(self, key: str, tool: str = "") -> Optional[str]:
+        """
+        Look up a tool result
+
+        Args:
+            key: Cache key (see make_tool_key)
+            tool: Tool name, for per-tool statistics
+
+        Returns:
+            Cached content or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT c.content, r.expires FROM results r JOIN contents c ON c.digest = r.digest WHERE r.key = ?",
+                (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._delete(key)
+                self.misses += 1
+                self._count(tool, "misses")
+                return None
+            self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self._count(tool, "hits")
+            return row[0]
+
+    def put(self, key: str, content: str, tool: str = "") -> None:
+        """
+        Store a tool result, evicting least recently used entries over the size limit
+
+        Args:
+            key: Cache key (see make_tool_key)
+            content: Result content
+            tool: Tool name (selects the TTL)
+        """
+        ttl = self.ttl_for(tool)
+        size = len(content.encode())
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        digest = hashlib.sha256(content.encode()).hexdigest() if self.dedup else key
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._delete(key)
+                if self._conn.execute("INSERT OR IGNORE INTO contents (digest, content, size) VALUES (?, ?, ?)",
+                                      (digest, content, size)).rowcount:
+                    self._total_bytes += size
+                self._conn.execute(
+                    "INSERT INTO results (key, tool, digest, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, tool, digest, now + ttl, now)
+                )
+                if self._total_bytes > self.max_bytes:
+                    self._evict(now)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+                raise
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute("SELECT digest FROM results WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._drop_orphans((row[0],))
+
+    def _drop_orphans(self, digests: Iterable[str]) -> None:
+        """Remove contents no longer referenced by any result"""
+        for digest in set(digests):
+            if self._conn.execute("SELECT 1 FROM results WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                continue
+            row = self._conn.execute("SELECT size FROM contents WHERE digest = ?", (digest,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM contents WHERE digest = ?", (digest,))
+                self._total_bytes -= row[0]
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones down to 90% of the limit"""
+        expired = self._conn.execute("SELECT key, digest FROM results WHERE expires < ?", (now,)).fetchall()
+        self._conn.execute("DELETE FROM results WHERE expires < ?", (now,))
+        self._drop_orphans(digest for _, digest in expired)
+        removed = len(expired)
+        target = self.max_bytes * 0.9
+        for key, digest in self._conn.execute("SELECT key, digest FROM results ORDER BY accessed").fetchall():
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._drop_orphans((digest,))
+            removed += 1
+        self.evictions += removed
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute("DELETE FROM contents")
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, per-tool breakdown and storage usage"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            contents = self._conn.execute("SELECT COUNT(*) FROM contents").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "contents": contents,
+            "bytes": self._total_bytes,
+            "tools": {tool: dict(stats) for tool, stats in self._tool_stats.items()},
+        }
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
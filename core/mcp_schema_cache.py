@@ -0,0 +1,107 @@
+"""
+On-disk cache of discovered MCP tool schemas
+
+Before an agent with MCP tools can be built, every server has to be
+started and asked for its tool list. The list only changes when the server
+changes, so it is cached as JSON, keyed by the server's command, args and
+env plus the modification time and size of the command binary and every
+argument that is a file (the server script). Editing or updating the
+server script yields a new key, so stale schemas are never used; at worst
+a cached schema is replaced once the live connection reports different
+tools.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEMA_CACHE_DIR = os.getenv(
+    'MCP_SCHEMA_CACHE_DIR', os.path.expanduser("~/.cache/crew_llm/mcp_schemas")
+)
+
+
+def _file_stamp(path: str) -> Optional[List[float]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+def schema_fingerprint(command: str, args: List[str], env: Optional[Dict[str, str]] = None) -> str:
+    """
+    Cache key of a stdio server: command, args, env and the stamps (mtime, size) of the files they name
+
+    Args:
+        command: Server executable (resolved through PATH if not a path)
+        args: Server arguments
+        env: Extra environment
+
+    Returns:
+        Hex digest
+    """
+    binary = command if os.sep in command else next(
+        (os.path.join(directory, command) for directory in os.get_exec_path()
+         if os.path.isfile(os.path.join(directory, command))), command
+    )
+    stamps = {path: _file_stamp(path) for path in [binary, *args] if os.path.isfile(path)}
+    payload = json.dumps({"command": command, "args": list(args), "env": env or {}, "files": stamps},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class MCPSchemaCache:
+    """Tool lists of MCP servers, stored as one JSON file per server fingerprint"""
+
+    def __init__(self, directory: str = DEFAULT_SCHEMA_CACHE_DIR):
+        """
+        Args:
+            directory: Directory for the cached tool lists
+        """
+        self.directory = directory
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{fingerprint}.json")
+
+    def get(self, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached tool list of a server
+
+        Args:
+            fingerprint: Key from schema_fingerprint
+
+        Returns:
+            Tool definitions ({"name", "description", "inputSchema"}) or None
+        """
+        try:
+            with open(self._path(fingerprint), encoding="utf-8") as f:
+                tools = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable MCP schema cache {self._path(fingerprint)}: {e}")
+            return None
+        return tools if isinstance(tools, list) else None
+
+    def put(self, fingerprint: str, tools: List[Dict[str, Any]]) -> bool:
+        """
+        Store a server's tool list (written atomically)
+
+        Returns:
+            True if stored
+        """
+        path = self._path(fingerprint)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp = f"{path}.{os.getpid()}.tmp"
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(tools, f, ensure_ascii=False, default=str)
+            os.replace(temp, path)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Could not cache MCP tool schemas in {path}: {e}")
+            return False
@@ -5,13 +5,25 @@ import requests
 import subprocess
 import logging
 import sys
-import json
+import re
 import asyncio
-from typing import Any, Dict, List, Optional, Type
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Type
 from crewai.tools import BaseTool
 from pydantic import BaseModel
 from crewai.mcp import MCPServerStdio
 from crewai.hooks import register_before_llm_call_hook, LLMCallHookContext
+from core.logging_utils import setup_queue_logging, Redacted, RedactedCommand
+from core.llm_cache import LLMResponseCache, CachedLLM
+from core.llm_semantic_cache import SemanticResponseCache, BGEEmbedder
+from core.llm_router import RoutingLLM
+from core.conversation_manager import ConversationManager
+from core.conversation_store import ConversationStore
+from core.intent_router import IntentRouter
+from core.crew_pool import CrewPool
+from core.async_repl import AsyncChatREPL, RunCancelled
+from core.mcp_pool import get_mcp_pool, mcp_tools
+from core.chat_stream import ChatStreamer
 
 load_dotenv()
 
@@ -44,51 +56,117 @@ os.environ.update({
 chatml_template = """<|im_start|>{role}
 {content}<|im_end|>"""
 
-local_llm = LLM(
+embedder = {
+    "provider": "openai",
+    "config": {
+        "model": "bge-m3",
+        "api_key": "dummy",
+        "base_url": "http://localhost:8001/v1",
+        "model_name": "bge-m3"
+    }
+}
+
+# Opt-in exact-match response caching per LLM, e.g. LLM_CACHE_MODELS="local,gemini"
+LLM_CACHE_MODELS = {name.strip() for name in os.getenv("LLM_CACHE_MODELS", "").split(",") if name.strip()}
+response_cache = LLMResponseCache(
+    ttl=float(os.getenv("LLM_CACHE_TTL", str(7 * 86400))),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+) if LLM_CACHE_MODELS else None
+
+# Opt-in semantic caching (bge-m3 similarity of the user question), e.g. LLM_SEMANTIC_CACHE_MODELS="local"
+LLM_SEMANTIC_CACHE_MODELS = {
+    name.strip() for name in os.getenv("LLM_SEMANTIC_CACHE_MODELS", "").split(",") if name.strip()
+}
+semantic_cache = SemanticResponseCache(
+    threshold=float(os.getenv("LLM_SEMANTIC_THRESHOLD", "0.92")),
+    capacity=int(os.getenv("LLM_SEMANTIC_CAPACITY", "100000"))
+) if LLM_SEMANTIC_CACHE_MODELS else None
+semantic_embedder = BGEEmbedder.from_config(embedder) if semantic_cache is not None else None
+
+def chat_request_text(prompt: str) -> Optional[str]:
+    """
+    The user's request inside a chat task prompt, which is what the semantic cache compares
+
+    The task prompt also carries the template and the session's recent turns; those are
+    shared by every message of a session and would dominate the similarity. Prompts of
+    other tasks (e.g. delegation) are not cached semantically.
+    """
+    for _, description, _ in CHAT_CREWS.values():  # Defined below; only used at call time
+        prefix, _, suffix = description.partition("{request}")
+        suffix = suffix.split("{", 1)[0]
+        match = re.search(re.escape(prefix) + r"(.*?)" + re.escape(suffix), prompt, re.DOTALL)
+        if match and match.group(1).strip():
+            return match.group(1).strip()
+    return None
+
+def with_response_cache(name: str, llm_instance: LLM) -> LLM:
+    """Wrap an LLM in the response caches it was opted in to"""
+    exact = response_cache if name in LLM_CACHE_MODELS else None
+    semantic = semantic_cache if name in LLM_SEMANTIC_CACHE_MODELS else None
+    if exact is None and semantic is None:
+        return llm_instance
+    return CachedLLM(llm_instance, cache=exact, semantic_cache=semantic, embedder=semantic_embedder,
+                     prompt_extractor=chat_request_text)
+
+# Token streaming to the chat (terminal and WebSocket clients); LLMs then emit every token as an event
+CHAT_STREAM = os.getenv("CHAT_STREAM", "0") == "1"
+
+local_llm = with_response_cache("local", LLM(
     model="openai/Llama-3.2-3B-Instruct-Q4_K_M",
     api_key="empty",
-    base_url="http://localhost:5020/v1"
-)
+    base_url="http://localhost:5020/v1",
+    stream=CHAT_STREAM
+))
 
-cloud_llm_deepseek_chat = LLM(
+cloud_llm_deepseek_chat = with_response_cache("deepseek", LLM(
     model="deepseek-chat",
     api_key=os.getenv("DEEPSEEK_API_KEY"),
-    base_url="https://api.deepseek.com/v1"
-)
+    base_url="https://api.deepseek.com/v1",
+    stream=CHAT_STREAM
+))
 
-gemini_llm = LLM(
+gemini_llm = with_response_cache("gemini", LLM(
     model="gemini/gemini-2.5-flash",
     api_key=os.getenv("GEMINI_API_KEY"),
     temperature=0.1,
-)
+    stream=CHAT_STREAM
+))
 
-cloud_llm_gpt4 = LLM(
+cloud_llm_gpt4 = with_response_cache("gpt4", LLM(
     model="gpt-4",
-    api_key=os.getenv("OPENAI_API_KEY")
-)
-
-llm = local_llm
-
-embedder = {
-    "provider": "openai",
-    "config": {
-        "model": "bge-m3",
-        "api_key": "dummy",
-        "base_url": "http://localhost:8001/v1",
-        "model_name": "bge-m3"
-    }
+    api_key=os.getenv("OPENAI_API_KEY"),
+    stream=CHAT_STREAM
+))
+
+named_llms = {
+    "local": local_llm,
+    "deepseek": cloud_llm_deepseek_chat,
+    "gemini": gemini_llm,
+    "gpt4": cloud_llm_gpt4,
 }
 
+# Optional failover/hedging across backends in priority order, e.g. LLM_ROUTE="local,gemini,deepseek"
+LLM_ROUTE = [name.strip() for name in os.getenv("LLM_ROUTE", "").split(",") if name.strip() in named_llms]
+if len(LLM_ROUTE) > 1:
+    llm = RoutingLLM(
+        [named_llms[name] for name in LLM_ROUTE],
+        hedge=os.getenv("LLM_HEDGE", "0") == "1",
+        latency_aware=os.getenv("LLM_LATENCY_AWARE", "0") == "1",
+    )
+else:
+    llm = named_llms[LLM_ROUTE[0]] if LLM_ROUTE else local_llm
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Tool logging to file
+# Tool logging to a rotating file, written by a background listener thread
 tool_logger = logging.getLogger('bitwarden_tool')
-tool_logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler('logs/bitwarden_tool.log')
-file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-tool_logger.addHandler(file_handler)
+tool_log_listener = setup_queue_logging(
+    tool_logger,
+    os.getenv("BITWARDEN_TOOL_LOG", "logs/bitwarden_tool.log"),
+    propagate=False
+)
 
 # Tool Schemas
 class EditorToolSchema(BaseModel):
@@ -136,28 +214,76 @@ class EditorTool(BaseTool):
 # Import the proper Bitwarden integration
 from core.bitwarden_session_manager import initialize_bitwarden_session
 from core.bitwarden_cli_integration import BitwardenCLIIntegration
+from core.bitwarden_audit import AuditLog, audit_actor
+from core.bitwarden_tool_output import (
+    split_command, parse_tool_arguments, parse_generator_options, format_item_page, format_item,
+    GENERATOR_OPTIONS, LOGIN_MATCH_FIELDS
+)
+
+SUPPORTED_BITWARDEN_COMMANDS = (
+    "status, unlock, "
+    "list items [name=<filter>] [offset=N] [limit=N] [fields=a,b], "
+    "get item <id> [fields=a,b], "
+    "search items <term> [offset=N] [limit=N] [fields=a,b], "
+    "generate [length=N] [special=true] [number=true] [ambiguous=true], "
+    "generate passphrase [words=N] [separator=-] [capitalize=true] [include_number=true], "
+    "totp <item_id>, "
+    "find logins <url> [offset=N] [limit=N] [fields=a,b]"
+)
+
+# Shared Bitwarden client so the in-memory vault snapshot survives across tool calls
+_bw_client: Optional[BitwardenCLIIntegration] = None
+
+def get_bw_client() -> BitwardenCLIIntegration:
+    global _bw_client
+    if _bw_client is None:
+        # Optional secret access audit trail
+        audit_log = AuditLog() if os.getenv("BITWARDEN_AUDIT_LOG") else None
+        _bw_client = BitwardenCLIIntegration(audit_log=audit_log)
+        # Optional background sync; 0 disables the snapshot and reads go to the CLI
+        sync_interval = float(os.getenv("BITWARDEN_SYNC_INTERVAL", "0"))
+        if sync_interval > 0:
+            _bw_client.start_sync_scheduler(interval=sync_interval)
+    return _bw_client
+
+def close_bw_client() -> None:
+    """Release the shared Bitwarden client (flushes queued writes, removes CLI context vault copies)"""
+    global _bw_client
+    if _bw_client is not None:
+        _bw_client.close()
+        _bw_client = None
 
 # Autonomous Bitwarden CLI Tool (using proper integration)
 class AutonomousBitwardenCLITool(BaseTool):
     name: str = "autonomous_bitwarden_cli"
-    description: str = "Führt Bitwarden-CLI-Befehle aus. WICHTIG: Vault muss entsperrt sein, bevor Items gelesen werden können. Unterstützt: status, unlock, list items, get item <id>, search items <term>, create item, etc."
+    description: str = (
+        "Führt Bitwarden-CLI-Befehle aus. WICHTIG: Vault muss entsperrt sein, bevor Items gelesen werden können. "
+        f"Unterstützt: {SUPPORTED_BITWARDEN_COMMANDS}. "
+        "Antworten sind kompaktes JSON; mit offset/limit blättern und mit fields=name,login.username nur benötigte Felder abfragen."
+    )
     args_schema: Type[BaseModel] = AutonomousBitwardenCLISchema
 
     def __init__(self):
         super().__init__()
 
     def _run(self, command: str, description: Optional[str] = None) -> str:
-        tool_logger.info(f"Tool called with command: {command}, description: {description}")
+        # Secret reads made by this call are attributed to the tool in the audit log
+        with audit_actor(self.name):
+            return self._execute(command, description)
+
+    def _execute(self, command: str, description: Optional[str] = None) -> str:
+        tool_logger.info("Tool called with command: %s, description: %s",
+                         RedactedCommand(split_command(command)), Redacted(description))
         try:
             # Initialize Bitwarden session and client
             initialize_bitwarden_session()
-            bw_client = BitwardenCLIIntegration()
+            bw_client = get_bw_client()
 
             # Parse command
-            parts = command.split()
+            parts = split_command(command)
             if not parts:
                 result = "No command provided."
-                tool_logger.info(f"Result: {result}")
+                tool_logger.info("Result: %s", Redacted(result))
                 return result
 
             action = parts[0]
@@ -165,54 +291,91 @@ class AutonomousBitwardenCLITool(BaseTool):
             if action == "status":
                 status = bw_client.get_status()
                 result = f"Status: {status}"
-                tool_logger.info(f"Status result: {result}")
+                tool_logger.info("Status result: %s", Redacted(result))
                 return result
             elif action == "unlock":
                 if bw_client.unlock():
                     result = "Vault unlocked successfully."
                 else:
                     result = "Failed to unlock vault."
-                tool_logger.info(f"Unlock result: {result}")
+                tool_logger.info("Unlock result: %s", Redacted(result))
                 return result
             elif action == "list" and len(parts) > 1 and parts[1] == "items":
-                if not bw_client.session_key:
-                    tool_logger.info("Session not available, attempting unlock")
-                    bw_client.unlock()
+                _, options = parse_tool_arguments(parts[2:])
                 try:
-                    stdout, stderr = bw_client._run_bw_command(["list", "items"])
-                    tool_logger.info(f"CLI command: bw list items")
-                    tool_logger.info(f"CLI stdout: {stdout}")
-                    tool_logger.info(f"CLI stderr: {stderr}")
-                    if stdout:
-                        items = json.loads(stdout)
-                        result = f"Items: {[item['name'] for item in items]}"
-                    else:
-                        result = "No items found."
+                    items = bw_client.list_items()
+                    result = format_item_page(items, options) if items else "No items found."
                 except Exception as e:
-                    result = f"Error listing items: {str(e)}"
-                tool_logger.info(f"List items result: {result}")
+                    result = f"Error listing items ({type(e).__name__}): {str(e)}"
+                tool_logger.info("List items result: %s", Redacted(result))
                 return result
             elif action == "get" and len(parts) > 2 and parts[1] == "item":
-                item_id = parts[2]
-                item = bw_client.get_item(item_id)
-                result = f"Item: {item}" if item else "Item not found."
-                tool_logger.info(f"Get item result: {result}")
+                positional, options = parse_tool_arguments(parts[2:])
+                item = bw_client.get_item(positional[0]) if positional else None
+                result = f"Item: {format_item(item, options)}" if item else "Item not found."
+                tool_logger.info("Get item result: %s", Redacted(result))
                 return result
             elif action == "search" and len(parts) > 2 and parts[1] == "items":
-                term = " ".join(parts[2:])
-                items = bw_client.search_items(term)
-                result = f"Found {len(items)} items matching '{term}'"
-                tool_logger.info(f"Search result: {result}")
+                positional, options = parse_tool_arguments(parts[2:])
+                term = " ".join(positional)
+                items = bw_client.search_items(term) if term else []
+                result = format_item_page(items, options)
+                tool_logger.info("Search result: %s", Redacted(result))
+                return result
+            elif action == "generate":
+                positional, options = parse_tool_arguments(parts[1:], GENERATOR_OPTIONS)
+                passphrase = bool(positional) and positional[0] == "passphrase"
+                secret = bw_client.generate_password(passphrase=passphrase, **parse_generator_options(options))
+                result = secret if secret else "Failed to generate password (invalid options)."
+                # Never write generated secrets to the tool log
+                tool_logger.info("Generate result: %s", "ok" if secret else result)
+                return result
+            elif action == "find" and len(parts) > 2 and parts[1] == "logins":
+                positional, options = parse_tool_arguments(parts[2:])
+                matches = bw_client.find_logins_for_url(positional[0]) if positional else []
+                result = format_item_page(matches, options, LOGIN_MATCH_FIELDS) if matches else "No logins found for this URL."
+                tool_logger.info("Find logins result: %s", Redacted(result))
+                return result
+            elif action == "totp" and len(parts) > 1:
+                totp = bw_client.get_totp(parts[1])
+                if totp:
+                    code, remaining = totp
+                    result = f"TOTP: {code} (valid for {remaining}s)"
+                else:
+                    result = "No TOTP available for this item."
+                tool_logger.info("TOTP result: %s", "ok" if totp else result)
                 return result
             else:
-                result = f"Unsupported command: {command}. Supported: status, unlock, list items, get item <id>, search items <term>"
-                tool_logger.info(f"Result: {result}")
+                result = f"Unsupported command: {command}. Supported: {SUPPORTED_BITWARDEN_COMMANDS}"
+                tool_logger.info("Result: %s", Redacted(result))
                 return result
         except Exception as e:
-            result = f"Error: {str(e)}"
-            tool_logger.error(f"Exception: {str(e)}")
+            result = f"Error ({type(e).__name__}): {str(e)}"
+            tool_logger.error("Exception: %s", Redacted(e))
             return result
 
+# MCP servers used by the researcher and the manager
+MCP_SERVERS = [
+    MCPServerStdio(
+        command="/Users/jgtcdghun/.nvm/versions/node/v20.19.2/bin/node",
+        args=["/Users/jgtcdghun/workspace/brave_search/index.js"]
+    ),
+    MCPServerStdio(
+        command="/usr/local/bin/python3",
+        args=["/Users/jgtcdghun/workspace/researcher-poster/mcp-servers/url-reader/server.py"]
+    ),
+    MCPServerStdio(
+        command="/Users/jgtcdghun/.nvm/versions/node/v20.19.2/bin/node",
+        args=["/Users/jgtcdghun/workspace/perplexity-mcp/perplexity-mcp-server/dist/index.js"]
+    )
+]
+
+# One warm connection per server, shared by both agents (MCP_POOL=0: CrewAI spawns servers per task and call)
+if os.getenv('MCP_POOL', '1') != '0':
+    shared_mcp_tools, agent_mcps = mcp_tools(MCP_SERVERS), []
+else:
+    shared_mcp_tools, agent_mcps = [], MCP_SERVERS
+
 # Create agents
 editor = Agent(
     role="Content Editor Specialist",
@@ -229,21 +392,8 @@ researcher = Agent(
     role="Senior Research Analyst",
     goal="Führe umfassende Recherchen durch und erstelle detaillierte Berichte.",
     backstory="Du bist ein hochqualifizierter Research Analyst mit Zugang zu fortschrittlichen Tools.",
-    tools=[EditorTool()],  # Forwards to researcher-poster
-    mcps=[
-        MCPServerStdio(
-            command="/Users/jgtcdghun/.nvm/versions/node/v20.19.2/bin/node",
-            args=["/Users/jgtcdghun/workspace/brave_search/index.js"]
-        ),
-        MCPServerStdio(
-            command="/usr/local/bin/python3",
-            args=["/Users/jgtcdghun/workspace/researcher-poster/mcp-servers/url-reader/server.py"]
-        ),
-        MCPServerStdio(
-            command="/Users/jgtcdghun/.nvm/versions/node/v20.19.2/bin/node",
-            args=["/Users/jgtcdghun/workspace/perplexity-mcp/perplexity-mcp-server/dist/index.js"]
-        )
-    ],
+    tools=[EditorTool(), *shared_mcp_tools],  # Forwards to researcher-poster
+    mcps=agent_mcps,
     llm=llm,
     verbose=True,
     allow_delegation=False,
@@ -254,21 +404,8 @@ manager = Agent(
     role="Vyftec Manager",
     goal="Koordiniere alle Agenten und verwalte Kundenprojekte effizient.",
     backstory="Du bist der zentrale Manager der Vyftec Webagentur. Du koordinierst alle spezialisierten Agenten. Verwende Tools im korrekten Format: Action: tool_name\nAction Input: {\"param\": \"value\"}",
-    tools=[AutonomousBitwardenCLITool()],  # Primary tool for passwords
-    mcps=[
-        MCPServerStdio(
-            command="/Users/jgtcdghun/.nvm/versions/node/v20.19.2/bin/node",
-            args=["/Users/jgtcdghun/workspace/brave_search/index.js"]
-        ),
-        MCPServerStdio(
-            command="/usr/local/bin/python3",
-            args=["/Users/jgtcdghun/workspace/researcher-poster/mcp-servers/url-reader/server.py"]
-        ),
-        MCPServerStdio(
-            command="/Users/jgtcdghun/.nvm/versions/node/v20.19.2/bin/node",
-            args=["/Users/jgtcdghun/workspace/perplexity-mcp/perplexity-mcp-server/dist/index.js"]
-        )
-    ],
+    tools=[AutonomousBitwardenCLITool(), *shared_mcp_tools],  # Primary tool for passwords
+    mcps=agent_mcps,
     llm=llm,
     verbose=True,
     allow_delegation=True,
@@ -334,84 +471,213 @@ def check_server_health():
         print(f"❌ Server check failed: {e}")
         return False
 
-# Conversation manager for chat
-class ConversationManager:
-    def __init__(self, max_history_length: int = 20):
-        self.conversation_history: List[Dict] = []
-        self.max_history_length = max_history_length
-
-    def add_turn(self, role: str, content: str):
-        turn = {
-            "role": role,
-            "content": content,
-            "timestamp": os.times()
-        }
-        self.conversation_history.append(turn)
-        if len(self.conversation_history) > self.max_history_length:
-            self.conversation_history.pop(0)
-
-    def get_recent_context(self, turns: int = 5) -> str:
-        recent = self.conversation_history[-turns:]
-        return "\n".join([f"{msg['role']}: {msg['content']}" for msg in recent])
+# Conversation manager for chat: optional token budget with background summaries, e.g. CONVERSATION_TOKEN_BUDGET=1500
+CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "0"))
+
+# Optional persistent history with full-text recall, e.g. CONVERSATION_DB=~/.cache/crew_llm/conversations.sqlite
+CONVERSATION_DB = os.getenv("CONVERSATION_DB")
+
+# Shared by all chat sessions
+conversation_store = ConversationStore(os.path.expanduser(CONVERSATION_DB)) if CONVERSATION_DB else None
+summary_cache = (LLMResponseCache(path=os.path.expanduser("~/.cache/crew_llm/summaries.sqlite"))
+                 if CONVERSATION_TOKEN_BUDGET else None)
+
+def create_conversation_manager(session_id: Optional[str] = None) -> ConversationManager:
+    """Conversation manager configured from the environment (one per chat session)"""
+    # CONVERSATION_SESSION resumes an earlier session in the terminal chat
+    session_id = session_id or os.getenv("CONVERSATION_SESSION") or None
+    if not CONVERSATION_TOKEN_BUDGET:
+        return ConversationManager(store=conversation_store, session_id=session_id)
+    summary_llm = named_llms.get(os.getenv("CONVERSATION_SUMMARY_LLM", "local"), local_llm)
+    return ConversationManager(token_budget=CONVERSATION_TOKEN_BUDGET, summarizer=summary_llm,
+                               summary_cache=summary_cache, store=conversation_store, session_id=session_id)
+
+def format_recall(matches: List[Dict], preview_chars: int = 300) -> str:
+    """Format recalled turns for the chat"""
+    if not matches:
+        return "No earlier turns found."
+    lines = []
+    for match in matches:
+        when = datetime.fromtimestamp(match["created"]).strftime("%Y-%m-%d %H:%M")
+        content = " ".join(match["content"].split())
+        if len(content) > preview_chars:
+            content = content[:preview_chars] + " …"
+        lines.append(f"[{when}] {match['role']}: {content}")
+    return "\n".join(lines)
+
+def format_mcp_stats(stats: Dict) -> str:
+    """Format MCP pool metrics for the chat"""
+    lines = [f"{stats['running']} running (peak {stats['peak']}, limit {stats['max'] or 'none'})"]
+    for label, server in stats["servers"].items():
+        state = "up" if server["connected"] else "down"
+        memory = f"{server['rss_mb']} MB" if server["rss_mb"] is not None else "-"
+        spawn = f"{server['spawn_seconds_avg']:.2f}s" if server["spawn_seconds_avg"] is not None else "-"
+        lines.append(f"{label}: {state}, memory {memory}, spawn {spawn} (x{server['starts']}), "
+                     f"calls {server['calls']}, stopped when idle {server['reaped']}x")
+    return "\n".join(lines)
+
+class TerminalStream:
+    """Prints a run's answer tokens and tool steps as they arrive (CHAT_STREAM=1)"""
+
+    def __init__(self):
+        self.answered = False
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        if event["type"] == "token":
+            if not event["final"]:
+                return  # Reasoning steps; tool calls are shown below
+            if not self.answered:
+                print("\n🤖 Manager: ", end="")
+                self.answered = True
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "tool_started":
+            print(f"\n🔧 {event['tool']} ...", flush=True)
+        elif event["type"] == "tool_finished":
+            elapsed = f" ({event['ms']:.0f}ms)" if event["ms"] is not None else ""
+            print(f"{'❌' if event['error'] else '✅'} {event['tool']}{elapsed}", flush=True)
+
+# Route chat messages by bge-m3 similarity to example requests (keyword lists when the embedder is down)
+intent_router = IntentRouter(
+    BGEEmbedder.from_config(embedder),
+    min_similarity=float(os.getenv("INTENT_MIN_SIMILARITY", "0.45"))
+)
+
+# One pre-built crew per chat route; only the task inputs change per message
+CHAT_CREWS = {
+    "research": (researcher, "Research request: {request}\n\nContext: {context}",
+                 "Comprehensive research report with findings and sources."),
+    "editor": (editor, "Content creation: {request}\n\nContext: {context}",
+               "High-quality content for the requested format."),
+    "management": (manager, "Management request: {request}\n\nContext: {context}",
+                   "Strategic management response with recommendations."),
+}
+
+def build_chat_crew(route: str) -> Crew:
+    """Crew for one chat route with a templated task"""
+    agent, description, expected_output = CHAT_CREWS[route]
+    task = Task(description=description, expected_output=expected_output, agent=agent)
+    # Verbose console output would interleave with streamed tokens
+    return Crew(agents=[agent], tasks=[task], embedder=embedder, memory=False, verbose=not CHAT_STREAM)
+
+crew_pool = CrewPool(
+    {route: (lambda route=route: build_chat_crew(route)) for route in CHAT_CREWS},
+    max_per_route=int(os.getenv("CREW_POOL_SIZE", "1"))
+)
+
+chat_streamer = ChatStreamer()
 
 # Chat function for manager
-async def chat_with_manager(user_message: str, conversation_manager: ConversationManager) -> str:
+async def chat_with_manager(user_message: str, conversation_manager: ConversationManager,
+                            on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
     conversation_manager.add_turn("user", user_message)
 
     # Analyze message type
-    message_lower = user_message.lower()
-    research_keywords = ["recherche", "bericht", "analyse", "studie", "untersuchung", "informationen", "daten"]
-    editor_keywords = ["content", "artikel", "schreiben", "text", "inhalt", "erstellen", "wordpress", "forum", "social"]
-    management_keywords = ["projekt", "management", "koordination", "planung", "bitwarden", "passwort", "api"]
-
-    if any(k in message_lower for k in research_keywords):
-        # Research task
-        task = Task(
-            description=f"Research request: {user_message}\n\nContext: {conversation_manager.get_recent_context()}",
-            expected_output="Comprehensive research report with findings and sources.",
-            agent=researcher
-        )
-        temp_crew = Crew(agents=[researcher], tasks=[task], embedder=embedder, memory=False, verbose=True)
-    elif any(k in message_lower for k in editor_keywords):
-        # Editor task
-        task = Task(
-            description=f"Content creation: {user_message}\n\nContext: {conversation_manager.get_recent_context()}",
-            expected_output="High-quality content for the requested format.",
-            agent=editor
-        )
-        temp_crew = Crew(agents=[editor], tasks=[task], embedder=embedder, memory=False, verbose=True)
-    else:
-        # Management task
-        task = Task(
-            description=f"Management request: {user_message}\n\nContext: {conversation_manager.get_recent_context()}",
-            expected_output="Strategic management response with recommendations.",
-            agent=manager
-        )
-        temp_crew = Crew(agents=[manager], tasks=[task], embedder=embedder, memory=False, verbose=True)
+    decision = await asyncio.to_thread(intent_router.route, user_message)
+    logger.info(f"🧭 Routing to {decision.route} ({decision.method}, confidence {decision.confidence:.2f})")
+    route = decision.route if decision.route in CHAT_CREWS else "management"
+    inputs = {"request": user_message, "context": conversation_manager.get_recent_context()}
 
-    result = await temp_crew.kickoff_async()
+    if on_event is None:
+        result = await crew_pool.kickoff_async(route, inputs)
+    else:
+        with chat_streamer.run(on_event) as stream:
+            result = await crew_pool.kickoff_async(route, inputs, before_kickoff=stream.attach)
+        if stream.first_token_ms is not None:
+            answer = f", first answer token {stream.first_answer_ms:.0f}ms" if stream.first_answer_ms is not None else ""
+            logger.info(f"⏱️ First token after {stream.first_token_ms:.0f}ms{answer} ({stream.tools} tool calls)")
     conversation_manager.add_turn("assistant", str(result))
     return str(result)
 
 # Check server before running
 if not check_server_health():
-    print("Aborting due to server issues.")
-    exit(1)
+    if isinstance(llm, RoutingLLM) and "local" in LLM_ROUTE:
+        # Other backends can serve; keep the local server out of rotation until it recovers
+        llm.open_circuit(LLM_ROUTE.index("local"))
+        print("⚠️ Local LLM server unavailable, routing to cloud backends.")
+    else:
+        print("Aborting due to server issues.")
+        exit(1)
 
 # Simple chat interface
 async def main_chat_loop():
-    conversation_manager = ConversationManager()
+    conversation_manager = create_conversation_manager()
     print("🤖 Manager Chat Interface")
-    print("Type 'quit' to exit")
-    while True:
-        user_input = input("\n👤 You: ").strip()
-        if user_input.lower() in ['quit', 'exit']:
-            break
-        response = await chat_with_manager(user_input, conversation_manager)
-        print(f"\n🤖 Manager: {response}")
+    if conversation_manager.store is not None:
+        print(f"📋 Session {conversation_manager.session_id} (set CONVERSATION_SESSION to resume)")
+        print("Type 'recall <topic>' to search earlier turns")
+    if shared_mcp_tools:
+        print("Type 'mcp' to show MCP server status")
+    print("Type 'quit' to exit; Ctrl-C cancels a running request, messages typed meanwhile are queued")
+    # Input is read on a thread, so the event loop keeps serving MCP pings and tool subprocesses
+    repl = AsyncChatREPL()
+    repl.start()
+    try:
+        while True:
+            user_input = await repl.read()
+            if user_input is None or user_input.lower() in ['quit', 'exit']:
+                break
+            if user_input.lower().startswith("recall ") and conversation_manager.store is not None:
+                query = user_input[len("recall "):]
+                print(f"\n🔎 Recall:\n{format_recall(conversation_manager.recall(query, all_sessions=True))}")
+                continue
+            if user_input.lower() == "mcp" and shared_mcp_tools:
+                stats = await asyncio.to_thread(get_mcp_pool().stats)
+                print(f"\n🔌 MCP servers:\n{format_mcp_stats(stats)}")
+                continue
+            printer = TerminalStream() if CHAT_STREAM else None
+            try:
+                response = await repl.run(chat_with_manager(user_input, conversation_manager, on_event=printer))
+            except RunCancelled:
+                # The crew's thread finishes in the background (see CrewPool.kickoff_async); its result is
+                # dropped, and the next message of the route runs on a fresh copy with its own agents
+                conversation_manager.add_turn("assistant", "(Request cancelled by the user)")
+                print("⏹️ Cancelled" + (f", {repl.queued} queued message(s) next" if repl.queued else ""))
+                continue
+            except Exception as e:
+                logger.error(f"❌ Chat request failed: {e}")
+                print(f"\n❌ Error: {e}")
+                continue
+            if printer is not None and printer.answered:
+                print()  # Already streamed
+            else:
+                # Not streamed (e.g. answered from the response cache)
+                print(f"\n🤖 Manager: {response}")
+    finally:
+        repl.stop()
+        conversation_manager.close()
+        close_bw_client()
+
+# HTTP/WebSocket server: many sessions share the agents, e.g. python main.py --serve --port 8080
+def run_chat_server(host: str, port: int):
+    from core.chat_server import ChatServer
+
+    max_concurrency = int(os.getenv("CHAT_MAX_CONCURRENCY", "4"))
+    # Every admitted run may target the same route; fewer crews would serialize them
+    crew_pool.max_per_route = max(crew_pool.max_per_route, max_concurrency)
+    server = ChatServer(
+        chat_with_manager, create_conversation_manager,
+        max_concurrency=max_concurrency,
+        max_queue=int(os.getenv("CHAT_MAX_QUEUE", "16")),
+        request_timeout=float(os.getenv("CHAT_REQUEST_TIMEOUT", "600")),
+        session_ttl=float(os.getenv("CHAT_SESSION_TTL", "3600")),
+        stream=CHAT_STREAM,
+    )
+    try:
+        server.run(host=host, port=port)
+    finally:
+        close_bw_client()
 
 if __name__ == "__main__":
-    asyncio.run(main_chat_loop())
+    import argparse
+    parser = argparse.ArgumentParser(description="Vyftec manager chat")
+    parser.add_argument("--serve", action="store_true", help="Serve the chat over HTTP/WebSocket")
+    parser.add_argument("--host", default=os.getenv("CHAT_SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CHAT_SERVER_PORT", "8080")))
+    args = parser.parse_args()
+    if args.serve:
+        run_chat_server(args.host, args.port)
+    else:
+        asyncio.run(main_chat_loop())
 
 # Alternative: Run the fixed crew
 # result = crew.kickoff()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for in-process password/passphrase generation and TOTP codes
+No vault or bw binary needed: python -m pytest test_bitwarden_generators.py
+"""
+
+import os
+import sys
+import base64
+
+import pytest
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.bitwarden_generators import (
+    STEAM_ALPHABET, compute_totp, generate_passphrase, generate_password, load_wordlist
+)
+
+# RFC 6238 appendix B: (unix time, SHA1, SHA256, SHA512) 8-digit codes
+RFC6238_VECTORS = [
+    (59, "94287082", "46119246", "90693936"),
+    (1111111109, "07081804", "68084774", "25091201"),
+    (1111111111, "14050471", "67062674", "99943326"),
+    (1234567890, "89005924", "91819424", "93441116"),
+    (2000000000, "69279037", "90698825", "38618901"),
+    (20000000000, "65353130", "77737706", "47863826"),
+]
+RFC6238_SECRETS = {
+    "SHA1": b"12345678901234567890",
+    "SHA256": b"12345678901234567890123456789012",
+    "SHA512": b"1234567890123456789012345678901234567890123456789012345678901234",
+}
+
+
+def _otpauth(algorithm: str, digits: int = 8) -> str:
+    secret = base64.b32encode(RFC6238_SECRETS[algorithm]).decode().rstrip("=")
+    return f"otpauth://totp/Example:alice?secret={secret}&digits={digits}&algorithm={algorithm}"
+
+
+@pytest.mark.parametrize("timestamp,sha1,sha256,sha512", RFC6238_VECTORS)
+def test_totp_rfc6238_vectors(timestamp, sha1, sha256, sha512):
+    for algorithm, expected in (("SHA1", sha1), ("SHA256", sha256), ("SHA512", sha512)):
+        code, _ = compute_totp(_otpauth(algorithm), timestamp)
+        assert code == expected, algorithm
+
+
+def test_totp_bare_secret_defaults_to_six_digits():
+    secret = base64.b32encode(RFC6238_SECRETS["SHA1"]).decode()
+    # Bitwarden stores secrets with spaces and in lower case too
+    spaced = " ".join(secret[i:i + 4] for i in range(0, len(secret), 4)).lower()
+    assert compute_totp(secret, 59) == ("287082", 1)
+    assert compute_totp(spaced, 59) == ("287082", 1)
+
+
+def test_totp_seconds_remaining():
+    secret = base64.b32encode(RFC6238_SECRETS["SHA1"]).decode()
+    assert compute_totp(secret, 60)[1] == 30
+    assert compute_totp(secret, 89)[1] == 1
+
+
+def test_totp_steam_codes():
+    secret = base64.b32encode(RFC6238_SECRETS["SHA1"]).decode()
+    code, _ = compute_totp(f"steam://{secret}", 59)
+    assert len(code) == 5
+    assert all(character in STEAM_ALPHABET for character in code)
+
+
+def test_password_respects_classes_and_minimums():
+    for _ in range(50):
+        password = generate_password(length=12, special=True, min_number=3, min_special=2)
+        assert len(password) == 12
+        assert sum(c.isdigit() for c in password) >= 3
+        assert sum(c in "!@#$%^&*" for c in password) >= 2
+        assert not set(password) & set("lIO01")
+
+
+def test_password_rejects_impossible_options():
+    with pytest.raises(ValueError):
+        generate_password(length=4)
+    with pytest.raises(ValueError):
+        generate_password(length=5, special=True, min_number=3, min_special=3)
+
+
+def test_bundled_wordlist_is_eff_large():
+    words = load_wordlist()
+    assert len(words) == 7776
+    assert (words[0], words[-1]) == ("abacus", "zoom")
+
+
+def test_wordlist_keeps_only_ascii_words(tmp_path):
+    path = tmp_path / "words.txt"
+    words = [f"word{chr(97 + i % 26)}{chr(97 + i // 26 % 26)}{chr(97 + i // 676 % 26)}" for i in range(1200)]
+    path.write_text("\n".join(["café", "naïve", "Proper", "t-shirt"] + words), encoding="utf-8")
+    loaded = load_wordlist(str(path))
+    assert "café" not in loaded and "naïve" not in loaded and "Proper" not in loaded
+    assert "t-shirt" in loaded
+
+
+def test_passphrase_options():
+    phrase = generate_passphrase(words=5, separator="_", capitalize=True, include_number=True)
+    parts = phrase.split("_")
+    assert len(parts) == 5
+    assert all(part[0].isupper() for part in parts)
+    assert sum(any(c.isdigit() for c in part) for part in parts) == 1
+    with pytest.raises(ValueError):
+        generate_passphrase(words=2)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for client-side rate limiting and backoff of Bitwarden CLI calls
+No vault or bw binary needed: python -m pytest test_bitwarden_rate_limit.py
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.bitwarden_rate_limit import TokenBucket, backoff_delay, is_server_command
+
+
+def test_bucket_allows_a_burst_then_reports_the_wait():
+    bucket = TokenBucket(rate=10, capacity=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = bucket.try_acquire()
+    assert 0.08 < wait <= 0.1
+
+
+def test_bucket_refills_at_rate_up_to_capacity():
+    bucket = TokenBucket(rate=20, capacity=2)
+    bucket.try_acquire()
+    bucket.try_acquire()
+    time.sleep(0.06)
+    assert bucket.try_acquire() == 0.0
+    time.sleep(0.5)  # Long enough for 10 tokens, but the bucket holds 2
+    assert [bucket.try_acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.try_acquire() > 0
+
+
+def test_acquire_waits_for_a_token_or_times_out():
+    bucket = TokenBucket(rate=20, capacity=1)
+    assert bucket.acquire()
+    started = time.monotonic()
+    assert not bucket.acquire(timeout=0.01)
+    assert bucket.acquire(timeout=1.0)
+    assert 0.03 < time.monotonic() - started < 0.5
+
+
+@pytest.mark.parametrize("attempt,ceiling", [(0, 0.5), (1, 1.0), (2, 2.0), (3, 4.0), (10, 8.0)])
+def test_backoff_is_jittered_below_the_exponential_ceiling(attempt, ceiling):
+    delays = [backoff_delay(attempt, base_delay=0.5, max_delay=8.0) for _ in range(500)]
+    assert all(0 <= delay <= ceiling for delay in delays)
+    # Full jitter spreads retries over the whole interval
+    assert max(delays) > ceiling * 0.8 and min(delays) < ceiling * 0.2
+
+
+@pytest.mark.parametrize("command,server", [
+    (["sync"], True),
+    (["edit", "item", "id"], True),
+    (["get", "attachment", "a", "--itemid", "i"], True),
+    (["get", "item", "id"], False),
+    (["list", "items"], False),
+    ([], False),
+])
+def test_server_commands(command, server):
+    assert is_server_command(command) is server
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
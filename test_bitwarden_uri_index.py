@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the login URI/domain index (Bitwarden match detection types)
+No vault or bw binary needed: python -m pytest test_bitwarden_uri_index.py
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.bitwarden_uri_index import (
+    MATCH_DOMAIN, MATCH_EXACT, MATCH_HOST, MATCH_NEVER, MATCH_REGEX, MATCH_STARTS_WITH,
+    URIIndex, normalize_host, registrable_domain
+)
+
+
+def login(item_id, *uris):
+    """Login item with (uri, match) pairs; match None means unset"""
+    return {"id": item_id, "name": item_id,
+            "login": {"uris": [{"uri": uri, "match": match} for uri, match in uris]}}
+
+
+def names(matches):
+    return [match["item"]["name"] for match in matches]
+
+
+@pytest.mark.parametrize("host,domain", [
+    ("example.com", "example.com"),
+    ("login.example.com", "example.com"),
+    ("a.b.example.com:8443", "example.com"),
+    ("login.example.co.uk", "example.co.uk"),
+    ("shop.example.com.au", "example.com.au"),
+    ("localhost", "localhost"),
+    ("192.168.1.10", "192.168.1.10"),
+])
+def test_registrable_domain(host, domain):
+    assert registrable_domain(host) == domain
+
+
+def test_normalize_host():
+    assert normalize_host("HTTPS://Login.Example.com./path") == "login.example.com"
+    assert normalize_host("example.com:8443/login") == "example.com:8443"
+    assert normalize_host("https://") is None
+
+
+def test_domain_match_covers_subdomains_but_not_lookalikes():
+    index = URIIndex([login("site", ("https://example.com", None))])
+    assert names(index.find("https://accounts.example.com/login")) == ["site"]
+    assert index.find("https://example.com.evil.net") == []
+    assert index.find("https://notexample.com") == []
+
+
+def test_host_match_requires_same_host_and_port():
+    index = URIIndex([login("app", ("https://app.example.com:8443", MATCH_HOST))])
+    assert names(index.find("https://app.example.com:8443/x")) == ["app"]
+    assert index.find("https://app.example.com/x") == []
+    assert index.find("https://other.example.com:8443") == []
+
+
+def test_ranking_prefers_specific_matches():
+    index = URIIndex([
+        login("domain", ("https://example.com", MATCH_DOMAIN)),
+        login("host", ("https://app.example.com", MATCH_HOST)),
+        login("prefix", ("https://app.example.com/", MATCH_STARTS_WITH)),
+        login("longer-prefix", ("https://app.example.com/admin", MATCH_STARTS_WITH)),
+        login("exact", ("https://app.example.com/admin/login", MATCH_EXACT)),
+    ])
+    matches = index.find("https://app.example.com/admin/login")
+    assert names(matches) == ["exact", "longer-prefix", "prefix", "host", "domain"]
+    assert [match["match"] for match in matches] == ["exact", "starts_with", "starts_with", "host", "domain"]
+
+
+def test_item_appears_once_with_its_best_uri():
+    index = URIIndex([login("both", ("https://example.com", None), ("https://app.example.com/", MATCH_STARTS_WITH))])
+    matches = index.find("https://app.example.com/home")
+    assert len(matches) == 1
+    assert (matches[0]["uri"], matches[0]["match"]) == ("https://app.example.com/", "starts_with")
+
+
+def test_regex_never_and_unknown_match_types():
+    index = URIIndex([
+        login("regex", (r"^https://[a-z]+\.internal\.example\.org/", MATCH_REGEX)),
+        login("broken-regex", ("([", MATCH_REGEX)),
+        login("never", ("https://wiki.internal.example.org", MATCH_NEVER)),
+        login("future", ("https://internal.example.org", 99)),
+    ])
+    assert names(index.find("https://wiki.internal.example.org/page")) == ["regex", "future"]
+
+
+def test_items_without_id_are_all_returned():
+    items = [{"name": name, "login": {"uris": [{"uri": "https://example.com"}]}} for name in ("a", "b")]
+    assert sorted(names(URIIndex(items).find("example.com"))) == ["a", "b"]
+
+
+def test_bare_host_lookup_and_items_without_uris():
+    index = URIIndex([login("site", ("example.com/login", None)), {"id": "note", "name": "note"}])
+    assert names(index.find("example.com")) == ["site"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for splitting streamed ReAct output into reasoning and answer tokens
+No LLM needed: python -m pytest test_chat_stream.py
+"""
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.chat_stream import ChatStreamer, FinalAnswerSplitter
+
+
+def split(chunks):
+    """Feed chunks and flush; returns (reasoning text, answer text, pieces)"""
+    splitter = FinalAnswerSplitter()
+    pieces = [piece for chunk in chunks for piece in splitter.feed(chunk)] + splitter.flush()
+    reasoning = "".join(text for text, final in pieces if not final)
+    answer = "".join(text for text, final in pieces if final)
+    return reasoning, answer, pieces
+
+
+def test_react_reply_is_split_at_the_final_answer_marker():
+    reasoning, answer, _ = split(["Thought: I know this.\n", "Final Answer: ", "Bern is the capital."])
+    assert reasoning == "Thought: I know this.\nFinal Answer:"
+    assert answer == "Bern is the capital."
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 13])
+def test_markers_split_across_chunks(size):
+    text = "Thought: look it up\nAction: search\nAction Input: {}\nThought: done\nFinal Answer: 42 apples"
+    chunks = [text[i:i + size] for i in range(0, len(text), size)]
+    reasoning, answer, _ = split(chunks)
+    assert answer == "42 apples"
+    assert reasoning + " " + answer == text
+
+
+def test_plain_reply_is_all_answer():
+    reasoning, answer, pieces = split(["The ", "answer ", "is 4."])
+    assert (reasoning, answer) == ("", "The answer is 4.")
+    assert len(pieces) == 3  # Streamed as it arrives, not held back
+
+
+def test_possible_marker_prefix_is_held_until_decided():
+    splitter = FinalAnswerSplitter()
+    assert splitter.feed("  Th") == []  # Could still become "Thought:"
+    assert splitter.feed("e sky") == [("  The sky", True)]
+
+
+def test_answer_text_resembling_a_marker_stays_in_the_answer():
+    _, answer, _ = split(["Final Answer: use ", "Final Answer: as the marker"])
+    assert answer == "use Final Answer: as the marker"
+
+
+def test_held_back_tail_is_released_on_flush():
+    reasoning, answer, _ = split(["Thought: still thinking about Final Ans"])
+    assert (reasoning, answer) == ("Thought: still thinking about Final Ans", "")
+
+
+def test_empty_reply():
+    assert split([]) == ("", "", [])
+    assert split([""]) == ("", "", [])
+
+
+def test_run_drops_late_chunks_of_a_superseded_call():
+    async def run():
+        events = []
+        stream = ChatStreamer().run(events.append)
+        stream._token("call-1", "Hello ")
+        stream._token("call-2", "Other ")
+        stream._token("call-1", "world")  # e.g. a hedged duplicate still streaming
+        stream._token("call-2", "text")
+        stream.close()
+        await asyncio.sleep(0)
+        return "".join(event["text"] for event in events), stream.final_text
+
+    assert asyncio.run(run()) == ("Hello Other text", "Hello Other text")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the MCP tool result cache (argument canonicalization, TTLs, LRU eviction, dedup)
+No MCP server needed: python -m pytest test_mcp_result_cache.py
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.mcp_result_cache import MCPResultCache, canonical_arguments, make_tool_key, parse_patterns
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MCPResultCache(str(tmp_path / "results.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_canonical_arguments_ignore_whitespace_key_order_and_none():
+    assert canonical_arguments({"query": " Solar subsidies ", "count": 5, "offset": None}) == \
+        canonical_arguments({"count": 5, "query": "Solar subsidies"})
+    assert canonical_arguments({"query": "solar"}) != canonical_arguments({"query": "Solar"})
+    assert canonical_arguments(None) == canonical_arguments({}) == "{}"
+
+
+@pytest.mark.parametrize("url,canonical", [
+    ("HTTPS://Example.COM/Path?q=1#section", "https://example.com/Path?q=1"),
+    ("https://example.com", "https://example.com/"),
+    (" https://example.com/a ", "https://example.com/a"),
+])
+def test_canonical_arguments_normalize_urls(url, canonical):
+    assert canonical_arguments({"url": url}) == canonical_arguments({"url": canonical})
+
+
+def test_canonical_arguments_keep_text_that_only_starts_like_a_url():
+    # Not a URL (contains whitespace): only stripped, case is kept
+    assert canonical_arguments({"q": "https://Example.com is down"}) == '{"q":"https://Example.com is down"}'
+
+
+def test_canonical_arguments_nested_values():
+    assert canonical_arguments({"urls": ["HTTPS://A.com", " x "], "opts": {"b": None, "a": 1}}) == \
+        '{"opts":{"a":1},"urls":["https://a.com/","x"]}'
+
+
+def test_tool_key_depends_on_server_and_tool():
+    arguments = {"query": "solar"}
+    keys = {make_tool_key("brave", "search", arguments), make_tool_key("brave", "news", arguments),
+            make_tool_key("perplexity", "search", arguments)}
+    assert len(keys) == 3
+    assert make_tool_key("brave", "search", {"query": " solar "}) in keys
+
+
+def test_parse_patterns_skips_malformed_items():
+    assert parse_patterns("*search*=600, fetch=86400,broken,=x") == {"*search*": 600.0, "fetch": 86400.0}
+
+
+def test_get_put_and_per_tool_stats(cache):
+    key = make_tool_key("brave", "fetch_url", {"url": "https://example.com"})
+    assert cache.get(key, "fetch_url") is None
+    cache.put(key, "page", "fetch_url")
+    assert cache.get(key, "fetch_url") == "page"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["tools"]["fetch_url"] == {"hits": 1, "misses": 1}
+
+
+def test_non_idempotent_and_zero_ttl_tools_are_not_stored(tmp_path):
+    cache = MCPResultCache(str(tmp_path / "results.sqlite"), ttls={"live_*": 0})
+    try:
+        assert not cache.cacheable("create_post") and not cache.cacheable("live_prices")
+        cache.put("k1", "done", "create_post")
+        cache.put("k2", "42", "live_prices")
+        assert cache.get("k1") is None and cache.get("k2") is None
+        assert cache.stats()["entries"] == 0
+    finally:
+        cache.close()
+
+
+def test_entries_expire(tmp_path):
+    cache = MCPResultCache(str(tmp_path / "results.sqlite"), default_ttl=0.05, ttls={})
+    try:
+        cache.put("key", "value", "fetch")
+        assert cache.get("key") == "value"
+        time.sleep(0.1)
+        assert cache.get("key") is None
+        assert cache.stats()["bytes"] == 0
+    finally:
+        cache.close()
+
+
+def test_identical_contents_are_stored_once(cache):
+    cache.put("a", "same page", "fetch")
+    cache.put("b", "same page", "fetch")
+    stats = cache.stats()
+    assert (stats["entries"], stats["contents"], stats["bytes"]) == (2, 1, len("same page"))
+    # Replacing one entry keeps the content the other still references
+    cache.put("a", "new page", "fetch")
+    assert cache.get("b") == "same page"
+    assert cache.stats()["bytes"] == len("same page") + len("new page")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = MCPResultCache(str(tmp_path / "results.sqlite"), max_bytes=100)
+    try:
+        cache.put("first", "1" * 40, "fetch")
+        time.sleep(0.01)
+        cache.put("second", "2" * 40, "fetch")
+        time.sleep(0.01)
+        assert cache.get("first") is not None  # now more recent than "second"
+        time.sleep(0.01)
+        cache.put("third", "3" * 40, "fetch")
+        assert cache.get("second") is None
+        assert cache.get("first") is not None and cache.get("third") is not None
+        stats = cache.stats()
+        assert stats["evictions"] == 1 and stats["bytes"] == 80
+        # Larger than the whole cache: never stored
+        cache.put("huge", "x" * 101, "fetch")
+        assert cache.get("huge") is None
+    finally:
+        cache.close()
+
+
+def test_clear(cache):
+    cache.put("a", "x", "fetch")
+    cache.clear()
+    assert cache.get("a") is None
+    assert (cache.stats()["entries"], cache.stats()["bytes"]) == (0, 0)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))